@@ -0,0 +1,4 @@
+# Benchmarks del Análisis Exploratorio de Datos - Online Retail
+# -------------------------------------------------------------
+# Generador de datos sintéticos con el esquema Online Retail y medición de
+# tiempo y memoria de cada etapa del análisis a distintas escalas.
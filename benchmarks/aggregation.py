@@ -0,0 +1,120 @@
+# Agregados de las secciones 3 a 8: groupby de pandas frente a compute_aggregates
+# ------------------------------------------------------------------------------
+# baseline_aggregates() reproduce las agrupaciones que main.py hacía con pandas
+# antes de compute_aggregates() (value_counts, groupby().sum()/nunique() y la
+# agregación RFM con lambda por cliente). Se usa como referencia en
+# tests/test_aggregation.py y aquí para medir las dos versiones sobre el mismo
+# df_analysis.
+#
+# compute_aggregates() calcula además las cohortes y los resúmenes de
+# distribución, que el código anterior no tenía; el benchmark mide también la
+# pasada sin ellos (extras=False, tablas comparables) para que la aceleración
+# compare el mismo trabajo.
+#
+# Uso:
+#   python -m benchmarks.aggregation --scale 1 --repeat 5
+
+import argparse
+import contextlib
+import io
+import json
+import time
+
+from benchmarks.run import DATA_DIR, dataset_path, environment, git_commit
+from retail.aggregation import TOP_PRODUCTS, AnalysisResults, compute_aggregates, mismatched_tables
+from retail.stages import build_pipeline
+
+# Tablas que calculaba el código anterior (el resto de AnalysisResults es nuevo)
+BASELINE_TABLES = ['country_counts', 'stock_counts', 'monthly_sales', 'monthly_quantity', 'weekday_sales',
+                   'hourly_sales', 'country_sales', 'top_products_quantity', 'top_products_revenue', 'order_size',
+                   'order_value', 'daily_sales', 'customer_transactions', 'customer_spending', 'rfm',
+                   'correlation']
+
+NUMERIC_COLUMNS = ['Quantity', 'UnitPrice', 'TotalAmount', 'Year', 'Month', 'Day', 'DayOfWeek', 'Hour']
+
+
+def baseline_aggregates(df_analysis):
+    """Las tablas de BASELINE_TABLES con las agrupaciones de pandas del código anterior."""
+    df = df_analysis
+    tables = {
+        'country_counts': df['Country'].value_counts(),
+        'stock_counts': df['StockCode'].value_counts(),
+        'monthly_sales': df.groupby('Month')['TotalAmount'].sum().reindex(range(1, 13)),
+        'monthly_quantity': df.groupby('Month')['Quantity'].sum().reindex(range(1, 13)),
+        'weekday_sales': df.groupby('DayOfWeek')['TotalAmount'].sum(),
+        'hourly_sales': df.groupby('Hour')['TotalAmount'].sum(),
+        'country_sales': df.groupby('Country', observed=True)['TotalAmount'].sum().sort_values(ascending=False),
+        # AnalysisResults guarda los TOP_PRODUCTS primeros; con orden estable
+        # los empates del corte salen igual que con top_k_positions()
+        'top_products_quantity': df.groupby(['StockCode', 'Description'], observed=True)['Quantity'].sum()
+                                   .sort_values(ascending=False, kind='stable').head(TOP_PRODUCTS),
+        'top_products_revenue': df.groupby(['StockCode', 'Description'], observed=True)['TotalAmount'].sum()
+                                  .sort_values(ascending=False, kind='stable').head(TOP_PRODUCTS),
+        'order_size': df.groupby('InvoiceNo', observed=True)['Quantity'].sum(),
+        'order_value': df.groupby('InvoiceNo', observed=True)['TotalAmount'].sum(),
+        'daily_sales': df.groupby(df['InvoiceDate'].dt.normalize())['TotalAmount'].sum(),
+        'correlation': df[NUMERIC_COLUMNS].corr(),
+    }
+
+    # Solo analizamos clientes con CustomerID válido
+    df_customers = df.dropna(subset=['CustomerID'])
+    df_customers = df_customers.assign(CustomerID=df_customers['CustomerID'].astype(int))
+    max_date = df_customers['InvoiceDate'].max()
+    tables['customer_transactions'] = df_customers.groupby('CustomerID')['InvoiceNo'].nunique()
+    tables['customer_spending'] = df_customers.groupby('CustomerID')['TotalAmount'].sum()
+    tables['rfm'] = df_customers.groupby('CustomerID').agg({
+        'InvoiceDate': lambda x: (max_date - x.max()).days,
+        'InvoiceNo': 'nunique',
+        'TotalAmount': 'sum',
+    }).rename(columns={'InvoiceDate': 'Recency', 'InvoiceNo': 'Frequency', 'TotalAmount': 'Monetary'})
+    return AnalysisResults(**tables)
+
+
+def _best_time(func, repeat):
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def measure(df_analysis, repeat=3):
+    """Tiempos de las agrupaciones de pandas, de las tablas comparables y de compute_aggregates."""
+    baseline_s, baseline = _best_time(lambda: baseline_aggregates(df_analysis), repeat)
+    comparable_s, comparable = _best_time(lambda: compute_aggregates(df_analysis, extras=False), repeat)
+    full_s, _ = _best_time(lambda: compute_aggregates(df_analysis), repeat)
+    return {'rows_analysis': len(df_analysis), 'baseline_s': baseline_s, 'comparable_s': comparable_s,
+            'compute_aggregates_s': full_s, 'speedup_comparable': baseline_s / comparable_s,
+            'speedup_compute_aggregates': baseline_s / full_s,
+            'mismatches': mismatched_tables(baseline, comparable, BASELINE_TABLES)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Agregados con groupby de pandas frente a compute_aggregates')
+    parser.add_argument('--scale', type=float, default=1)
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='Archivo JSON de resultados')
+    args = parser.parse_args(argv)
+
+    pipeline = build_pipeline(dataset_path(args.scale, args.data_dir), use_cache=False)
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_analysis = pipeline.run('enrich')
+    result = measure(df_analysis, args.repeat)
+
+    print(f"Filas: {result['rows_analysis']}")
+    print(f"groupby de pandas:          {result['baseline_s']:.3f} s")
+    print(f"tablas comparables:         {result['comparable_s']:.3f} s ({result['speedup_comparable']:.1f}x)")
+    print(f"compute_aggregates (todas): {result['compute_aggregates_s']:.3f} s "
+          f"({result['speedup_compute_aggregates']:.1f}x)")
+    print(f"Tablas distintas: {', '.join(result['mismatches']) or 'ninguna'}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump({**git_commit(), 'environment': environment(), 'scale': args.scale, **result}, fh, indent=2)
+    return result
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+# Benchmark del análisis de cesta
+# -------------------------------
+# Mide tiempo y pico de memoria (tracemalloc) de cada paso de
+# retail/basket.py sobre df_analysis a varias escalas: la matriz CSR factura ×
+# producto, las reglas de pares (Xᵀ·X con poda por soporte) y los itemsets
+# frecuentes de fp_growth(). Con --naive mide también el self-merge de pandas
+# por InvoiceNo sobre los mismos productos frecuentes y comprueba que cuenta los
+# mismos pares.
+#
+# Uso:
+#   python -m benchmarks.basket --scales 1 10
+#   python -m benchmarks.basket --scales 1 --naive --output cesta.json
+
+import argparse
+import contextlib
+import io
+import json
+import time
+import tracemalloc
+
+import pandas as pd
+
+from benchmarks.run import DATA_DIR, dataset_path, environment, git_commit
+from retail.basket import MAX_ITEMSET_SIZE, MIN_CONFIDENCE, MIN_SUPPORT, BasketAnalysis
+from retail.stages import build_pipeline
+
+
+def _measure(func):
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        result = func()
+        wall_s = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'wall_s': wall_s, 'peak_mb': peak / 2**20}, result
+
+
+def naive_pairs(df_analysis, products):
+    """Pares de `products` que aparecen juntos (self-merge de pandas por factura)."""
+    lines = df_analysis.loc[df_analysis['StockCode'].isin(products), ['InvoiceNo', 'StockCode']]
+    lines = lines.astype(str).drop_duplicates()
+    pairs = lines.merge(lines, on='InvoiceNo')
+    pairs = pairs[pairs['StockCode_x'] < pairs['StockCode_y']]
+    return pairs.groupby(['StockCode_x', 'StockCode_y']).size()
+
+
+def run_scale(df_analysis, min_support=MIN_SUPPORT, naive=False):
+    steps = {}
+    steps['matrix'], basket = _measure(lambda: BasketAnalysis.from_frame(df_analysis))
+    steps['rules'], rules = _measure(lambda: basket.rules(min_support, MIN_CONFIDENCE))
+    steps['itemsets'], itemsets = _measure(lambda: basket.itemsets(min_support, MAX_ITEMSET_SIZE))
+    summary = {'rows': len(df_analysis), 'invoices': basket.n_invoices, 'products': len(basket.products),
+               'nnz': int(basket.matrix.nnz), 'frequent_products': len(basket.frequent_items(min_support)),
+               'rules': len(rules), 'itemsets': len(itemsets), 'steps': steps}
+    if naive:
+        frequent = basket.products[basket.frequent_items(min_support)].astype(str)
+        steps['naive_pairs'], counts = _measure(lambda: naive_pairs(df_analysis, frequent))
+        counts = counts[counts >= basket.min_count(min_support)]
+        summary['naive_matches'] = len(counts) == int((itemsets['size'] == 2).sum())
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Tiempo y memoria del análisis de cesta')
+    parser.add_argument('--scales', type=float, nargs='+', default=[1, 10])
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--min-support', type=float, default=MIN_SUPPORT)
+    parser.add_argument('--naive', action='store_true', help='Mide también el self-merge de pandas')
+    parser.add_argument('--output', help='Archivo JSON de resultados')
+    args = parser.parse_args(argv)
+
+    runs = []
+    for scale in args.scales:
+        pipeline = build_pipeline(dataset_path(scale, args.data_dir), use_cache=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            df_analysis = pipeline.run('enrich')
+        run = {'scale': scale, **run_scale(df_analysis, args.min_support, args.naive)}
+        runs.append(run)
+        del pipeline, df_analysis
+
+        print(f"\nEscala {scale:g}x: {run['rows']} filas, {run['invoices']} facturas × {run['products']} productos "
+              f"({run['nnz']} celdas), {run['frequent_products']} productos frecuentes, {run['rules']} reglas, "
+              f"{run['itemsets']} itemsets")
+        print(pd.DataFrame(run['steps']).T.round(3))
+        if 'naive_matches' in run:
+            print(f"El self-merge cuenta los mismos pares: {'sí' if run['naive_matches'] else 'NO'}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump({**git_commit(), 'environment': environment(), 'min_support': args.min_support,
+                       'runs': runs}, fh, indent=2)
+    return runs
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+# Comparación de dos resultados de benchmarks/run.py
+# --------------------------------------------------
+# Uso: python -m benchmarks.compare antes.json despues.json
+# Imprime, por escala y etapa, el tiempo de cada ejecución y el cociente
+# después/antes (valores menores que 1 son mejoras).
+
+import argparse
+import json
+
+import pandas as pd
+
+
+def load_runs(path):
+    """Tabla (escala, etapa) -> métricas de un archivo de resultados."""
+    with open(path, encoding='utf-8') as fh:
+        report = json.load(fh)
+    rows = [{'scale': run['scale'], 'stage': stage, **metrics}
+            for run in report['runs'] for stage, metrics in run['stages'].items()]
+    return report, pd.DataFrame(rows).set_index(['scale', 'stage'])
+
+
+def compare(before_path, after_path, metric='wall_s'):
+    before_report, before = load_runs(before_path)
+    after_report, after = load_runs(after_path)
+    # Mismo orden de etapas que en los archivos (orden de ejecución)
+    index = before.index.union(after.index, sort=False)
+    table = pd.DataFrame({'antes': before[metric], 'despues': after[metric]}).reindex(index)
+    table['cociente'] = table['despues'] / table['antes']
+    return before_report, after_report, table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compara dos resultados de benchmarks/run.py')
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--metric', default='wall_s',
+                        help='wall_s, cpu_s, children_cpu_s, peak_traced_mb, retained_mb o max_rss_mb')
+    args = parser.parse_args(argv)
+
+    before_report, after_report, table = compare(args.before, args.after, args.metric)
+    print(f"Antes:   {before_report.get('commit')} ({before_report.get('created')})")
+    print(f"Después: {after_report.get('commit')} ({after_report.get('created')})")
+    with pd.option_context('display.max_rows', None, 'display.float_format', '{:.3f}'.format):
+        print(table)
+
+
+if __name__ == '__main__':
+    main()
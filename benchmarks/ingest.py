@@ -0,0 +1,103 @@
+# Curva de aceleración de la ingesta de varias fuentes
+# ----------------------------------------------------
+# Reparte el dataset sintético en `--parts` archivos (CSV o libros de Excel de
+# dos hojas, con los nombres de columna de Online Retail II) y mide ingest()
+# con 1..N procesos frente a la lectura secuencial con pd.concat. Comprueba que
+# todas las variantes devuelven la misma tabla.
+#
+# Uso:
+#   python -m benchmarks.ingest --scale 1 --parts 8 --format csv --max-workers 4
+#   python -m benchmarks.ingest --scale 0.2 --parts 4 --format xlsx
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.run import DATA_DIR, dataset_path, environment, git_commit
+from retail.cache import read_source
+from retail.ingest import INGEST_DTYPES, expand_sources, ingest, read_part
+
+# Nombres de columna de la exportación Online Retail II
+RETAIL_II_COLUMNS = {'InvoiceNo': 'Invoice', 'UnitPrice': 'Price', 'CustomerID': 'Customer ID'}
+
+
+def write_parts(df, directory, parts, fmt='csv'):
+    """Escribe `df` repartido en `parts` archivos y devuelve el patrón glob que los lee."""
+    os.makedirs(directory, exist_ok=True)
+    df = df.rename(columns=RETAIL_II_COLUMNS)
+    for number, chunk in enumerate(np.array_split(np.arange(len(df)), parts)):
+        part = df.iloc[chunk]
+        path = os.path.join(directory, f'parte_{number:03d}.{fmt}')
+        if fmt == 'csv':
+            part.to_csv(path, index=False)
+        else:
+            half = len(part) // 2
+            with pd.ExcelWriter(path) as writer:
+                part.iloc[:half].to_excel(writer, sheet_name='Year 2010-2011', index=False)
+                part.iloc[half:].to_excel(writer, sheet_name='Year 2011-2012', index=False)
+    return os.path.join(directory, f'parte_*.{fmt}')
+
+
+def sequential_concat(pattern):
+    """Lectura de referencia: una parte tras otra y pd.concat al final."""
+    return pd.concat([read_part(part) for part in expand_sources([pattern])], ignore_index=True)
+
+
+def speedup_curve(pattern, max_workers=None, repeat=3):
+    def best(func):
+        times, result = [], None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            times.append(time.perf_counter() - start)
+        return min(times), result
+
+    concat_s, expected = best(lambda: sequential_concat(pattern))
+    expected = expected.astype(INGEST_DTYPES)
+    rows = []
+    for workers in range(1, (max_workers or os.cpu_count() or 1) + 1):
+        wall_s, df = best(lambda: ingest([pattern], workers))
+        rows.append({'workers': workers, 'wall_s': wall_s, 'matches': df.equals(expected)})
+    for row in rows:
+        row['speedup_vs_1'] = rows[0]['wall_s'] / row['wall_s']
+    return {'rows': len(expected), 'parts': len(expand_sources([pattern])), 'concat_s': concat_s, 'curve': rows}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Curva de aceleración de la ingesta de varias fuentes')
+    parser.add_argument('--scale', type=float, default=1)
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--parts', type=int, default=8)
+    parser.add_argument('--format', choices=['csv', 'xlsx'], default='csv')
+    parser.add_argument('--max-workers', type=int, default=None)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='Archivo JSON de resultados')
+    args = parser.parse_args(argv)
+
+    directory = os.path.join(args.data_dir, f'ingesta_{args.scale:g}x_{args.parts}_{args.format}')
+    pattern = os.path.join(directory, f'parte_*.{args.format}')
+    if not os.path.isdir(directory):
+        print(f"Generando {directory} ...")
+        write_parts(read_source(dataset_path(args.scale, args.data_dir)), directory, args.parts, args.format)
+    curve = speedup_curve(pattern, args.max_workers, args.repeat)
+
+    print(f"Filas: {curve['rows']} en {curve['parts']} partes - lectura secuencial + pd.concat: "
+          f"{curve['concat_s']:.3f} s")
+    print(f"{'procesos':>8} {'tiempo_s':>9} {'vs_1':>6}  coincide")
+    for row in curve['curve']:
+        print(f"{row['workers']:>8} {row['wall_s']:>9.3f} {row['speedup_vs_1']:>6.2f}  "
+              f"{'sí' if row['matches'] else 'NO'}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump({**git_commit(), 'environment': environment(), 'scale': args.scale,
+                       'format': args.format, **curve}, fh, indent=2)
+    return curve
+
+
+if __name__ == '__main__':
+    main()
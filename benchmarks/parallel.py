@@ -0,0 +1,74 @@
+# Curva de aceleración del map-reduce por particiones
+# ---------------------------------------------------
+# Mide compute_aggregates() (una pasada en un proceso) y parallel_aggregates()
+# con 1..N procesos sobre el mismo df_analysis, y comprueba que todas las
+# variantes dan las mismas tablas.
+#
+# Uso:
+#   python -m benchmarks.parallel --scale 1 --key month --max-workers 8
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+
+from benchmarks.run import DATA_DIR, dataset_path, environment, git_commit
+from retail.aggregation import compute_aggregates, mismatched_tables
+from retail.parallel import PARTITION_KEYS, parallel_aggregates
+from retail.stages import build_pipeline
+
+
+def _best_time(func, repeat):
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def speedup_curve(df_analysis, key='month', max_workers=None, repeat=3):
+    """Tiempos de parallel_aggregates con 1..max_workers procesos frente al camino serie."""
+    max_workers = max_workers or os.cpu_count() or 1
+    serial_s, serial = _best_time(lambda: compute_aggregates(df_analysis), repeat)
+    rows = []
+    for workers in range(1, max_workers + 1):
+        wall_s, results = _best_time(lambda: parallel_aggregates(df_analysis, key, workers), repeat)
+        rows.append({'workers': workers, 'wall_s': wall_s, 'mismatches': mismatched_tables(serial, results)})
+    for row in rows:
+        row['speedup_vs_1'] = rows[0]['wall_s'] / row['wall_s']
+        row['speedup_vs_serial'] = serial_s / row['wall_s']
+    return {'key': key, 'rows_analysis': len(df_analysis), 'serial_s': serial_s, 'curve': rows}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Curva de aceleración del modo --parallel')
+    parser.add_argument('--scale', type=float, default=1)
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--key', choices=list(PARTITION_KEYS), default='month')
+    parser.add_argument('--max-workers', type=int, default=None)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='Archivo JSON de resultados')
+    args = parser.parse_args(argv)
+
+    pipeline = build_pipeline(dataset_path(args.scale, args.data_dir), use_cache=False)
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_analysis = pipeline.run('enrich')
+    curve = speedup_curve(df_analysis, args.key, args.max_workers, args.repeat)
+
+    print(f"Filas: {curve['rows_analysis']} - compute_aggregates (serie): {curve['serial_s']:.3f} s")
+    print(f"{'procesos':>8} {'tiempo_s':>9} {'vs_1':>6} {'vs_serie':>8}  coincide")
+    for row in curve['curve']:
+        print(f"{row['workers']:>8} {row['wall_s']:>9.3f} {row['speedup_vs_1']:>6.2f} {row['speedup_vs_serial']:>8.2f}  "
+              f"{'sí' if not row['mismatches'] else ', '.join(row['mismatches'])}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump({**git_commit(), 'environment': environment(), 'scale': args.scale, **curve}, fh, indent=2)
+    return curve
+
+
+if __name__ == '__main__':
+    main()
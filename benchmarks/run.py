@@ -0,0 +1,114 @@
+# Benchmark por etapas del análisis completo
+# ------------------------------------------
+# Genera (o reutiliza) datasets sintéticos a varias escalas del dataset UCI y
+# ejecuta todas las etapas del grafo de retail/stages.py en orden de
+# dependencias. Como cada etapa encuentra sus entradas ya calculadas, el tiempo
+# y la memoria medidos son solo los suyos. El resultado es un JSON con el commit
+# y el entorno, pensado para comparar ejecuciones con benchmarks/compare.py.
+#
+# Uso:
+#   python -m benchmarks.run --scales 1 10 100
+#   python -m benchmarks.run --scales 0.1 --output resultados.json
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import tempfile
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import write_dataset
+from retail.instrumentation import Tracer
+from retail.stages import build_pipeline
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'resultados')
+
+
+def git_commit():
+    """Commit actual y si hay cambios sin confirmar (None fuera de un repositorio git)."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=root, capture_output=True, text=True,
+                                check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=root,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return {'commit': None, 'dirty': None}
+    return {'commit': commit, 'dirty': bool(status.strip())}
+
+
+def environment():
+    return {'python': platform.python_version(), 'pandas': pd.__version__, 'numpy': np.__version__,
+            'platform': platform.platform(), 'cpu_count': os.cpu_count()}
+
+
+def dataset_path(scale, data_dir=DATA_DIR, seed=0, extension='csv'):
+    """Ruta del dataset sintético de `scale`; se genera si no existe."""
+    path = os.path.join(data_dir, f'online_retail_{scale:g}x_s{seed}.{extension}')
+    if not os.path.exists(path):
+        print(f"Generando {path} ...")
+        write_dataset(path, scale, seed)
+    return path
+
+
+def run_scale(path, scale, render_workers=None, trace_memory=True):
+    """Benchmark de todas las etapas para un dataset."""
+    tracer = Tracer(trace_memory=trace_memory)
+    with tempfile.TemporaryDirectory() as images_dir:
+        pipeline = build_pipeline(path, use_cache=False, render_workers=render_workers, images_dir=images_dir,
+                                  tracer=tracer)
+        try:
+            # Orden de dependencias: cada etapa encuentra sus entradas calculadas
+            for name in pipeline.order(list(pipeline.stages)):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    pipeline.run(name)
+                print(f"  {name:<13} {tracer.events[-1]['wall_s']:8.2f} s")
+        finally:
+            tracer.close()
+    stages = {event['stage']: {key: value for key, value in event.items() if key != 'stage'}
+              for event in tracer.events}
+    return {'scale': scale, 'dataset': os.path.basename(path), 'rows': stages['load']['rows_out'],
+            'total_wall_s': sum(stage['wall_s'] for stage in stages.values()), 'stages': stages}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark por etapas con datos sintéticos')
+    parser.add_argument('--scales', type=float, nargs='+', default=[1, 10, 100],
+                        help='Escalas respecto al dataset UCI (1 ≈ 540 000 líneas)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', default=DATA_DIR, help='Directorio de los datasets generados')
+    parser.add_argument('--format', choices=['csv', 'xlsx'], default='csv',
+                        help='Formato del dataset que lee la etapa load')
+    parser.add_argument('--render-workers', type=int, default=None)
+    parser.add_argument('--no-memory', action='store_true',
+                        help='No usar tracemalloc (menos sobrecarga, sin memoria por etapa)')
+    parser.add_argument('--output', help='Archivo JSON de resultados (por defecto en benchmarks/resultados)')
+    args = parser.parse_args(argv)
+
+    report = {'created': datetime.now().isoformat(timespec='seconds'), **git_commit(),
+              'environment': environment(), 'runs': []}
+    for scale in args.scales:
+        path = dataset_path(scale, args.data_dir, args.seed, args.format)
+        print(f"Escala {scale:g}x ({path})")
+        report['runs'].append(run_scale(path, scale, args.render_workers, trace_memory=not args.no_memory))
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        commit = (report['commit'] or 'sin-git')[:10]
+        output = os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}-{commit}.json")
+    with open(output, 'w', encoding='utf-8') as fh:
+        json.dump(report, fh, indent=2)
+    print(f"Resultados guardados en {output}")
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+# Prueba de carga del servicio de consultas
+# -----------------------------------------
+# Lanza `--clients` clientes concurrentes (conexiones HTTP/1.1 keep-alive) que
+# repiten una mezcla de consultas contra un servicio ya levantado con
+# `python main.py --serve` e informa la latencia p50/p99 por ruta y el número
+# de consultas por segundo.
+#
+# Uso:
+#   python -m benchmarks.service --clients 16 --requests 5000
+#   python -m benchmarks.service --port 8765 --output carga.json
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from urllib.parse import quote
+from urllib.request import urlopen
+
+import numpy as np
+import pandas as pd
+
+from retail.service import DEFAULT_HOST, DEFAULT_PORT
+
+
+def _get(base_url, path):
+    with urlopen(base_url + path) as response:
+        return json.load(response)
+
+
+def query_mix(base_url):
+    """Consultas representativas (ruta -> lista de URLs) según los datos cargados."""
+    countries = [row['Country'] for row in _get(base_url, '/sales?by=Country&measure=count')]
+    dates = [row['Date'] for row in _get(base_url, '/daily')]
+    customers = _get(base_url, '/customers?limit=2000')
+    return {
+        'top-products': [f'/top-products?k={k}&by={by}' for k in (5, 10, 50) for by in ('revenue', 'quantity')],
+        'customer': [f'/customer/{customer}' for customer in customers],
+        'sales': ([f'/sales?by=Hour&Country={quote(country)}&Month={month}' for country in countries[:10]
+                   for month in range(1, 13)] + ['/sales?by=Country,Month', '/sales?by=DayOfWeek,Hour']),
+        'daily': [f'/daily?start={start}&end={end}' for start, end in zip(dates[::7], dates[30::7])] or ['/daily'],
+    }
+
+
+async def _request(reader, writer, path):
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode('latin-1'))
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def _client(host, port, requests, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for route, path in requests:
+            start = time.perf_counter()
+            status = await _request(reader, writer, path)
+            latencies.append((route, status, (time.perf_counter() - start) * 1000))
+    finally:
+        writer.close()
+
+
+async def load_test(host, port, clients, n_requests, seed=0):
+    mix = query_mix(f'http://{host}:{port}')
+    rng = random.Random(seed)
+    routes = list(mix)
+    plan = [(route, rng.choice(mix[route])) for route in (rng.choice(routes) for _ in range(n_requests))]
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, plan[i::clients], latencies) for i in range(clients)))
+    return latencies, time.perf_counter() - start
+
+
+def latency_table(latencies):
+    """p50/p99/máximo (ms) por ruta y total."""
+    frame = pd.DataFrame(latencies, columns=['route', 'status', 'ms'])
+    rows = {}
+    for route, group in list(frame.groupby('route')) + [('TOTAL', frame)]:
+        rows[route] = {'requests': len(group), 'errors': int((group['status'] >= 500).sum()),
+                       'p50_ms': np.percentile(group['ms'], 50), 'p99_ms': np.percentile(group['ms'], 99),
+                       'max_ms': group['ms'].max()}
+    return pd.DataFrame.from_dict(rows, orient='index')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Prueba de carga del servicio de consultas')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--clients', type=int, default=16, help='Conexiones concurrentes')
+    parser.add_argument('--requests', type=int, default=5000, help='Consultas en total')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Archivo JSON con la tabla de latencias')
+    args = parser.parse_args(argv)
+
+    latencies, elapsed = asyncio.run(load_test(args.host, args.port, args.clients, args.requests, args.seed))
+    table = latency_table(latencies)
+    print(f"{len(latencies)} consultas con {args.clients} clientes en {elapsed:.2f} s "
+          f"({len(latencies) / elapsed:.0f} consultas/s)")
+    with pd.option_context('display.float_format', '{:.2f}'.format):
+        print(table)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump({'clients': args.clients, 'elapsed_s': elapsed, 'latency': table.to_dict(orient='index')},
+                      fh, indent=2)
+    return table
+
+
+if __name__ == '__main__':
+    main()
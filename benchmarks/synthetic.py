@@ -0,0 +1,190 @@
+# Generador sintético con el esquema Online Retail
+# ------------------------------------------------
+# Produce transacciones con las mismas columnas y distribuciones parecidas al
+# dataset UCI (escala 1x ≈ 25 900 facturas y ≈ 540 000 líneas):
+# - ~15 % de facturas de cancelación (prefijo C, pocas líneas, cantidades negativas),
+# - popularidad de países y productos muy sesgada (Reino Unido ≈ 90 % de las líneas),
+# - ~25 % de líneas sin CustomerID y algunas sin Description o con UnitPrice 0,
+# - ventas de lunes a viernes y domingo, entre las 6 y las 20 h, con pico en noviembre.
+# Las facturas se generan por bloques ordenados en el tiempo, de modo que las
+# escalas 10x y 100x se escriben sin tener todo el dataset en memoria.
+
+import os
+
+import numpy as np
+import pandas as pd
+
+UCI_INVOICES = 25_900
+UCI_CUSTOMERS = 4_372
+UCI_PRODUCTS = 4_070
+
+COLUMNS = ['InvoiceNo', 'StockCode', 'Description', 'Quantity', 'InvoiceDate', 'UnitPrice', 'CustomerID',
+           'Country']
+
+FIRST_DAY = pd.Timestamp('2010-12-01')
+LAST_DAY = pd.Timestamp('2011-12-09')
+
+# Peso relativo de cada mes (las ventas crecen hacia noviembre)
+MONTH_WEIGHTS = {12: 1.1, 1: 0.8, 2: 0.75, 3: 1.0, 4: 0.85, 5: 1.05, 6: 1.0, 7: 1.0, 8: 1.0, 9: 1.4, 10: 1.6,
+                 11: 2.1}
+
+COUNTRIES = ['United Kingdom', 'Germany', 'France', 'EIRE', 'Spain', 'Netherlands', 'Belgium', 'Switzerland',
+             'Portugal', 'Australia', 'Norway', 'Italy', 'Channel Islands', 'Finland', 'Cyprus', 'Sweden',
+             'Unspecified', 'Austria', 'Denmark', 'Japan', 'Poland', 'Israel', 'USA', 'Hong Kong', 'Singapore',
+             'Iceland', 'Canada', 'Greece', 'Malta', 'United Arab Emirates', 'European Community', 'RSA',
+             'Lebanon', 'Lithuania', 'Brazil', 'Czech Republic', 'Bahrain', 'Saudi Arabia']
+
+COLORS = ['WHITE', 'RED', 'PINK', 'BLUE', 'GREEN', 'IVORY', 'BLACK', 'VINTAGE', 'RETRO', 'PAISLEY']
+ITEMS = ['HANGING HEART T-LIGHT HOLDER', 'METAL LANTERN', 'LUNCH BAG', 'JUMBO BAG', 'PARTY BUNTING',
+         'CAKE STAND', 'ALARM CLOCK BAKELIKE', 'TEA CUP AND SAUCER', 'DOORMAT', 'HOT WATER BOTTLE',
+         'NAPKINS', 'CHRISTMAS DECORATION', 'WATER BOTTLE', 'PHOTO FRAME', 'CANDLE']
+
+# Cantidades por línea: muchas unidades sueltas y cajas de 6/12/24 unidades
+QUANTITIES = np.array([1, 2, 3, 4, 5, 6, 8, 10, 12, 16, 20, 24, 36, 48, 72, 96, 144, 288, 480, 1000])
+QUANTITY_WEIGHTS = np.array([28, 14, 6, 6, 2, 10, 3, 4, 14, 2, 2, 5, 1.5, 1, 0.6, 0.5, 0.3, 0.1, 0.05, 0.02])
+
+
+class Catalog:
+    """Productos, clientes y países de un dataset sintético (fijos para una semilla)."""
+
+    def __init__(self, scale=1.0, seed=0):
+        rng = np.random.default_rng(seed)
+        # El catálogo crece más despacio que el número de facturas
+        n_products = max(int(UCI_PRODUCTS * scale ** 0.5), 50)
+        n_customers = max(int(UCI_CUSTOMERS * scale), 50)
+
+        numbers = 10_000 + rng.choice(80_000, n_products, replace=False)
+        suffix = np.where(rng.random(n_products) < 0.12, rng.choice(list('ABCDEFGL'), n_products), '')
+        self.stock_codes = np.char.add(numbers.astype(str), suffix).astype(object)
+        self.descriptions = np.char.add(np.char.add(rng.choice(COLORS, n_products), ' '),
+                                        rng.choice(ITEMS, n_products)).astype(object)
+        self.prices = np.round(rng.lognormal(0.9, 0.9, n_products).clip(0.1, 650), 2)
+        self.product_weights = _zipf_weights(n_products, 1.0, rng)
+
+        # Cada cliente tiene un país; el 90 % son del Reino Unido
+        country_weights = _zipf_weights(len(COUNTRIES), 1.6, None)
+        country_weights[0] = 0.9 / (1 - 0.9) * country_weights[1:].sum()
+        country_weights /= country_weights.sum()
+        self.country_weights = country_weights
+        self.customer_ids = 12_346 + np.arange(n_customers)
+        self.customer_countries = rng.choice(len(COUNTRIES), n_customers, p=country_weights)
+        self.customer_weights = _zipf_weights(n_customers, 0.8, rng)
+
+
+def _zipf_weights(n, exponent, rng):
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    if rng is not None:
+        rng.shuffle(weights)
+    return weights / weights.sum()
+
+
+def _day_distribution():
+    days = pd.date_range(FIRST_DAY, LAST_DAY, freq='D')
+    weights = days.month.map(MONTH_WEIGHTS).to_numpy(dtype='float64')
+    weights[days.dayofweek == 5] = 0.0  # sin ventas en sábado
+    return days.to_numpy(), np.cumsum(weights) / weights.sum()
+
+
+def generate_chunks(scale=1.0, seed=0, invoices_per_chunk=20_000):
+    """Genera el dataset por bloques de facturas consecutivas (DataFrames)."""
+    catalog = Catalog(scale, seed)
+    rng = np.random.default_rng(seed + 1)
+    days, day_cdf = _day_distribution()
+    n_invoices = max(int(UCI_INVOICES * scale), 1)
+    n_chunks = -(-n_invoices // invoices_per_chunk)
+    next_invoice = 536_365
+
+    for chunk in range(n_chunks):
+        first = chunk * invoices_per_chunk
+        n = min(invoices_per_chunk, n_invoices - first)
+        # Fechas ordenadas dentro de la franja de tiempo que le toca al bloque
+        u = np.sort(rng.uniform(first / n_invoices, (first + n) / n_invoices, n))
+        day = days[np.searchsorted(day_cdf, u, side='right').clip(0, len(days) - 1)]
+        hour = np.rint(rng.normal(12.5, 2.2, n)).clip(6, 20).astype('int64')
+        minute = rng.integers(0, 60, n)
+        invoice_dates = day + (hour * 60 + minute).astype('timedelta64[m]')
+
+        cancelled = rng.random(n) < 0.148
+        lines = np.where(cancelled, 1 + rng.poisson(1.4, n),
+                         1 + rng.poisson(rng.lognormal(2.6, 1.0, n).clip(0, 600)))
+
+        has_customer = rng.random(n) >= 0.25
+        customer = rng.choice(len(catalog.customer_ids), n, p=catalog.customer_weights)
+        country = np.where(has_customer, catalog.customer_countries[customer],
+                           np.where(rng.random(n) < 0.95, 0, rng.choice(len(COUNTRIES), n,
+                                                                       p=catalog.country_weights)))
+        customer_ids = np.where(has_customer, catalog.customer_ids[customer], np.nan)
+
+        invoice_numbers = (next_invoice + np.arange(n)).astype(str).astype(object)
+        invoice_numbers[cancelled] = 'C' + invoice_numbers[cancelled]
+        next_invoice += n
+
+        # Expandimos facturas a líneas
+        owner = np.repeat(np.arange(n), lines)
+        n_rows = len(owner)
+        product = rng.choice(len(catalog.stock_codes), n_rows, p=catalog.product_weights)
+        quantity = rng.choice(QUANTITIES, n_rows, p=QUANTITY_WEIGHTS / QUANTITY_WEIGHTS.sum())
+        quantity = np.where(cancelled[owner], -quantity, quantity)
+        price = catalog.prices[product].copy()
+        description = catalog.descriptions[product].copy()
+
+        # Líneas de ajuste: sin descripción, precio 0 y a veces cantidad negativa
+        adjustment = rng.random(n_rows) < 0.0027
+        description[adjustment] = np.nan
+        price[adjustment] = 0.0
+        quantity = np.where(adjustment & (rng.random(n_rows) < 0.5), -quantity, quantity)
+        price[rng.random(n_rows) < 0.0020] = 0.0
+
+        row_customers = customer_ids[owner]
+        row_customers[adjustment] = np.nan
+
+        yield pd.DataFrame({
+            'InvoiceNo': invoice_numbers[owner],
+            'StockCode': catalog.stock_codes[product],
+            'Description': description,
+            'Quantity': quantity,
+            'InvoiceDate': invoice_dates[owner],
+            'UnitPrice': price,
+            'CustomerID': row_customers,
+            'Country': np.array(COUNTRIES, dtype=object)[country[owner]],
+        }, columns=COLUMNS)
+
+
+def generate(scale=1.0, seed=0):
+    """Dataset completo en memoria (para escalas pequeñas)."""
+    return pd.concat(generate_chunks(scale, seed), ignore_index=True)
+
+
+def write_dataset(path, scale=1.0, seed=0):
+    """Escribe el dataset en `path` (.csv, .parquet o .xlsx) y devuelve el número de filas."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.xlsx':
+        df = generate(scale, seed)
+        if len(df) >= 1_048_576:
+            raise ValueError(f"{len(df)} filas no caben en una hoja de Excel; use .csv o .parquet")
+        df.to_excel(path, index=False)
+        return len(df)
+
+    tmp_path = path + '.tmp'
+    rows = 0
+    writer = None
+    try:
+        for position, chunk in enumerate(generate_chunks(scale, seed)):
+            if extension == '.parquet':
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, table.schema)
+                writer.write_table(table)
+            else:
+                chunk.to_csv(tmp_path, mode='w' if position == 0 else 'a', header=position == 0, index=False,
+                             date_format='%Y-%m-%d %H:%M:%S')
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(tmp_path, path)
+    return rows
@@ -2,653 +2,375 @@
 # ------------------------------------------------------
 
 # Importamos las bibliotecas necesarias
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from datetime import datetime
+import argparse
+import sys
+import time
 import warnings
-warnings.filterwarnings('ignore')
-
-def print_hi(name):
-    # Use a breakpoint in the code line below to debug your script.
-    print(f'Hi, {name}')  # Press Ctrl+F8 to toggle the breakpoint.
-
-    # Configuramos el estilo de las visualizaciones
-    plt.style.use('ggplot')
-    sns.set(style="whitegrid")
-    plt.rcParams['figure.figsize'] = (12, 8)
-    plt.rcParams['font.size'] = 12
-
-    # 1. Carga de datos
-    # -----------------
-    print("1. CARGA Y VISTA PREVIA DE DATOS")
-    print("-" * 50)
-
-    # Cargamos el archivo Excel
-    df = pd.read_excel('./dataset/Online_Retail.xlsx')
-
-    # Mostramos información básica del dataset
-    print(f"Dimensiones del dataset: {df.shape[0]} filas y {df.shape[1]} columnas")
-    print("\nPrimeras 5 filas:")
-    print(df.head())
-
-    print("\nInformación de las columnas:")
-    print(df.info())
-
-    print("\nEstadísticas descriptivas:")
-    print(df.describe())
 
-    print("\nValores nulos por columna:")
-    print(df.isnull().sum())
-    print(f"Porcentaje de valores nulos en CustomerID: {df['CustomerID'].isnull().mean() * 100:.2f}%")
-
-    # 2. Limpieza de datos
-    # -------------------
-    print("\n\n2. LIMPIEZA DE DATOS")
-    print("-" * 50)
-
-    # Hacemos una copia para no modificar los datos originales
-    df_clean = df.copy()
-
-    # Eliminamos filas con valores nulos en Description
-    df_clean = df_clean.dropna(subset=['Description'])
+import pandas as pd
 
-    # Filtrar valores negativos en Quantity (posibles devoluciones)
-    print(f"Registros con cantidad negativa (posibles devoluciones): {(df_clean['Quantity'] < 0).sum()}")
+from retail.basket import MIN_SUPPORT
+from retail.cache import file_fingerprint, read_source
+from retail.cohorts import retention
+from retail.config import DATASET_PATH, STAGE_CACHE_DIR, TABLES_DIR
+from retail.cube import MEASURES, Cube, parse_labels
+from retail.customer_index import CustomerIndex
+from retail.export import EXPORT_FORMATS, export_tables
+from retail.incremental import update_and_render, verify_against_full
+from retail.instrumentation import Tracer, max_rss_mb
+from retail.parallel import PARTITION_KEYS
+from retail.rfm import RFMState, score_rfm
+from retail.service import DEFAULT_HOST, DEFAULT_PORT, run_service
+from retail.stages import build_pipeline
+from retail.streaming import DEFAULT_CHUNK_SIZE, aggregate_stream, clean_chunk
+from retail.timeseries import TimeSeries, trend_label
 
-    # Filtramos facturas de cancelación (comienzan con C)
-    print(f"Facturas de cancelación: {df_clean['InvoiceNo'].astype(str).str.startswith('C').sum()}")
+warnings.filterwarnings('ignore')
 
-    # Creamos un dataframe de trabajo para análisis (eliminar cancelaciones y cantidades negativas)
-    df_analysis = df_clean[(~df_clean['InvoiceNo'].astype(str).str.startswith('C')) &
-                           (df_clean['Quantity'] > 0) &
-                           (df_clean['UnitPrice'] > 0)]
+# Etapas que componen el informe completo, en orden de impresión
+REPORT_STAGES = ['overview', 'clean', 'univariate', 'bivariate', 'customers', 'rfm_state', 'cube', 'service_tables',
+                 'products', 'basket', 'patterns', 'timeseries', 'segmentation', 'conclusions', 'render']
 
-    print(f"Dimensiones después de la limpieza: {df_analysis.shape[0]} filas y {df_analysis.shape[1]} columnas")
+def print_hi(name, rebuild_cache=False, use_cache=True, stages=None, stage_cache=False, render_workers=None,
+             trace=None, chrome_trace=None, profile_stage=None, parallel=None, workers=None, reject_path=None,
+             basket_support=MIN_SUPPORT, basket_itemsets=False, source=DATASET_PATH, ingest_workers=None):
+    # Use a breakpoint in the code line below to debug your script.
+    print(f'Hi, {name}')  # Press Ctrl+F8 to toggle the breakpoint.
 
-    # Convertimos la fecha a datetime si no lo está
-    if not pd.api.types.is_datetime64_any_dtype(df_analysis['InvoiceDate']):
-        df_analysis['InvoiceDate'] = pd.to_datetime(df_analysis['InvoiceDate'])
+    # El análisis es un grafo de etapas (ver retail/stages.py): pedir una etapa
+    # ejecuta solo lo que necesita y cada resultado se calcula una única vez.
+    # Con --trace/--chrome-trace/--profile-stage cada etapa se mide al ejecutarse
+    # `source` es el Excel del proyecto o la lista de --data (varios libros,
+    # hojas o CSV que se leen en paralelo, ver retail/ingest.py)
+    tracer = Tracer(profile_stage=profile_stage) if trace or chrome_trace or profile_stage else None
+    pipeline = build_pipeline(source, rebuild_cache=rebuild_cache, use_cache=use_cache,
+                              stage_cache_dir=STAGE_CACHE_DIR if stage_cache else None,
+                              render_workers=render_workers, tracer=tracer, parallel=parallel, workers=workers,
+                              reject_path=reject_path, basket_support=basket_support,
+                              basket_itemsets=basket_itemsets, ingest_workers=ingest_workers)
+    try:
+        pipeline.run_all(stages or REPORT_STAGES)
+    finally:
+        if tracer is not None:
+            tracer.close()
+    if tracer is not None:
+        print("\nTiempo y memoria por etapa:")
+        with pd.option_context('display.width', 200, 'display.max_columns', None):
+            print(tracer.summary().round(3))
+        if trace:
+            tracer.write_json(trace)
+        if chrome_trace:
+            tracer.write_chrome_trace(chrome_trace)
 
-    # Extraemos componentes de la fecha
-    df_analysis['Year'] = df_analysis['InvoiceDate'].dt.year
-    df_analysis['Month'] = df_analysis['InvoiceDate'].dt.month
-    df_analysis['Day'] = df_analysis['InvoiceDate'].dt.day
-    df_analysis['DayOfWeek'] = df_analysis['InvoiceDate'].dt.dayofweek
-    df_analysis['Hour'] = df_analysis['InvoiceDate'].dt.hour
+    print("\nAnálisis Exploratorio de Datos completado!")
 
-    # Calculamos el valor total de cada transacción
-    df_analysis['TotalAmount'] = df_analysis['Quantity'] * df_analysis['UnitPrice']
 
-    # 3. Análisis Univariado
-    # ----------------------
-    print("\n\n3. ANÁLISIS UNIVARIADO")
+def print_numbers(rebuild_cache=False, use_cache=True, stage_cache=False, export_dir=TABLES_DIR,
+                  export_format='json', parallel=None, workers=None, reject_path=None,
+                  basket_support=MIN_SUPPORT, basket_itemsets=False, source=DATASET_PATH, ingest_workers=None):
+    # Modo solo números: las mismas secciones sin la etapa render, de modo que
+    # nunca se importan matplotlib ni seaborn; las tablas se guardan en JSON/CSV
+    start = time.perf_counter()
+    pipeline = build_pipeline(source, rebuild_cache=rebuild_cache, use_cache=use_cache,
+                              stage_cache_dir=STAGE_CACHE_DIR if stage_cache else None, parallel=parallel,
+                              workers=workers, reject_path=reject_path, basket_support=basket_support,
+                              basket_itemsets=basket_itemsets, ingest_workers=ingest_workers)
+    results = pipeline.run_all([stage for stage in REPORT_STAGES if stage != 'render'] + ['tables'])
+    paths = export_tables(results['tables'], export_dir, export_format)
+
+    print(f"\nTablas guardadas: {', '.join(paths)}")
+    plotting = [module for module in ('matplotlib', 'seaborn') if module in sys.modules]
+    print(f"Tiempo: {time.perf_counter() - start:.2f} s - memoria máxima: {max_rss_mb():.0f} MB - "
+          f"bibliotecas de gráficos cargadas: {', '.join(plotting) or 'ninguna'}")
+
+
+def print_streaming_report(path, chunk_size=DEFAULT_CHUNK_SIZE, hll_precision=None, heavy_hitters=None):
+    # Modo por bloques: el archivo se recorre en bloques de `chunk_size` filas y
+    # solo se conservan agregados, por lo que no se generan los gráficos de
+    # distribución (necesitan las filas individuales).
+    print(f"ANÁLISIS POR BLOQUES DE {path} (bloques de {chunk_size} filas)")
     print("-" * 50)
 
-    # 3.1 Variables Categóricas
-    print("\n3.1 ANÁLISIS DE VARIABLES CATEGÓRICAS")
+    partial = aggregate_stream(path, chunk_size, hll_precision, heavy_hitters)
+    results = partial.finalize()
+    print(f"Filas leídas: {partial.rows_in}")
+    print(f"Filas después de la limpieza: {partial.rows_clean}")
+    print("\nFilas descartadas por regla:")
+    print(partial.rejects.set_index('regla'))
 
-    # País
     print("\nDistribución por país:")
-    country_counts = df_analysis['Country'].value_counts()
-    print(country_counts.head(10))
-    print(f"Número total de países: {len(country_counts)}")
-
-    plt.figure(figsize=(14, 8))
-    country_plot = country_counts.head(10).plot(kind='bar')
-    plt.title('Top 10 Países por Número de Transacciones')
-    plt.xlabel('País')
-    plt.ylabel('Número de Transacciones')
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.savefig('./imagenes/top_10_paises.png')
-
-    # StockCode
+    print(results.country_counts.head(10))
+    print(f"Número total de países: {len(results.country_counts)}")
+
     print("\nProductos más comunes:")
-    stock_counts = df_analysis['StockCode'].value_counts()
-    print(stock_counts.head(10))
-
-    # 3.2 Variables Numéricas
-    print("\n3.2 ANÁLISIS DE VARIABLES NUMÉRICAS")
-
-    # Quantity
-    print("\nEstadísticas de Quantity:")
-    print(df_analysis['Quantity'].describe())
-
-    plt.figure(figsize=(14, 6))
-    plt.subplot(1, 2, 1)
-    sns.histplot(df_analysis['Quantity'].clip(0, 50), bins=50, kde=True)
-    plt.title('Distribución de Cantidad (limitado a 50)')
-    plt.xlabel('Cantidad')
-
-    plt.subplot(1, 2, 2)
-    sns.boxplot(y=df_analysis['Quantity'].clip(0, 50))
-    plt.title('Boxplot de Cantidad (limitado a 50)')
-    plt.tight_layout()
-    plt.savefig('./imagenes/distribucion_cantidad.png')
-
-    # UnitPrice
-    print("\nEstadísticas de UnitPrice:")
-    print(df_analysis['UnitPrice'].describe())
-
-    plt.figure(figsize=(14, 6))
-    plt.subplot(1, 2, 1)
-    sns.histplot(df_analysis['UnitPrice'].clip(0, 100), bins=50, kde=True)
-    plt.title('Distribución de Precio Unitario (limitado a 100)')
-    plt.xlabel('Precio Unitario')
-
-    plt.subplot(1, 2, 2)
-    sns.boxplot(y=df_analysis['UnitPrice'].clip(0, 100))
-    plt.title('Boxplot de Precio Unitario (limitado a 100)')
-    plt.tight_layout()
-    plt.savefig('./imagenes/distribucion_precio.png')
-
-    # TotalAmount
-    print("\nEstadísticas de TotalAmount:")
-    print(df_analysis['TotalAmount'].describe())
-
-    plt.figure(figsize=(14, 6))
-    plt.subplot(1, 2, 1)
-    sns.histplot(df_analysis['TotalAmount'].clip(0, 500), bins=50, kde=True)
-    plt.title('Distribución de Monto Total (limitado a 500)')
-    plt.xlabel('Monto Total')
-
-    plt.subplot(1, 2, 2)
-    sns.boxplot(y=df_analysis['TotalAmount'].clip(0, 500))
-    plt.title('Boxplot de Monto Total (limitado a 500)')
-    plt.tight_layout()
-    plt.savefig('./imagenes/distribucion_monto_total.png')
-
-    # 3.3 Variables Temporales
-    print("\n3.3 ANÁLISIS DE VARIABLES TEMPORALES")
-
-    # Ventas por mes
-    monthly_sales = df_analysis.groupby('Month')['TotalAmount'].sum().reindex(range(1, 13))
-    print("\nVentas totales por mes:")
-    print(monthly_sales)
-
-    plt.figure(figsize=(12, 6))
-    monthly_sales.plot(kind='bar')
-    plt.title('Ventas Totales por Mes')
-    plt.xlabel('Mes')
-    plt.ylabel('Ventas Totales')
-    plt.xticks(range(12), ['Ene', 'Feb', 'Mar', 'Abr', 'May', 'Jun', 'Jul', 'Ago', 'Sep', 'Oct', 'Nov', 'Dic'])
-    plt.tight_layout()
-    plt.savefig('./imagenes/ventas_por_mes.png')
-
-    # Ventas por día de la semana
-    weekday_sales = df_analysis.groupby('DayOfWeek')['TotalAmount'].sum()
-    print("\nVentas totales por día de la semana:")
-    print(weekday_sales)
-
-    plt.figure(figsize=(12, 6))
-    weekday_sales.plot(kind='bar')
-    plt.title('Ventas Totales por Día de la Semana')
-    plt.xlabel('Día de la Semana')
-    plt.ylabel('Ventas Totales')
-    plt.xticks(range(7), ['Lun', 'Mar', 'Mié', 'Jue', 'Vie', 'Sáb', 'Dom'])
-    plt.tight_layout()
-    plt.savefig('./imagenes/ventas_por_dia_semana.png')
-
-    # Ventas por hora
-    hourly_sales = df_analysis.groupby('Hour')['TotalAmount'].sum()
-    print("\nVentas totales por hora del día:")
-    print(hourly_sales)
-
-    plt.figure(figsize=(12, 6))
-    hourly_sales.plot(kind='bar')
-    plt.title('Ventas Totales por Hora del Día')
-    plt.xlabel('Hora')
-    plt.ylabel('Ventas Totales')
-    plt.tight_layout()
-    plt.savefig('./imagenes/ventas_por_hora.png')
-
-    # 3. Análisis Univariado
-    # ----------------------
-    print("\n\n3. ANÁLISIS UNIVARIADO")
-    print("-" * 50)
+    print(results.stock_counts.head(10))
 
-    # 3.1 Variables Categóricas
-    print("\n3.1 ANÁLISIS DE VARIABLES CATEGÓRICAS")
+    for col in ['Quantity', 'UnitPrice', 'TotalAmount']:
+        print(f"\nEstadísticas de {col}:")
+        print(partial.describe(col))
 
-    # País
-    print("\nDistribución por país:")
-    country_counts = df_analysis['Country'].value_counts()
-    print(country_counts.head(10))
-    print(f"Número total de países: {len(country_counts)}")
-
-    plt.figure(figsize=(14, 8))
-    country_plot = country_counts.head(10).plot(kind='bar')
-    plt.title('Top 10 Países por Número de Transacciones')
-    plt.xlabel('País')
-    plt.ylabel('Número de Transacciones')
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.savefig('./imagenes/top_10_paises.png')
-
-    # StockCode
-    print("\nProductos más comunes:")
-    stock_counts = df_analysis['StockCode'].value_counts()
-    print(stock_counts.head(10))
-
-    # 3.2 Variables Numéricas
-    print("\n3.2 ANÁLISIS DE VARIABLES NUMÉRICAS")
-
-    # Quantity
-    print("\nEstadísticas de Quantity:")
-    print(df_analysis['Quantity'].describe())
-
-    plt.figure(figsize=(14, 6))
-    plt.subplot(1, 2, 1)
-    sns.histplot(df_analysis['Quantity'].clip(0, 50), bins=50, kde=True)
-    plt.title('Distribución de Cantidad (limitado a 50)')
-    plt.xlabel('Cantidad')
-
-    plt.subplot(1, 2, 2)
-    sns.boxplot(y=df_analysis['Quantity'].clip(0, 50))
-    plt.title('Boxplot de Cantidad (limitado a 50)')
-    plt.tight_layout()
-    plt.savefig('./imagenes/distribucion_cantidad.png')
-
-    # UnitPrice
-    print("\nEstadísticas de UnitPrice:")
-    print(df_analysis['UnitPrice'].describe())
-
-    plt.figure(figsize=(14, 6))
-    plt.subplot(1, 2, 1)
-    sns.histplot(df_analysis['UnitPrice'].clip(0, 100), bins=50, kde=True)
-    plt.title('Distribución de Precio Unitario (limitado a 100)')
-    plt.xlabel('Precio Unitario')
-
-    plt.subplot(1, 2, 2)
-    sns.boxplot(y=df_analysis['UnitPrice'].clip(0, 100))
-    plt.title('Boxplot de Precio Unitario (limitado a 100)')
-    plt.tight_layout()
-    plt.savefig('./imagenes/distribucion_precio.png')
-
-    # TotalAmount
-    print("\nEstadísticas de TotalAmount:")
-    print(df_analysis['TotalAmount'].describe())
-
-    plt.figure(figsize=(14, 6))
-    plt.subplot(1, 2, 1)
-    sns.histplot(df_analysis['TotalAmount'].clip(0, 500), bins=50, kde=True)
-    plt.title('Distribución de Monto Total (limitado a 500)')
-    plt.xlabel('Monto Total')
-
-    plt.subplot(1, 2, 2)
-    sns.boxplot(y=df_analysis['TotalAmount'].clip(0, 500))
-    plt.title('Boxplot de Monto Total (limitado a 500)')
-    plt.tight_layout()
-    plt.savefig('./imagenes/distribucion_monto_total.png')
-
-    # 3.3 Variables Temporales
-    print("\n3.3 ANÁLISIS DE VARIABLES TEMPORALES")
-
-    # Ventas por mes
-    monthly_sales = df_analysis.groupby('Month')['TotalAmount'].sum().reindex(range(1, 13))
     print("\nVentas totales por mes:")
-    print(monthly_sales)
-
-    plt.figure(figsize=(12, 6))
-    monthly_sales.plot(kind='bar')
-    plt.title('Ventas Totales por Mes')
-    plt.xlabel('Mes')
-    plt.ylabel('Ventas Totales')
-    plt.xticks(range(12), ['Ene', 'Feb', 'Mar', 'Abr', 'May', 'Jun', 'Jul', 'Ago', 'Sep', 'Oct', 'Nov', 'Dic'])
-    plt.tight_layout()
-    plt.savefig('./imagenes/ventas_por_mes.png')
-
-    # Ventas por día de la semana
-    weekday_sales = df_analysis.groupby('DayOfWeek')['TotalAmount'].sum()
+    print(results.monthly_sales)
     print("\nVentas totales por día de la semana:")
-    print(weekday_sales)
-
-    plt.figure(figsize=(12, 6))
-    weekday_sales.plot(kind='bar')
-    plt.title('Ventas Totales por Día de la Semana')
-    plt.xlabel('Día de la Semana')
-    plt.ylabel('Ventas Totales')
-    plt.xticks(range(7), ['Lun', 'Mar', 'Mié', 'Jue', 'Vie', 'Sáb', 'Dom'])
-    plt.tight_layout()
-    plt.savefig('./imagenes/ventas_por_dia_semana.png')
-
-    # Ventas por hora
-    hourly_sales = df_analysis.groupby('Hour')['TotalAmount'].sum()
+    print(results.weekday_sales)
     print("\nVentas totales por hora del día:")
-    print(hourly_sales)
-
-    plt.figure(figsize=(12, 6))
-    hourly_sales.plot(kind='bar')
-    plt.title('Ventas Totales por Hora del Día')
-    plt.xlabel('Hora')
-    plt.ylabel('Ventas Totales')
-    plt.tight_layout()
-    plt.savefig('./imagenes/ventas_por_hora.png')
-
-    # 4. Análisis Bivariado
-    # ---------------------
-    print("\n\n4. ANÁLISIS BIVARIADO")
-    print("-" * 50)
-
-    # 4.1 Relación entre País y Ventas
-    country_sales = df_analysis.groupby('Country')['TotalAmount'].sum().sort_values(ascending=False)
-    print("\n4.1 Top 10 países por ventas totales:")
-    print(country_sales.head(10))
-
-    plt.figure(figsize=(14, 8))
-    country_sales.head(10).plot(kind='bar')
-    plt.title('Top 10 Países por Ventas Totales')
-    plt.xlabel('País')
-    plt.ylabel('Ventas Totales')
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.savefig('./imagenes/top_10_paises_ventas.png')
-
-    # 4.2 Relación entre Mes y Cantidad vendida
-    monthly_quantity = df_analysis.groupby('Month')['Quantity'].sum().reindex(range(1, 13))
-    print("\n4.2 Cantidad total vendida por mes:")
-    print(monthly_quantity)
-
-    plt.figure(figsize=(12, 6))
-    monthly_quantity.plot(kind='line', marker='o')
-    plt.title('Cantidad Total Vendida por Mes')
-    plt.xlabel('Mes')
-    plt.ylabel('Cantidad Total')
-    plt.xticks(range(1, 13), ['Ene', 'Feb', 'Mar', 'Abr', 'May', 'Jun', 'Jul', 'Ago', 'Sep', 'Oct', 'Nov', 'Dic'])
-    plt.grid(True)
-    plt.tight_layout()
-    plt.savefig('./imagenes/cantidad_por_mes.png')
-
-    # 4.3 Heatmap de correlación
-    print("\n4.3 Matriz de correlación entre variables numéricas:")
-    numeric_cols = ['Quantity', 'UnitPrice', 'TotalAmount', 'Year', 'Month', 'Day', 'DayOfWeek', 'Hour']
-    correlation = df_analysis[numeric_cols].corr()
-    print(correlation)
-
-    plt.figure(figsize=(12, 10))
-    sns.heatmap(correlation, annot=True, cmap='coolwarm', fmt='.2f')
-    plt.title('Matriz de Correlación')
-    plt.tight_layout()
-    plt.savefig('./imagenes/matriz_correlacion.png')
-
-    # 5. Análisis de Clientes
-    # -----------------------
-    print("\n\n5. ANÁLISIS DE CLIENTES")
-    print("-" * 50)
-
-    # Solo analizamos clientes con CustomerID válido
-    df_customers = df_analysis.dropna(subset=['CustomerID'])
-    df_customers['CustomerID'] = df_customers['CustomerID'].astype(int)
-
-    # 5.1 Número de transacciones por cliente
-    customer_transactions = df_customers.groupby('CustomerID')['InvoiceNo'].nunique()
-    print("\n5.1 Estadísticas de transacciones por cliente:")
-    print(customer_transactions.describe())
-
-    plt.figure(figsize=(14, 6))
-    plt.subplot(1, 2, 1)
-    sns.histplot(customer_transactions.clip(0, 50), bins=50, kde=True)
-    plt.title('Distribución de Transacciones por Cliente')
-    plt.xlabel('Número de Transacciones')
-
-    plt.subplot(1, 2, 2)
-    sns.boxplot(y=customer_transactions.clip(0, 50))
-    plt.title('Boxplot de Transacciones por Cliente')
-    plt.tight_layout()
-    plt.savefig('./imagenes/transacciones_por_cliente.png')
-
-    # 5.2 Total gastado por cliente
-    customer_spending = df_customers.groupby('CustomerID')['TotalAmount'].sum()
-    print("\n5.2 Estadísticas de gasto total por cliente:")
-    print(customer_spending.describe())
-
-    plt.figure(figsize=(14, 6))
-    plt.subplot(1, 2, 1)
-    sns.histplot(customer_spending.clip(0, 10000), bins=50, kde=True)
-    plt.title('Distribución de Gasto Total por Cliente')
-    plt.xlabel('Gasto Total')
-
-    plt.subplot(1, 2, 2)
-    sns.boxplot(y=customer_spending.clip(0, 10000))
-    plt.title('Boxplot de Gasto Total por Cliente')
-    plt.tight_layout()
-    plt.savefig('./imagenes/gasto_por_cliente.png')
-
-    # 5.3 RFM (Recency, Frequency, Monetary) Analysis
-    # Determinamos la fecha más reciente en el dataset
-    max_date = df_customers['InvoiceDate'].max()
-
-    # Para cada cliente calculamos:
-    # - Recency: días desde la última compra
-    # - Frequency: número de transacciones
-    # - Monetary: gasto total
-
-    rfm = df_customers.groupby('CustomerID').agg({
-        'InvoiceDate': lambda x: (max_date - x.max()).days,  # Recency
-        'InvoiceNo': 'nunique',  # Frequency
-        'TotalAmount': 'sum'  # Monetary
-    }).rename(columns={
-        'InvoiceDate': 'Recency',
-        'InvoiceNo': 'Frequency',
-        'TotalAmount': 'Monetary'
-    })
-
-    print("\n5.3 Análisis RFM - Primeros 10 clientes:")
-    print(rfm.head(10))
-
-    # Visualizar distribución de RFM
-    plt.figure(figsize=(18, 6))
-
-    plt.subplot(1, 3, 1)
-    sns.histplot(rfm['Recency'].clip(0, 365), bins=50, kde=True)
-    plt.title('Distribución de Recency (días)')
-    plt.xlabel('Días desde última compra')
-
-    plt.subplot(1, 3, 2)
-    sns.histplot(rfm['Frequency'].clip(0, 100), bins=50, kde=True)
-    plt.title('Distribución de Frequency')
-    plt.xlabel('Número de Transacciones')
-
-    plt.subplot(1, 3, 3)
-    sns.histplot(rfm['Monetary'].clip(0, 10000), bins=50, kde=True)
-    plt.title('Distribución de Monetary')
-    plt.xlabel('Gasto Total')
-
-    plt.tight_layout()
-    plt.savefig('./imagenes/analisis_rfm.png')
-
-    # 6. Análisis de Productos
-    # ------------------------
-    print("\n\n6. ANÁLISIS DE PRODUCTOS")
-    print("-" * 50)
-
-    # 6.1 Productos más vendidos por cantidad
-    top_products_quantity = df_analysis.groupby(['StockCode', 'Description'])['Quantity'].sum().sort_values(
-        ascending=False)
-    print("\n6.1 Top 10 productos más vendidos por cantidad:")
-    print(top_products_quantity.head(10))
-
-    # 6.2 Productos más vendidos por ingresos totales
-    top_products_revenue = df_analysis.groupby(['StockCode', 'Description'])['TotalAmount'].sum().sort_values(
-        ascending=False)
-    print("\n6.2 Top 10 productos más vendidos por ingresos:")
-    print(top_products_revenue.head(10))
-
-    # Visualizar top productos por ingresos
-    plt.figure(figsize=(14, 8))
-    top_products_revenue.head(10).plot(kind='bar')
-    plt.title('Top 10 Productos por Ingresos Totales')
-    plt.xlabel('(StockCode, Descripción)')
-    plt.ylabel('Ingresos Totales')
-    plt.xticks(rotation=90)
-    plt.tight_layout()
-    plt.savefig('./imagenes/top_10_productos_ingresos.png')
-
-    # 7. Análisis de Patrones de Compra
-    # ---------------------------------
-    print("\n\n7. ANÁLISIS DE PATRONES DE COMPRA")
-    print("-" * 50)
-
-    # 7.1 Tamaño promedio de la orden (items por factura)
-    order_size = df_analysis.groupby('InvoiceNo')['Quantity'].sum()
-    print("\n7.1 Estadísticas de tamaño de orden (items por factura):")
-    print(order_size.describe())
-
-    plt.figure(figsize=(14, 6))
-    plt.subplot(1, 2, 1)
-    sns.histplot(order_size.clip(0, 100), bins=50, kde=True)
-    plt.title('Distribución de Tamaño de Orden')
-    plt.xlabel('Cantidad de Items')
-
-    plt.subplot(1, 2, 2)
-    sns.boxplot(y=order_size.clip(0, 100))
-    plt.title('Boxplot de Tamaño de Orden')
-    plt.tight_layout()
-    plt.savefig('./imagenes/tamaño_orden.png')
-
-    # 7.2 Valor promedio de la orden
-    order_value = df_analysis.groupby('InvoiceNo')['TotalAmount'].sum()
-    print("\n7.2 Estadísticas de valor de orden:")
-    print(order_value.describe())
-
-    plt.figure(figsize=(14, 6))
-    plt.subplot(1, 2, 1)
-    sns.histplot(order_value.clip(0, 1000), bins=50, kde=True)
-    plt.title('Distribución de Valor de Orden')
-    plt.xlabel('Valor Total')
-
-    plt.subplot(1, 2, 2)
-    sns.boxplot(y=order_value.clip(0, 1000))
-    plt.title('Boxplot de Valor de Orden')
-    plt.tight_layout()
-    plt.savefig('./imagenes/valor_orden.png')
-
-    # 8. Series temporales y análisis de tendencias
-    # --------------------------------------------
-    print("\n\n8. ANÁLISIS DE SERIES TEMPORALES")
-    print("-" * 50)
-
-    # Agrupamos por fecha completa
-    df_analysis['Date'] = df_analysis['InvoiceDate'].dt.date
-    daily_sales = df_analysis.groupby('Date')['TotalAmount'].sum()
-
-    print("\n8.1 Estadísticas de ventas diarias:")
-    print(daily_sales.describe())
-
-    # Gráfico de serie temporal
-    plt.figure(figsize=(16, 8))
-    daily_sales.plot(kind='line')
-    plt.title('Ventas Diarias a lo Largo del Tiempo')
-    plt.xlabel('Fecha')
-    plt.ylabel('Ventas Totales')
-    plt.grid(True)
-    plt.tight_layout()
-    plt.savefig('./imagenes/serie_temporal_ventas.png')
-
-    # 9. Segmentación de Clientes
-    # --------------------------
-    print("\n\n9. SEGMENTACIÓN DE CLIENTES")
-    print("-" * 50)
+    print(results.hourly_sales)
+
+    print("\nTop 10 países por ventas totales:")
+    print(results.country_sales.head(10))
+    print("\nCantidad total vendida por mes:")
+    print(results.monthly_quantity)
+    print("\nMatriz de correlación entre variables numéricas:")
+    print(results.correlation)
+
+    if hll_precision is not None:
+        # Facturas distintas aproximadas con HyperLogLog (ver retail/sketches.py)
+        memory = sum(hll.memory_bytes() for hll in partial.distinct.values())
+        print(f"\nFacturas distintas con HyperLogLog (p={hll_precision}, {memory / 1024:.0f} KB de registros)")
+        print("\nTop 10 países por número de facturas:")
+        print(partial.distinct_invoices('country_invoices').sort_values(ascending=False).head(10))
+        print("\nTop 10 productos por número de facturas:")
+        print(partial.distinct_invoices('product_invoices').sort_values(ascending=False).head(10))
+
+    print("\nEstadísticas de transacciones por cliente:")
+    print(results.customer_transactions.describe())
+    print("\nEstadísticas de gasto total por cliente:")
+    print(results.customer_spending.describe())
+    print("\nAnálisis RFM - Primeros 10 clientes:")
+    print(results.rfm.head(10))
+    print("\nRetención por cohorte mensual (% de clientes activos k meses después):")
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print((retention(results.cohort_counts) * 100).round(1).rename(index=lambda month: month.strftime('%Y-%m')))
+    print("\nSegmentación de clientes por categoría RFM (quintiles aproximados):")
+    print(score_rfm(results.rfm, approximate=True)['Customer_Category'].value_counts())
+
+    print("\nTop 10 productos más vendidos por cantidad:")
+    print(results.top_products_quantity.head(10))
+    print("\nTop 10 productos más vendidos por ingresos:")
+    print(results.top_products_revenue.head(10))
+    if heavy_hitters is not None:
+        # Cotas de los rankings de SpaceSaving: el peso real está entre lower y count
+        for name, label in [('product_quantity', 'cantidad'), ('product_revenue', 'ingresos')]:
+            summary = partial.heavy[name]
+            print(f"\nHeavy hitters por {label} (capacidad {heavy_hitters}, "
+                  f"{summary.memory_bytes() / 1024:.0f} KB, peso máximo de un producto no vigilado: "
+                  f"{summary.floor:.0f}):")
+            print(summary.top(10).round(2))
+
+    print("\nEstadísticas de tamaño de orden (items por factura):")
+    print(results.order_size.describe())
+    print("\nEstadísticas de valor de orden:")
+    print(results.order_value.describe())
+
+    print("\nEstadísticas de ventas diarias:")
+    print(results.daily_sales.describe())
+    trend = TimeSeries(results.sales_timeline).trend()
+    print(f"\nTendencia de las ventas: {trend_label(trend)} ({trend['slope']:+.2f} por día)")
+
+    print("\nAnálisis por bloques completado!")
+
+
+def print_rfm_update(path):
+    # Actualiza el estado RFM persistido con las facturas de un archivo nuevo y
+    # recalcula los segmentos de la sección 9 sin recorrer el histórico
+    if not RFMState.exists():
+        print("No hay estado RFM guardado: ejecute primero el análisis completo (python main.py).")
+        return
+    state = RFMState.load()
+    affected = state.update(clean_chunk(read_source(path)), fingerprint=file_fingerprint(path)['sha256'])
+    if affected is None:
+        print(f"{path} ya se había incorporado al estado RFM; no se modifica.")
+        return
+    state.save()
+    print(f"Clientes actualizados con {path}: {len(affected)} (total: {len(state.customers)})")
+
+    rfm = score_rfm(state.rfm())
+    print("\nSegmentación de clientes por categoría RFM:")
+    print(rfm['Customer_Category'].value_counts())
+
+
+def print_cube_query(by, where=None, measure='TotalAmount'):
+    # Consulta sobre el cubo guardado: filtros DIMENSION=ETIQUETA (varias
+    # etiquetas separadas por comas) y suma de la medida por las dimensiones `by`
+    if not Cube.exists():
+        print("No hay cubo guardado: ejecute primero el análisis completo (python main.py).")
+        return
+    start = time.perf_counter()
+    cube = Cube.load()
+    filters = {}
+    for condition in where or []:
+        dimension, _, labels = condition.partition('=')
+        filters[dimension] = parse_labels(labels)
+    try:
+        result = cube.query(measure, by, **filters)
+    except KeyError as error:
+        print(error.args[0])
+        return
+    elapsed = (time.perf_counter() - start) * 1000
+
+    description = ', '.join(f'{dimension}={labels}' for dimension, labels in filters.items()) or 'todo el cubo'
+    print(f"{measure} por {', '.join(by) or '(total)'} - {description}:")
+    with pd.option_context('display.max_rows', None):
+        print(result)
+    print(f"\nConsulta resuelta en {elapsed:.1f} ms")
+
+
+def print_customer(customer_id):
+    # Historial de un cliente desde el índice guardado por la sección 5: sus
+    # filas son un corte contiguo de los arrays, sin recorrer las transacciones
+    if not CustomerIndex.exists():
+        print("No hay índice de clientes guardado: ejecute primero el análisis completo (python main.py).")
+        return
+    start = time.perf_counter()
+    index = CustomerIndex.load()
+    try:
+        history = index.history(customer_id)
+    except KeyError as error:
+        print(error.args[0])
+        return
+    elapsed = (time.perf_counter() - start) * 1000
+
+    print(f"Cliente {customer_id}: {len(history)} transacciones")
+    print("\nEntradas del RFM:")
+    print(index.rfm_inputs(customer_id))
+    print("\nFacturas:")
+    with pd.option_context('display.max_rows', None):
+        print(index.invoices(customer_id))
+    print("\nGasto por mes:")
+    print(index.spend_over_time(customer_id))
+    print(f"\nHistorial leído en {elapsed:.1f} ms")
+
+
+def print_incremental_update(paths, chunk_size=DEFAULT_CHUNK_SIZE, render_workers=None):
+    # Incorpora archivos nuevos al estado agregado de cache/incremental y solo
+    # regenera los gráficos cuyas tablas cambiaron
+    results = None
+    for path in paths:
+        outcome = update_and_render(path, chunk_size=chunk_size, workers=render_workers)
+        if outcome is None:
+            print(f"{path}: ya estaba incorporado, se omite.")
+            continue
+        changed, images, results = outcome
+        print(f"{path}: tablas actualizadas: {', '.join(changed)}")
+        print(f"Gráficos regenerados: {len(images)}")
+        for image in images:
+            print(f"  - {image}")
+
+    if results is None:
+        return
+    print("\nVentas totales por mes:")
+    print(results.monthly_sales)
+    print(f"\nFacturas: {len(results.order_value)} - Clientes: {len(results.rfm)}")
+    print(f"Valor promedio de orden: £{results.order_value.mean():.2f}")
 
-    # Creamos segmentos basados en RFM
-    # Dividimos cada métrica RFM en 5 segmentos
-    rfm['R_Segment'] = pd.qcut(rfm['Recency'], 5, labels=[5, 4, 3, 2, 1],
-                               duplicates='drop')  # 5 es lo mejor (compra reciente)
 
-    # Para frequency, manejamos los duplicados con 'drop' o usamos rangos manuales si es necesario
-    try:
-        rfm['F_Segment'] = pd.qcut(rfm['Frequency'].clip(1, 200), 5, labels=[1, 2, 3, 4, 5], duplicates='drop')
-    except ValueError:
-        # Alternativa: crear bins manualmente basados en los percentiles
-        freq_bins = [0, 1, 2, 4, 10, float('inf')]
-        rfm['F_Segment'] = pd.cut(rfm['Frequency'].clip(1, 200), bins=freq_bins, labels=[1, 2, 3, 4, 5], right=True,
-                                  include_lowest=True)
-
-    rfm['M_Segment'] = pd.qcut(rfm['Monetary'].clip(0, 50000), 5, labels=[1, 2, 3, 4, 5],
-                               duplicates='drop')  # 5 es lo mejor (alto valor)
-
-    # Calculamos RFM Score
-    rfm['RFM_Score'] = rfm['R_Segment'].astype(int) + rfm['F_Segment'].astype(int) + rfm['M_Segment'].astype(int)
-
-    # Creamos categorías de clientes
-    def categorize_customer(rfm_score):
-        if rfm_score >= 13:
-            return 'Champions'
-        elif 10 <= rfm_score < 13:
-            return 'Loyal Customers'
-        elif 7 <= rfm_score < 10:
-            return 'Potential Loyalists'
-        elif 5 <= rfm_score < 7:
-            return 'At Risk Customers'
-        else:
-            return 'Need Attention'
-
-    rfm['Customer_Category'] = rfm['RFM_Score'].apply(categorize_customer)
-
-    # Contamos clientes por categoría
-    customer_categories = rfm['Customer_Category'].value_counts()
-    print("\n9.1 Segmentación de clientes por categoría RFM:")
-    print(customer_categories)
-
-    # Visualizamos la segmentación
-    plt.figure(figsize=(12, 8))
-    customer_categories.plot(kind='pie', autopct='%1.1f%%')
-    plt.title('Distribución de Segmentos de Clientes')
-    plt.ylabel('')  # Quitamos la etiqueta del eje y
-    plt.tight_layout()
-    plt.savefig('./imagenes/segmentacion_clientes.png')
-
-    # 10. Conclusiones
-    # ---------------
-    print("\n\n10. CONCLUSIONES DEL ANÁLISIS EXPLORATORIO")
-    print("-" * 50)
+def print_incremental_verification(paths, chunk_size=DEFAULT_CHUNK_SIZE):
+    # Aplica los archivos uno a uno en un estado temporal y compara con un
+    # recálculo completo de todos ellos
+    mismatches = verify_against_full(paths, chunk_size)
+    if mismatches:
+        print(f"El modo incremental NO coincide con el recálculo completo en: {', '.join(mismatches)}")
+    else:
+        print("El modo incremental coincide con el recálculo completo en todas las tablas.")
+    return not mismatches
 
-    print("""
-    Conclusiones principales del análisis exploratorio de datos:
-
-    1. Perfil de Datos:
-       - El dataset contiene información de transacciones minoristas en línea con 8 variables principales.
-       - Hay un porcentaje significativo de valores faltantes en CustomerID ({}%).
-       - Se identificaron transacciones de cancelación y valores negativos que fueron tratados en la limpieza.
-
-    2. Perfil de Ventas:
-       - Reino Unido es el país dominante en términos de transacciones y ventas totales.
-       - Existe una clara estacionalidad con picos de ventas en ciertos meses (particularmente hacia fin de año).
-       - Los días de semana muestran mayor actividad de ventas que los fines de semana.
-       - Las horas con mayor actividad de ventas son durante la mañana y media tarde.
-
-    3. Perfil de Clientes:
-       - La distribución de compras por cliente es altamente sesgada, con pocos clientes generando la mayoría de ingresos.
-       - La segmentación RFM permitió identificar distintos grupos de clientes según su comportamiento de compra.
-       - Aproximadamente {}% de los clientes son de alta valor (Champions y Loyal Customers).
-
-    4. Perfil de Productos:
-       - Existe un grupo pequeño de productos que generan la mayor parte de los ingresos.
-       - Los productos más vendidos por cantidad no siempre coinciden con los más rentables.
-
-    5. Patrones de Compra:
-       - El tamaño promedio de orden es de aproximadamente {} items.
-       - El valor promedio de orden es de aproximadamente £{:.2f}.
-       - Hay una tendencia general {} en las ventas a lo largo del período analizado.
-
-    6. Recomendaciones:
-       - Mejorar la captura de datos de CustomerID para reducir valores faltantes.
-       - Implementar estrategias de marketing específicas para los distintos segmentos de clientes.
-       - Optimizar inventario priorizando productos de alta rotación y rentabilidad.
-       - Considerar promociones especiales en períodos de menor actividad para equilibrar ventas.
-    """.format(
-        df['CustomerID'].isnull().mean() * 100,
-        len(rfm[rfm['RFM_Score'] >= 10]) / len(rfm) * 100,
-        order_size.mean(),
-        order_value.mean(),
-        "creciente" if (daily_sales.iloc[-20:].mean() > daily_sales.iloc[:20].mean()) else "decreciente"
-    ))
 
-    print("\nAnálisis Exploratorio de Datos completado!")
 # Press the green button in the gutter to run the script.
 if __name__ == '__main__':
-    print_hi('PyCharm')
+    parser = argparse.ArgumentParser(description='Análisis Exploratorio de Datos - Online Retail')
+    parser.add_argument('--rebuild-cache', action='store_true',
+                        help='Invalida la cache columnar y la reconstruye desde el Excel')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Lee siempre el Excel original sin usar la cache')
+    parser.add_argument('--data', nargs='+', metavar='FUENTE',
+                        help='Analiza estos libros, CSV o Parquet en lugar del Excel del proyecto: rutas, patrones '
+                             'glob o LIBRO#HOJA (un libro sin hoja se lee entero)')
+    parser.add_argument('--ingest-workers', type=int, default=None,
+                        help='Procesos que leen las fuentes de --data (por defecto, uno por núcleo)')
+    parser.add_argument('--rejects', metavar='ARCHIVO',
+                        help='Guarda las filas descartadas en la limpieza y la regla de cada una (CSV o Parquet)')
+    parser.add_argument('--basket-support', type=float, default=MIN_SUPPORT, metavar='FRACCION',
+                        help='Soporte mínimo (fracción de facturas) del análisis de cesta')
+    parser.add_argument('--basket-itemsets', action='store_true',
+                        help='Extrae también los itemsets frecuentes de hasta 3 productos (FP-growth)')
+    parser.add_argument('--stream', metavar='ARCHIVO',
+                        help='Procesa un CSV o Parquet por bloques sin cargarlo completo en memoria')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help='Filas por bloque en el modo --stream')
+    parser.add_argument('--hll-precision', type=int, default=None, metavar='P',
+                        help='En el modo --stream, cuenta facturas distintas con HyperLogLog de 2^P registros')
+    parser.add_argument('--heavy-hitters', type=int, default=None, metavar='K',
+                        help='En el modo --stream, resume los rankings de productos vigilando como mucho K productos')
+    parser.add_argument('--stage', action='append', metavar='ETAPA',
+                        help='Ejecuta solo esta etapa y las que necesita (se puede repetir)')
+    parser.add_argument('--stage-cache', action='store_true',
+                        help='Guarda en disco los resultados de las etapas persistentes y los reutiliza')
+    parser.add_argument('--render-workers', type=int, default=None,
+                        help='Procesos para dibujar los gráficos (por defecto, uno por núcleo)')
+    parser.add_argument('--parallel', choices=list(PARTITION_KEYS),
+                        help='Calcula los agregados por particiones (mes o país) en varios procesos')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Procesos del modo --parallel (por defecto, uno por núcleo)')
+    parser.add_argument('--numbers-only', action='store_true',
+                        help='Calcula e imprime las estadísticas sin generar gráficos y exporta las tablas')
+    parser.add_argument('--export-dir', default=TABLES_DIR,
+                        help='Directorio de las tablas del modo --numbers-only')
+    parser.add_argument('--export-format', choices=EXPORT_FORMATS, default='json',
+                        help='Formato de las tablas del modo --numbers-only')
+    parser.add_argument('--trace', metavar='ARCHIVO',
+                        help='Guarda en JSON el tiempo, la CPU, la memoria y las filas de cada etapa')
+    parser.add_argument('--chrome-trace', metavar='ARCHIVO',
+                        help='Guarda las etapas en formato Chrome trace (chrome://tracing, Perfetto)')
+    parser.add_argument('--profile-stage', metavar='ETAPA',
+                        help='Ejecuta esta etapa bajo cProfile (perfil en perfil-ETAPA.prof)')
+    parser.add_argument('--cube-query', nargs='*', metavar='DIMENSION',
+                        help='Consulta el cubo guardado: suma por estas dimensiones (Country, Month, DayOfWeek, Hour)')
+    parser.add_argument('--where', action='append', metavar='DIMENSION=ETIQUETA',
+                        help='Filtro de --cube-query (se puede repetir; varias etiquetas separadas por comas)')
+    parser.add_argument('--measure', choices=list(MEASURES), default='TotalAmount',
+                        help='Medida que suma --cube-query')
+    parser.add_argument('--customer', type=int, metavar='ID',
+                        help='Muestra el historial de un cliente desde el índice guardado por el análisis')
+    parser.add_argument('--serve', action='store_true',
+                        help='Levanta el servicio HTTP de consultas sobre los datos guardados por el análisis')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='Dirección del modo --serve')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Puerto del modo --serve')
+    parser.add_argument('--reload-interval', type=float, default=2.0,
+                        help='Segundos entre comprobaciones de datos nuevos en el modo --serve')
+    parser.add_argument('--rfm-update', metavar='ARCHIVO',
+                        help='Actualiza el estado RFM guardado con las facturas de un archivo nuevo')
+    parser.add_argument('--incremental', nargs='+', metavar='ARCHIVO',
+                        help='Incorpora archivos nuevos al estado incremental y regenera solo lo afectado')
+    parser.add_argument('--verify-incremental', nargs='+', metavar='ARCHIVO',
+                        help='Comprueba que el modo incremental coincide con un recálculo completo')
+    args = parser.parse_args()
+    source = args.data or DATASET_PATH
+
+    if args.incremental:
+        print_incremental_update(args.incremental, args.chunk_size, args.render_workers)
+    elif args.verify_incremental:
+        if not print_incremental_verification(args.verify_incremental, args.chunk_size):
+            raise SystemExit(1)
+    elif args.serve:
+        run_service(args.host, args.port, args.reload_interval)
+    elif args.customer is not None:
+        print_customer(args.customer)
+    elif args.cube_query is not None:
+        print_cube_query(args.cube_query, args.where, args.measure)
+    elif args.rfm_update:
+        print_rfm_update(args.rfm_update)
+    elif args.numbers_only:
+        print_numbers(rebuild_cache=args.rebuild_cache, use_cache=not args.no_cache, stage_cache=args.stage_cache,
+                      export_dir=args.export_dir, export_format=args.export_format, parallel=args.parallel,
+                      workers=args.workers, reject_path=args.rejects, basket_support=args.basket_support,
+                      basket_itemsets=args.basket_itemsets, source=source, ingest_workers=args.ingest_workers)
+    elif args.stream:
+        print_streaming_report(args.stream, args.chunk_size, args.hll_precision, args.heavy_hitters)
+    else:
+        print_hi('PyCharm', rebuild_cache=args.rebuild_cache, use_cache=not args.no_cache, stages=args.stage,
+                 stage_cache=args.stage_cache, render_workers=args.render_workers, trace=args.trace,
+                 chrome_trace=args.chrome_trace, profile_stage=args.profile_stage, parallel=args.parallel,
+                 workers=args.workers, reject_path=args.rejects, basket_support=args.basket_support,
+                 basket_itemsets=args.basket_itemsets, source=source, ingest_workers=args.ingest_workers)
 
 # See PyCharm help at https://www.jetbrains.com/help/pycharm/
\ No newline at end of file
@@ -0,0 +1,4 @@
+# Paquete de soporte para el Análisis Exploratorio de Datos - Online Retail
+# -------------------------------------------------------------------------
+# main.py orquesta el análisis; aquí viven las piezas reutilizables
+# (carga con cache, agregaciones, render de gráficos, etc.).
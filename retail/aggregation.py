@@ -0,0 +1,253 @@
+# Motor de agregación factorizado
+# -------------------------------
+# Las secciones 3 a 8 agrupaban df_analysis una docena de veces por Month,
+# DayOfWeek, Hour, Country, (StockCode, Description), InvoiceNo, CustomerID y
+# Date, y cada groupby volvía a hashear su columna clave. Aquí cada clave se
+# factoriza una sola vez a códigos enteros y todas las sumas, conteos y conteos
+# distintos se obtienen con np.bincount sobre esos códigos.
+#
+# Los rankings de productos no se ordenan completos para mostrar las primeras
+# filas: ProductRanking agrupa (StockCode, Description) una vez y extrae el
+# top-k de cada medida con selección parcial (np.partition).
+
+import numpy as np
+import pandas as pd
+
+from retail.cohorts import CohortActivity
+from retail.correlation import Comoments
+from retail.distribution import row_distributions
+from retail.rfm import customer_reductions, rfm_from_state
+from retail.schema import customer_ids
+from retail.timeseries import TimeSeries
+
+
+class AnalysisResults:
+    """Tablas agregadas compartidas por la impresión y los gráficos del análisis."""
+
+    FIELDS = ['country_counts', 'stock_counts', 'monthly_sales', 'monthly_quantity', 'weekday_sales',
+              'hourly_sales', 'country_sales', 'top_products_quantity', 'top_products_revenue', 'order_size',
+              'order_value', 'daily_sales', 'customer_transactions', 'customer_spending', 'rfm', 'product_totals',
+              'sales_timeline', 'correlation', 'cohort_counts']
+
+    def __init__(self, distributions=None, **tables):
+        unknown = set(tables) - set(self.FIELDS)
+        if unknown:
+            raise TypeError(f"Tablas desconocidas: {sorted(unknown)}")
+        for name in self.FIELDS:
+            setattr(self, name, tables.get(name))
+        # Columna -> DistributionSummary de las filas (gráficos de distribución)
+        self.distributions = distributions or {}
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+
+def mismatched_tables(expected, actual, names=None):
+    """Nombres de las tablas de dos AnalysisResults que no coinciden.
+
+    El orden de las filas no importa y los importes se comparan con la
+    tolerancia de pandas.testing (sumar en otro orden cambia los últimos bits).
+    Con `names` solo se comparan esas tablas.
+    """
+    mismatches = []
+    for name in names or expected.FIELDS:
+        left, right = getattr(expected, name), getattr(actual, name)
+        try:
+            if isinstance(left, pd.DataFrame):
+                pd.testing.assert_frame_equal(left.sort_index(), right.sort_index(), check_dtype=False)
+            else:
+                pd.testing.assert_series_equal(left.sort_index(), right.sort_index(), check_dtype=False,
+                                               check_names=False, check_index_type=False,
+                                               check_categorical=False)
+        except AssertionError:
+            mismatches.append(name)
+    return mismatches
+
+
+def factorize(values, sort=True):
+    """Códigos enteros y valores únicos de una columna (los nulos quedan en -1)."""
+    if isinstance(getattr(values, 'dtype', None), pd.CategoricalDtype):
+        # Una columna categórica ya está factorizada: se reutilizan sus códigos,
+        # renumerados sin las categorías que no aparecen (un bincount en lugar
+        # del np.unique de remove_unused_categories)
+        codes = values.cat.codes.to_numpy().astype('int64')
+        used = np.bincount(codes + 1, minlength=len(values.cat.categories) + 1)[1:] > 0
+        renumber = np.append(np.cumsum(used) - 1, -1)
+        return renumber[codes], pd.Index(values.cat.categories.to_numpy()[used])
+    codes, uniques = pd.factorize(values, sort=sort)
+    return codes, uniques
+
+
+def _sum_by(codes, weights, size):
+    return np.bincount(codes, weights=weights, minlength=size)
+
+
+def _count_by(codes, size):
+    return np.bincount(codes, minlength=size)
+
+
+def _sorted_desc(values, index, name=None):
+    # Orden estable descendente, igual que value_counts()/sort_values()
+    order = np.argsort(-values, kind='stable')
+    return pd.Series(values[order], index=index[order], name=name)
+
+
+def top_k_positions(values, k):
+    """Posiciones de los k mayores valores, de mayor a menor.
+
+    Mismo resultado que np.argsort(-values, kind='stable')[:k] (los empates
+    conservan el orden original), pero sin ordenar todo el arreglo: el umbral
+    sale de np.partition y solo se ordenan los k elegidos.
+    """
+    values = np.asarray(values)
+    n = len(values)
+    if k <= 0:
+        return np.empty(0, dtype='int64')
+    if k >= n:
+        return np.argsort(-values, kind='stable')
+    threshold = np.partition(values, n - k)[n - k]
+    above = np.flatnonzero(values > threshold)
+    ties = np.flatnonzero(values == threshold)[:k - len(above)]
+    chosen = np.concatenate([above, ties])
+    return chosen[np.lexsort((chosen, -values[chosen]))]
+
+
+class ProductRanking:
+    """Totales por (StockCode, Description) y top-k de cada medida."""
+
+    MEASURES = ['Quantity', 'TotalAmount']
+
+    def __init__(self, totals):
+        # totals: DataFrame indexado por (StockCode, Description) con una
+        # columna por medida; el orden de las filas decide los empates
+        self.totals = totals
+
+    @classmethod
+    def from_frame(cls, df, quantity=None, amount=None, stock=None):
+        """Agrupa df_analysis por producto una sola vez (códigos enteros + bincount).
+
+        `stock` es el resultado de factorize(df['StockCode']) si ya se calculó.
+        """
+        quantity = df['Quantity'].to_numpy(dtype='int64') if quantity is None else quantity
+        amount = df['TotalAmount'].to_numpy(dtype='float64') if amount is None else amount
+        stock_codes, stocks = factorize(df['StockCode']) if stock is None else stock
+        desc_codes, descriptions = factorize(df['Description'])
+        product_codes, product_keys = factorize(stock_codes.astype('int64') * len(descriptions) + desc_codes)
+        products = pd.MultiIndex.from_arrays(
+            [stocks[product_keys // len(descriptions)], descriptions[product_keys % len(descriptions)]],
+            names=['StockCode', 'Description'])
+        return cls(pd.DataFrame({
+            'Quantity': _sum_by(product_codes, quantity, len(products)).astype('int64'),
+            'TotalAmount': _sum_by(product_codes, amount, len(products)),
+        }, index=products))
+
+    def top(self, measure, k=10):
+        """Los k productos con mayor `measure`, como sort_values(ascending=False).head(k)."""
+        column = self.totals[measure]
+        return column.iloc[top_k_positions(column.to_numpy(), k)]
+
+    def tops(self, k=10):
+        return {measure: self.top(measure, k) for measure in self.MEASURES}
+
+
+# Filas de los rankings de productos que guarda AnalysisResults (el informe
+# muestra 10; la tabla completa queda en product_totals)
+TOP_PRODUCTS = 100
+
+
+def _calendar_series(part, weights, size, offset, fill_missing, counts=None):
+    # Month/DayOfWeek/Hour ya son enteros pequeños: sirven como códigos directos
+    codes = part - offset if offset else part
+    sums = _sum_by(codes, weights, size)
+    counts = _count_by(codes, size) if counts is None else counts
+    index = pd.Index(np.arange(offset, offset + size), name=None)
+    series = pd.Series(sums, index=index)
+    if fill_missing:
+        return series.where(counts > 0)
+    return series[counts > 0]
+
+
+def compute_aggregates(df, extras=True):
+    """Calcula en una pasada todas las tablas que usan las secciones 3 a 8.
+
+    `df` es df_analysis: ya limpio y con Month, DayOfWeek, Hour y TotalAmount.
+    Con extras=False no se calculan las cohortes ni los resúmenes de
+    distribución (benchmarks/aggregation.py mide así el mismo trabajo que las
+    agrupaciones de pandas anteriores).
+    """
+    amount = df['TotalAmount'].to_numpy(dtype='float64')
+    quantity = df['Quantity'].to_numpy(dtype='int64')
+    tables = {}
+
+    # Variables temporales
+    month = df['Month'].to_numpy(dtype='int64')
+    month_counts = _count_by(month - 1, 12)
+    monthly_sales = _calendar_series(month, amount, 12, 1, fill_missing=True, counts=month_counts)
+    monthly_sales.index.name = 'Month'
+    tables['monthly_sales'] = monthly_sales.rename('TotalAmount')
+    monthly_quantity = _calendar_series(month, quantity, 12, 1, fill_missing=True, counts=month_counts)
+    monthly_quantity.index.name = 'Month'
+    if monthly_quantity.notna().all():
+        monthly_quantity = monthly_quantity.astype('int64')
+    tables['monthly_quantity'] = monthly_quantity.rename('Quantity')
+
+    weekday_sales = _calendar_series(df['DayOfWeek'].to_numpy(dtype='int64'), amount, 7, 0, fill_missing=False)
+    weekday_sales.index.name = 'DayOfWeek'
+    tables['weekday_sales'] = weekday_sales.rename('TotalAmount')
+    hourly_sales = _calendar_series(df['Hour'].to_numpy(dtype='int64'), amount, 24, 0, fill_missing=False)
+    hourly_sales.index.name = 'Hour'
+    tables['hourly_sales'] = hourly_sales.rename('TotalAmount')
+
+    # País
+    country_codes, countries = factorize(df['Country'])
+    countries = pd.Index(countries, name='Country')
+    tables['country_counts'] = _sorted_desc(_count_by(country_codes, len(countries)), countries, 'count')
+    tables['country_sales'] = _sorted_desc(_sum_by(country_codes, amount, len(countries)), countries,
+                                           'TotalAmount')
+
+    # Productos: StockCode solo y el par (StockCode, Description)
+    stock_codes, stocks = factorize(df['StockCode'])
+    tables['stock_counts'] = _sorted_desc(_count_by(stock_codes, len(stocks)), pd.Index(stocks, name='StockCode'),
+                                          'count')
+    ranking = ProductRanking.from_frame(df, quantity, amount, (stock_codes, stocks))
+    tables['product_totals'] = ranking.totals
+    tables['top_products_quantity'] = ranking.top('Quantity', TOP_PRODUCTS)
+    tables['top_products_revenue'] = ranking.top('TotalAmount', TOP_PRODUCTS)
+
+    # Facturas
+    invoice_codes, invoices = factorize(df['InvoiceNo'])
+    invoices = pd.Index(invoices, name='InvoiceNo')
+    tables['order_size'] = pd.Series(_sum_by(invoice_codes, quantity, len(invoices)).astype('int64'),
+                                     index=invoices, name='Quantity')
+    tables['order_value'] = pd.Series(_sum_by(invoice_codes, amount, len(invoices)), index=invoices,
+                                      name='TotalAmount')
+
+    # Series temporales: ventas por hora sobre el datetime64 nativo; la serie
+    # diaria (y la semanal y mensual de la sección 8) salen de ella
+    timeline = TimeSeries.from_frame(df)
+    tables['sales_timeline'] = timeline.hourly
+    tables['daily_sales'] = timeline.series('daily')
+
+    # Matriz de correlación por bloques, sin copiar las columnas numéricas
+    tables['correlation'] = Comoments.from_frame(df).correlation()
+
+    tables.update(_customer_tables(df, invoice_codes, len(invoices), amount, extras))
+    return AnalysisResults(distributions=row_distributions(df) if extras else None, **tables)
+
+
+def _customer_tables(df, invoice_codes, n_invoices, amount, extras=True):
+    # Solo analizamos clientes con CustomerID válido
+    valid = df['CustomerID'].notna().to_numpy()
+    timestamps = df['InvoiceDate'].to_numpy()[valid].astype('datetime64[ns]').astype('int64')
+    ids = customer_ids(df, valid)
+    state = customer_reductions(ids, invoice_codes[valid], n_invoices, timestamps, amount[valid])
+    max_date = timestamps.max() if len(timestamps) else 0
+    tables = {
+        'customer_transactions': state['Frequency'].rename('InvoiceNo'),
+        'customer_spending': state['Monetary'].rename('TotalAmount'),
+        'rfm': rfm_from_state(state, max_date),
+    }
+    if extras:
+        # Clientes activos por cohorte mensual y meses transcurridos
+        tables['cohort_counts'] = CohortActivity.from_arrays(ids, timestamps.view('datetime64[ns]')).counts()
+    return tables
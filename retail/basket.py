@@ -0,0 +1,172 @@
+# Análisis de cesta: productos comprados juntos
+# ---------------------------------------------
+# Las reglas "quien compra A también compra B" necesitan contar, para cada par
+# de productos, en cuántas facturas aparecen juntos. Un self-merge de pandas
+# por InvoiceNo genera una fila por par dentro de cada factura y no escala. Aquí
+# las facturas se representan como una matriz dispersa CSR factura × producto
+# (1 si la factura contiene el producto) y:
+# - el soporte de cada producto es la suma de su columna; los productos por
+#   debajo del soporte mínimo se descartan antes de cruzar nada (poda),
+# - las co-ocurrencias de todos los pares son el producto disperso Xᵀ·X de la
+#   matriz podada (solo se materializan los pares que aparecen juntos),
+# - de ahí salen soporte, confianza y lift de las reglas A → B en ambos
+#   sentidos.
+# Para conjuntos de más de dos productos, fp_growth() extrae los itemsets
+# frecuentes por crecimiento de patrones sobre bases condicionales de la misma
+# matriz podada.
+#
+#   basket = BasketAnalysis.from_frame(df_analysis)
+#   basket.rules(min_support=0.01, min_confidence=0.2)
+#   basket.itemsets(min_support=0.01, max_size=3)
+
+import math
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from retail.aggregation import factorize
+
+# Fracción mínima de facturas en que aparece un producto, un par o un itemset
+MIN_SUPPORT = 0.01
+
+# Confianza mínima de una regla A → B (facturas con A y B / facturas con A)
+MIN_CONFIDENCE = 0.2
+
+# Tamaño máximo de los itemsets de fp_growth()
+MAX_ITEMSET_SIZE = 3
+
+TOP_RULES = 10
+
+RULE_COLUMNS = ['antecedent', 'consequent', 'count', 'support', 'confidence', 'lift']
+
+
+def basket_matrix(df):
+    """Matriz CSR binaria factura × producto, con las facturas y productos de filas y columnas."""
+    invoice_codes, invoices = factorize(df['InvoiceNo'])
+    product_codes, products = factorize(df['StockCode'])
+    valid = (invoice_codes >= 0) & (product_codes >= 0)
+    # Las líneas repetidas de una factura se suman al construir la matriz; luego se binariza
+    matrix = sparse.csr_matrix((np.ones(int(valid.sum()), dtype='int32'),
+                                (invoice_codes[valid], product_codes[valid])),
+                               shape=(len(invoices), len(products)))
+    matrix.data[:] = 1
+    return matrix, pd.Index(invoices, name='InvoiceNo'), pd.Index(products, name='StockCode')
+
+
+def _descriptions(df, products):
+    # Primera descripción de cada StockCode (un producto puede tener varias)
+    first = df.drop_duplicates('StockCode').set_index('StockCode')['Description']
+    first.index = first.index.astype(object)
+    return first.reindex(products.astype(object)).astype(object)
+
+
+class BasketAnalysis:
+    """Matriz factura × producto con reglas de asociación e itemsets frecuentes."""
+
+    def __init__(self, matrix, products, descriptions=None):
+        self.matrix = matrix
+        self.products = products
+        self.descriptions = descriptions
+        # Facturas que contienen cada producto
+        self.item_counts = np.asarray(matrix.sum(axis=0)).ravel()
+
+    @classmethod
+    def from_frame(cls, df):
+        matrix, _, products = basket_matrix(df)
+        return cls(matrix, products, _descriptions(df, products))
+
+    @property
+    def n_invoices(self):
+        return self.matrix.shape[0]
+
+    def min_count(self, min_support):
+        return max(1, math.ceil(min_support * self.n_invoices))
+
+    def frequent_items(self, min_support=MIN_SUPPORT):
+        """Columnas de los productos con soporte >= min_support."""
+        return np.flatnonzero(self.item_counts >= self.min_count(min_support))
+
+    def pruned(self, min_support=MIN_SUPPORT):
+        """Matriz restringida a los productos frecuentes y las columnas conservadas."""
+        items = self.frequent_items(min_support)
+        return self.matrix.tocsc()[:, items].tocsr(), items
+
+    def pair_counts(self, min_support=MIN_SUPPORT):
+        """Pares de productos frecuentes (columnas i < j) con su número de facturas en común."""
+        matrix, items = self.pruned(min_support)
+        cooccurrence = sparse.triu(matrix.T @ matrix, k=1).tocoo()
+        keep = cooccurrence.data >= self.min_count(min_support)
+        return items[cooccurrence.row[keep]], items[cooccurrence.col[keep]], cooccurrence.data[keep]
+
+    def rules(self, min_support=MIN_SUPPORT, min_confidence=MIN_CONFIDENCE):
+        """Reglas A → B con soporte del par >= min_support y confianza >= min_confidence.
+
+        Ordenadas por lift y confianza (de mayor a menor).
+        """
+        left, right, counts = self.pair_counts(min_support)
+        # Cada par da dos reglas: left → right y right → left
+        antecedent = np.concatenate([left, right])
+        consequent = np.concatenate([right, left])
+        counts = np.concatenate([counts, counts]).astype('int64')
+        confidence = counts / self.item_counts[antecedent]
+        lift = confidence / (self.item_counts[consequent] / self.n_invoices)
+        rules = pd.DataFrame({
+            'antecedent': self.products[antecedent].astype(object),
+            'consequent': self.products[consequent].astype(object),
+            'count': counts,
+            'support': counts / self.n_invoices,
+            'confidence': confidence,
+            'lift': lift,
+        }, columns=RULE_COLUMNS)
+        rules = rules[rules['confidence'] >= min_confidence]
+        return rules.sort_values(['lift', 'confidence', 'antecedent', 'consequent'],
+                                 ascending=[False, False, True, True]).reset_index(drop=True)
+
+    def itemsets(self, min_support=MIN_SUPPORT, max_size=MAX_ITEMSET_SIZE):
+        """Itemsets frecuentes (fp_growth) como DataFrame: itemset, size, count, support."""
+        matrix, items = self.pruned(min_support)
+        found = fp_growth(matrix, self.min_count(min_support), max_size)
+        rows = [(tuple(sorted(self.products[items[list(itemset)]].astype(str))), len(itemset), count)
+                for itemset, count in found.items()]
+        frame = pd.DataFrame(rows, columns=['itemset', 'size', 'count'])
+        frame['support'] = frame['count'] / self.n_invoices
+        return frame.sort_values(['size', 'count', 'itemset'], ascending=[False, False, True]).reset_index(drop=True)
+
+    def describe(self, codes):
+        """Descripción de cada StockCode de `codes`."""
+        if self.descriptions is None:
+            return pd.Series(index=pd.Index(codes, name='StockCode'), dtype=object)
+        return self.descriptions.reindex(pd.Index(codes, dtype=object)).rename_axis('StockCode')
+
+
+def fp_growth(matrix, min_count, max_size=MAX_ITEMSET_SIZE, columns=None, suffix=()):
+    """Itemsets frecuentes (tupla de columnas) -> número de facturas que los contienen.
+
+    Crecimiento de patrones al estilo FP-growth, sin generar candidatos: la
+    base condicional de un item son las filas de `matrix` (CSR) que lo
+    contienen, restringidas a los items anteriores a él, y cada itemset
+    frecuente crece con los items frecuentes de su base. En lugar de un árbol
+    FP en Python, cada base es una submatriz dispersa y los conteos son sumas
+    de columnas; en el penúltimo nivel todos los pares de la base se cuentan a
+    la vez con Xᵀ·X.
+    """
+    columns = np.arange(matrix.shape[1]) if columns is None else columns
+    counts = np.asarray(matrix.sum(axis=0)).ravel()
+    keep = np.flatnonzero(counts >= min_count)
+    matrix, columns, counts = matrix[:, keep], columns[keep], counts[keep]
+    found = {suffix + (column,): int(count) for column, count in zip(columns.tolist(), counts.tolist())}
+    size = len(suffix) + 1
+    if len(columns) < 2 or (max_size is not None and size >= max_size):
+        return found
+    if max_size is not None and size + 1 == max_size:
+        pairs = sparse.triu(matrix.T @ matrix, k=1).tocoo()
+        frequent = pairs.data >= min_count
+        found.update({suffix + (int(left), int(right)): int(count) for left, right, count in
+                      zip(columns[pairs.row[frequent]], columns[pairs.col[frequent]], pairs.data[frequent])})
+        return found
+    by_column = matrix.tocsc()
+    for position in range(1, len(columns)):
+        rows = by_column.indices[by_column.indptr[position]:by_column.indptr[position + 1]]
+        found.update(fp_growth(matrix[rows][:, :position], min_count, max_size, columns[:position],
+                               suffix + (int(columns[position]),)))
+    return found
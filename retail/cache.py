@@ -0,0 +1,196 @@
+# Cache columnar del dataset
+# --------------------------
+# Leer Online_Retail.xlsx con pandas tarda más que todo el análisis posterior.
+# La primera ejecución convierte el libro a Parquet con tipos definidos y las
+# siguientes cargan directamente desde ese archivo. La cache se identifica por
+# el tamaño, la fecha de modificación y el hash SHA-256 del archivo de origen;
+# si alguno no coincide se vuelve a leer el Excel y se reconstruye.
+#
+# La tabla se guarda y se devuelve con el esquema compacto de retail/schema.py
+# (claves de texto como categorías, que Parquet guarda como diccionarios).
+
+import hashlib
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from retail.config import CACHE_DIR, DATASET_PATH
+from retail.schema import COLUMN_ALIASES, apply_load_schema, normalize_columns
+
+# Se incrementa cuando cambia el formato de la cache para invalidar las antiguas
+CACHE_VERSION = 2
+
+# Caracteres del hash de la ruta de origen en el nombre de la cache
+PATH_HASH_CHARS = 12
+
+STRING_COLUMNS = ['InvoiceNo', 'StockCode', 'Description', 'Country']
+
+# Tipos de read_csv para los identificadores, con sus nombres alternativos
+CSV_DTYPES = {name: str for col in ['InvoiceNo', 'StockCode'] for name in [col, *COLUMN_ALIASES[col]]}
+
+
+def file_fingerprint(path, with_hash=True):
+    """Devuelve tamaño, mtime y (opcionalmente) el SHA-256 del archivo."""
+    stat = os.stat(path)
+    fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if with_hash:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as fh:
+            for block in iter(lambda: fh.read(1 << 20), b''):
+                digest.update(block)
+        fingerprint['sha256'] = digest.hexdigest()
+    return fingerprint
+
+
+def cache_paths(source, cache_dir=CACHE_DIR):
+    """Rutas del archivo Parquet y de sus metadatos para un archivo de origen.
+
+    El nombre lleva un hash corto de la ruta absoluta: dos orígenes con el mismo
+    nombre en carpetas distintas no comparten cache.
+    """
+    name = os.path.splitext(os.path.basename(source))[0]
+    path_hash = hashlib.sha256(os.path.abspath(source).encode()).hexdigest()[:PATH_HASH_CHARS]
+    data_path = os.path.join(cache_dir, f'{name}-{path_hash}.parquet')
+    return data_path, data_path + '.json'
+
+
+def normalize_types(df):
+    """Fija los tipos de las columnas del esquema Online Retail.
+
+    read_excel deja InvoiceNo y StockCode como columnas mixtas (int y str),
+    que Parquet no puede guardar; aquí todo identificador pasa a texto. Las
+    columnas categóricas (Parquet escrito con el esquema compacto) se pasan
+    antes a objetos: where() no puede poner texto nuevo en una categoría.
+    """
+    for col in STRING_COLUMNS:
+        if col in df.columns:
+            values = df[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                values = values.astype(object)
+            df[col] = values.where(values.isna(), values.astype(str))
+    if 'Quantity' in df.columns:
+        df['Quantity'] = df['Quantity'].astype('int64')
+    if 'UnitPrice' in df.columns:
+        df['UnitPrice'] = df['UnitPrice'].astype('float64')
+    if 'CustomerID' in df.columns:
+        df['CustomerID'] = df['CustomerID'].astype('float64')
+    if 'InvoiceDate' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['InvoiceDate']):
+        df['InvoiceDate'] = pd.to_datetime(df['InvoiceDate'])
+    return df
+
+
+def read_source(path, sheet=None):
+    """Lee el archivo original (Excel, CSV o Parquet) sin pasar por la cache.
+
+    Con `sheet` se lee esa hoja del libro (por defecto, la primera). Los
+    nombres de columna se normalizan con normalize_columns().
+    """
+    lower = path.lower()
+    if lower.endswith('.csv'):
+        df = pd.read_csv(path, dtype=CSV_DTYPES)
+    elif lower.endswith('.parquet'):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_excel(path, sheet_name=sheet or 0)
+    return normalize_types(normalize_columns(df))
+
+
+def cache_status(source, cache_dir=CACHE_DIR, verify_hash=True):
+    """Indica si la cache de `source` está 'fresh', 'stale' o 'missing'.
+
+    Con verify_hash=False basta con que coincidan tamaño y mtime. Con
+    verify_hash=True el tamaño debe coincidir y el contenido se compara por
+    hash, de modo que un archivo solo "tocado" (mtime nuevo, mismo contenido)
+    no obliga a reconstruir.
+    """
+    data_path, meta_path = cache_paths(source, cache_dir)
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return 'missing'
+    try:
+        with open(meta_path, encoding='utf-8') as fh:
+            meta = json.load(fh)
+    except (OSError, ValueError):
+        return 'stale'
+    if meta.get('version') != CACHE_VERSION:
+        return 'stale'
+
+    current = file_fingerprint(source, with_hash=False)
+    if current['size'] != meta.get('size'):
+        return 'stale'
+    if not verify_hash:
+        return 'fresh' if current['mtime_ns'] == meta.get('mtime_ns') else 'stale'
+
+    current = file_fingerprint(source)
+    if current['sha256'] != meta.get('sha256'):
+        return 'stale'
+    if current['mtime_ns'] != meta.get('mtime_ns'):
+        # Mismo contenido con otra fecha: actualizamos los metadatos
+        meta['mtime_ns'] = current['mtime_ns']
+        _write_json(meta_path, meta)
+    return 'fresh'
+
+
+def invalidate_cache(source, cache_dir=CACHE_DIR):
+    """Elimina la cache asociada a `source` (si existe)."""
+    for path in cache_paths(source, cache_dir):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def write_cache(df, source, cache_dir=CACHE_DIR):
+    """Guarda `df` como Parquet junto con la huella del archivo de origen."""
+    os.makedirs(cache_dir, exist_ok=True)
+    data_path, meta_path = cache_paths(source, cache_dir)
+    tmp_path = data_path + '.tmp'
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, data_path)
+
+    meta = file_fingerprint(source)
+    meta.update({
+        'version': CACHE_VERSION,
+        'source': os.path.abspath(source),
+        'rows': int(len(df)),
+        'created': datetime.now().isoformat(timespec='seconds'),
+    })
+    _write_json(meta_path, meta)
+
+
+def load_transactions(source=DATASET_PATH, cache_dir=CACHE_DIR, rebuild=False, use_cache=True,
+                      verify_hash=True):
+    """Carga las transacciones usando la cache columnar cuando es válida.
+
+    - rebuild=True invalida la cache y la vuelve a generar desde el origen.
+    - use_cache=False lee siempre el archivo original.
+    Si la cache está obsoleta o no puede leerse se usa el Excel como respaldo.
+    """
+    if not use_cache:
+        return apply_load_schema(read_source(source))
+
+    if rebuild:
+        invalidate_cache(source, cache_dir)
+
+    status = cache_status(source, cache_dir, verify_hash=verify_hash)
+    data_path, _ = cache_paths(source, cache_dir)
+    if status == 'fresh':
+        try:
+            return apply_load_schema(pd.read_parquet(data_path))
+        except Exception as exc:  # cache corrupta o sin motor Parquet
+            print(f"No se pudo leer la cache ({exc}); se usará el archivo original.")
+    elif status == 'stale':
+        print("La cache está desactualizada; se lee el archivo original y se reconstruye.")
+
+    df = apply_load_schema(read_source(source))
+    try:
+        write_cache(df, source, cache_dir)
+    except (ImportError, OSError) as exc:
+        print(f"No se pudo crear la cache columnar: {exc}")
+    return df
+
+
+def _write_json(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as fh:
+        json.dump(data, fh, indent=2)
+    os.replace(tmp_path, path)
@@ -0,0 +1,135 @@
+# Limpieza en una sola pasada
+# ---------------------------
+# La sección 2 construía df_clean con dropna (una copia), evaluaba
+# InvoiceNo.astype(str).str.startswith('C') dos veces sobre toda la tabla y
+# aplicaba por separado los filtros de Quantity y UnitPrice antes de otra copia.
+# Aquí las cuatro reglas se evalúan una vez cada una como máscaras booleanas:
+# - la de cancelación, sobre las categorías de InvoiceNo (unas decenas de miles
+#   de facturas) en lugar de sobre cada fila,
+# - las filas que se conservan se copian una sola vez (take),
+# - de las mismas máscaras salen los rechazos por regla y, si se pide, el
+#   archivo de filas rechazadas.
+#
+# Cuando la entrada es Parquet el archivo se lee una sola vez por lotes de
+# Arrow: las reglas se evalúan sobre cada lote con pyarrow.compute, los
+# rechazos por regla salen de esas mismas máscaras y las filas rechazadas se
+# filtran antes de pasar el lote a pandas.
+
+import numpy as np
+import pandas as pd
+
+# Reglas en el orden en que se atribuye el rechazo de una fila
+CLEANING_RULES = {
+    'description_null': 'Description nula',
+    'cancellation': 'Factura de cancelación (C...)',
+    'quantity_non_positive': 'Quantity <= 0',
+    'price_non_positive': 'UnitPrice <= 0',
+}
+
+
+def cancellation_mask(invoices):
+    """InvoiceNo que empiezan por 'C' (evaluado sobre las categorías si es categórica)."""
+    if isinstance(invoices.dtype, pd.CategoricalDtype):
+        categories = invoices.cat.categories.astype(str).str.startswith('C')
+        codes = invoices.cat.codes.to_numpy()
+        return np.asarray(categories)[codes] & (codes >= 0)
+    return invoices.astype(str).str.startswith('C').to_numpy()
+
+
+def rule_masks(df):
+    """Máscara de las filas que infringen cada regla (True = se rechaza)."""
+    return {
+        'description_null': df['Description'].isna().to_numpy(),
+        'cancellation': cancellation_mask(df['InvoiceNo']),
+        # Negación de "> 0" para que los nulos también se rechacen
+        'quantity_non_positive': ~(df['Quantity'] > 0).to_numpy(dtype=bool),
+        'price_non_positive': ~(df['UnitPrice'] > 0).to_numpy(dtype=bool),
+    }
+
+
+def first_rule(masks):
+    """Índice (en CLEANING_RULES) de la primera regla que rechaza cada fila; -1 si se conserva."""
+    rules = np.full(len(next(iter(masks.values()))), -1, dtype='int8')
+    for position, name in reversed(list(enumerate(CLEANING_RULES))):
+        rules[masks[name]] = position
+    return rules
+
+
+def reject_counts(masks, rules=None):
+    """Filas que infringen cada regla y filas descartadas atribuidas a ella.
+
+    Una fila puede infringir varias reglas; se descarta por la primera en el
+    orden de CLEANING_RULES, así que `descartadas` suma el total de rechazos.
+    """
+    rules = first_rule(masks) if rules is None else rules
+    attributed = np.bincount(rules[rules >= 0], minlength=len(CLEANING_RULES))
+    return pd.DataFrame({
+        'regla': list(CLEANING_RULES.values()),
+        'infringen': [int(np.count_nonzero(masks[name])) for name in CLEANING_RULES],
+        'descartadas': attributed,
+    }, index=pd.Index(list(CLEANING_RULES), name='rule'))
+
+
+def write_rejects(rejected, path):
+    """Guarda las filas rechazadas (con su regla) en CSV o Parquet según la extensión."""
+    if path.lower().endswith('.parquet'):
+        rejected.to_parquet(path)
+    else:
+        rejected.to_csv(path)
+    return path
+
+
+def clean_transactions(df, reject_path=None, masks=None):
+    """Aplica las reglas en una pasada.
+
+    Devuelve (df_analysis, conteos por regla). df_analysis es la única copia
+    de las filas válidas; con `reject_path` las filas rechazadas se guardan
+    con la columna `rule`.
+    """
+    masks = rule_masks(df) if masks is None else masks
+    rules = first_rule(masks)
+    keep = rules < 0
+    df_analysis = df.take(np.flatnonzero(keep))
+    if reject_path:
+        positions = np.flatnonzero(~keep)
+        names = np.array(list(CLEANING_RULES))
+        write_rejects(df.take(positions).assign(rule=names[rules[positions]]), reject_path)
+    return df_analysis, reject_counts(masks, rules)
+
+
+def arrow_rule_masks(batch):
+    """Como rule_masks(), evaluado con pyarrow sobre un RecordBatch (nulos tratados igual)."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    def positive(name):
+        return pc.fill_null(pc.greater(batch.column(name), 0), False)
+
+    invoices = pc.cast(batch.column('InvoiceNo'), pa.string())
+    masks = {
+        'description_null': pc.is_null(batch.column('Description')),
+        'cancellation': pc.fill_null(pc.starts_with(invoices, 'C'), False),
+        'quantity_non_positive': pc.invert(positive('Quantity')),
+        'price_non_positive': pc.invert(positive('UnitPrice')),
+    }
+    return {name: mask.to_numpy(zero_copy_only=False) for name, mask in masks.items()}
+
+
+def scan_clean_parquet(path, columns, batch_size):
+    """Lee un Parquet en una sola pasada aplicando las reglas a cada lote en Arrow.
+
+    Genera, por cada lote, (DataFrame con las filas que se conservan, conteos
+    por regla del lote, filas leídas). Las filas rechazadas se descartan antes
+    de convertir el lote a pandas.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(path, format='parquet')
+    for batch in dataset.to_batches(columns=columns, batch_size=batch_size):
+        if not batch.num_rows:
+            continue
+        masks = arrow_rule_masks(batch)
+        rules = first_rule(masks)
+        kept = batch.filter(pa.array(rules < 0))
+        yield kept.to_pandas(), reject_counts(masks, rules), batch.num_rows
@@ -0,0 +1,99 @@
+# Retención por cohortes mensuales
+# --------------------------------
+# La cohorte de un cliente es el mes de su primera compra; la retención de la
+# cohorte M a k meses es la fracción de sus clientes que vuelven a comprar en
+# el mes M + k. En lugar de recorrer los clientes uno a uno:
+# - los pares activos (cliente, mes) se codifican como un único int64,
+#   CustomerID * MONTH_SLOTS + meses desde 1970, y se deduplican con np.unique;
+#   ordenados así, los meses de cada cliente quedan contiguos y ascendentes, y
+#   el primero de cada tramo es su cohorte,
+# - la matriz cohorte × meses transcurridos es un solo bincount sobre
+#   cohorte * ancho + desplazamiento.
+# Los pares son el estado: llegar un mes nuevo solo añade sus pares (merge, una
+# unión de arrays ordenados) y la matriz se vuelve a contar desde ellos. Un
+# cliente que ya tenía compras conserva su cohorte.
+#
+#   activity = CohortActivity.from_frame(df_analysis)
+#   retention(activity.counts())
+
+import numpy as np
+import pandas as pd
+
+from retail.schema import customer_ids
+
+# Meses desde 1970 que caben en la parte baja de la clave (hasta el año 2311)
+MONTH_SLOTS = 1 << 12
+
+
+def active_months(ids, timestamps):
+    """Claves ordenadas y sin repetir de los pares (cliente, mes) con compras."""
+    months = np.asarray(timestamps).astype('datetime64[M]').astype('int64')
+    return np.unique(np.asarray(ids, dtype='int64') * MONTH_SLOTS + months)
+
+
+class CohortActivity:
+    """Pares (cliente, mes) con compras, combinables con merge()."""
+
+    def __init__(self, keys=None):
+        self.keys = np.empty(0, dtype='int64') if keys is None else keys
+
+    @classmethod
+    def from_arrays(cls, ids, timestamps):
+        return cls(active_months(ids, timestamps))
+
+    @classmethod
+    def from_frame(cls, df):
+        """Pares de las filas de `df` con CustomerID válido."""
+        valid = df['CustomerID'].notna().to_numpy()
+        return cls.from_arrays(customer_ids(df, valid), df['InvoiceDate'].to_numpy()[valid])
+
+    def merge(self, other):
+        """Añade los pares de `other` (por ejemplo, los de un mes nuevo) y devuelve este objeto."""
+        self.keys = np.union1d(self.keys, other.keys)
+        return self
+
+    def __len__(self):
+        return len(self.keys)
+
+    def pairs(self):
+        """Pares como DataFrame (CustomerID, MonthStart)."""
+        return pd.DataFrame({
+            'CustomerID': self.keys // MONTH_SLOTS,
+            'MonthStart': (self.keys % MONTH_SLOTS).astype('datetime64[M]').astype('datetime64[ns]'),
+        })
+
+    @classmethod
+    def from_pairs(cls, frame):
+        return cls.from_arrays(frame['CustomerID'].to_numpy(dtype='int64'), frame['MonthStart'].to_numpy())
+
+    def counts(self):
+        """Clientes activos por cohorte (filas, mes de la primera compra) y meses transcurridos (columnas).
+
+        Aparecen todos los meses entre el primero y el último; las celdas
+        posteriores al último mes con datos quedan en 0.
+        """
+        customers = self.keys // MONTH_SLOTS
+        months = self.keys % MONTH_SLOTS
+        if not len(months):
+            return pd.DataFrame(index=pd.DatetimeIndex([], name='Cohort'),
+                                columns=pd.RangeIndex(0, name='MonthsSince'), dtype='int64')
+        # Primer mes de cada cliente, repetido en todos sus pares
+        starts = np.ones(len(customers), dtype=bool)
+        starts[1:] = customers[1:] != customers[:-1]
+        first = months[starts][np.cumsum(starts) - 1]
+        base = months.min()
+        width = int(months.max() - base) + 1
+        cells = np.bincount((first - base) * width + (months - first), minlength=width * width)
+        index = pd.DatetimeIndex((np.arange(width) + base).astype('datetime64[M]').astype('datetime64[ns]'),
+                                 name='Cohort')
+        columns = pd.RangeIndex(width, name='MonthsSince')
+        return pd.DataFrame(cells.reshape(width, width), index=index, columns=columns)
+
+
+def retention(counts):
+    """Fracción de cada cohorte activa k meses después (NaN donde aún no hay datos)."""
+    sizes = counts[0] if len(counts.columns) else pd.Series(dtype='float64')
+    # La cohorte i solo se ha observado durante len(counts) - i meses
+    remaining = len(counts) - np.arange(len(counts))
+    observed = np.arange(len(counts.columns))[None, :] < remaining[:, None]
+    return counts.div(sizes.where(sizes > 0), axis=0).where(observed)
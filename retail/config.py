@@ -0,0 +1,17 @@
+# Rutas compartidas por el análisis
+# ---------------------------------
+
+# Archivo de datos original
+DATASET_PATH = './dataset/Online_Retail.xlsx'
+
+# Directorio para la cache columnar y los estados persistidos
+CACHE_DIR = './cache'
+
+# Resultados de las etapas del análisis persistidos en disco
+STAGE_CACHE_DIR = './cache/etapas'
+
+# Directorio donde se guardan las imágenes generadas
+IMAGES_DIR = './imagenes'
+
+# Directorio donde el modo solo números guarda las tablas (JSON/CSV)
+TABLES_DIR = './tablas'
@@ -0,0 +1,118 @@
+# Matriz de correlación acumulable
+# --------------------------------
+# La sección 4.3 copiaba las ocho columnas numéricas de df_analysis y llamaba a
+# .corr() sobre toda la tabla, así que la matriz no existía en el modo por
+# bloques ni en el incremental. Comoments guarda, para las columnas de
+# CORRELATION_COLUMNS, el número de filas, el vector de medias y la matriz de
+# co-momentos (suma de productos de desviaciones respecto a la media):
+# - dentro de un bloque de BLOCK_ROWS filas se calculan en dos pasadas (media y
+#   luego desviaciones), que es numéricamente estable,
+# - dos acumuladores se combinan con la fórmula de Chan et al., que corrige los
+#   co-momentos con la diferencia de medias en lugar de restar sumas de
+#   cuadrados grandes.
+# La covarianza es co-momentos / (n - 1) y la correlación sale de ella, igual
+# que en DataFrame.corr(). Como nunca se materializan las columnas completas, la
+# memoria es la de un bloque (BLOCK_ROWS × 8 valores) y el estado son 8 medias y
+# 8 × 8 co-momentos, que se guardan como JSON.
+
+import numpy as np
+import pandas as pd
+
+# Columnas de matriz_correlacion.png
+CORRELATION_COLUMNS = ['Quantity', 'UnitPrice', 'TotalAmount', 'Year', 'Month', 'Day', 'DayOfWeek', 'Hour']
+
+# Componentes de InvoiceDate que se calculan si el bloque no los trae
+# (los bloques del modo por bloques solo tienen Month, DayOfWeek y Hour)
+DATE_PARTS = {'Year': 'year', 'Month': 'month', 'Day': 'day', 'DayOfWeek': 'dayofweek', 'Hour': 'hour'}
+
+# Filas que se convierten a la vez a una matriz float64
+BLOCK_ROWS = 100_000
+
+
+class Comoments:
+    """Conteo, medias y co-momentos de varias columnas, combinables con merge()."""
+
+    def __init__(self, columns=CORRELATION_COLUMNS):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.count = 0
+        self.mean = np.zeros(k)
+        self.m2 = np.zeros((k, k))
+
+    @classmethod
+    def from_values(cls, values, columns=CORRELATION_COLUMNS):
+        """Acumulador de una matriz (filas × columnas); se ignoran las filas con NaN."""
+        return cls._from_columns(np.array(values, dtype='float64').T, columns)
+
+    @classmethod
+    def from_frame(cls, df, columns=CORRELATION_COLUMNS, block_rows=BLOCK_ROWS):
+        """Acumula las columnas de `df` por bloques de `block_rows` filas."""
+        comoments = cls(columns)
+        for start in range(0, len(df), block_rows):
+            block = df.iloc[start:start + block_rows]
+            # Una fila por columna: cada columna se copia contigua y sin transponer
+            values = np.empty((len(columns), len(block)))
+            for position, col in enumerate(columns):
+                values[position] = _column(block, col)
+            comoments.merge(cls._from_columns(values, columns))
+        return comoments
+
+    @classmethod
+    def _from_columns(cls, values, columns):
+        # `values` (columnas × filas) es propio: se centra sobre sí mismo
+        valid = ~np.isnan(values).any(axis=0)
+        if not valid.all():
+            values = values[:, valid]
+        comoments = cls(columns)
+        if values.shape[1]:
+            comoments.count = values.shape[1]
+            comoments.mean = values.mean(axis=1)
+            values -= comoments.mean[:, None]
+            comoments.m2 = values @ values.T
+        return comoments
+
+    def merge(self, other):
+        """Combina `other` (mismas columnas) en este acumulador y lo devuelve."""
+        if other.columns != self.columns:
+            raise ValueError("Solo se pueden combinar acumuladores con las mismas columnas")
+        if not other.count:
+            return self
+        if not self.count:
+            self.count, self.mean, self.m2 = other.count, other.mean.copy(), other.m2.copy()
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 = self.m2 + other.m2 + np.outer(delta, delta) * (self.count * other.count / count)
+        self.mean = self.mean + delta * (other.count / count)
+        self.count = count
+        return self
+
+    def covariance(self):
+        cov = self.m2 / (self.count - 1) if self.count > 1 else np.full_like(self.m2, np.nan)
+        return pd.DataFrame(cov, index=self.columns, columns=self.columns)
+
+    def correlation(self):
+        """Matriz de correlación de Pearson (NaN para columnas constantes, como DataFrame.corr())."""
+        cov = self.covariance().to_numpy()
+        std = np.sqrt(np.diag(cov))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = np.clip(cov / np.outer(std, std), -1, 1)
+        np.fill_diagonal(corr, np.where(std > 0, 1.0, np.nan))
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+    def to_dict(self):
+        return {'columns': self.columns, 'count': self.count, 'mean': self.mean.tolist(), 'm2': self.m2.tolist()}
+
+    @classmethod
+    def from_dict(cls, data):
+        comoments = cls(data['columns'])
+        comoments.count = data['count']
+        comoments.mean = np.asarray(data['mean'], dtype='float64')
+        comoments.m2 = np.asarray(data['m2'], dtype='float64')
+        return comoments
+
+
+def _column(df, col):
+    if col in df.columns:
+        return df[col].to_numpy(dtype='float64')
+    return getattr(df['InvoiceDate'].dt, DATE_PARTS[col]).to_numpy(dtype='float64')
@@ -0,0 +1,174 @@
+# Cubo OLAP País × Mes × Día de la semana × Hora
+# ----------------------------------------------
+# Casi todos los gráficos de las secciones 3 y 4 son cortes de las mismas
+# medidas (suma de TotalAmount, suma de Quantity y número de líneas) a lo largo
+# de Country, Month, DayOfWeek y Hour. El cubo guarda esas medidas en arrays
+# densos de NumPy, una celda por combinación de las cuatro dimensiones, junto a
+# los diccionarios de cada dimensión (etiqueta -> posición).
+#
+# En disco cada medida es un .npy que se abre con memoria mapeada y
+# dimensiones.json guarda las etiquetas. Una pregunta nueva ("ventas por hora
+# en Alemania en noviembre") es un corte y una suma sobre unos pocos miles de
+# celdas: se responde en milisegundos sin leer las transacciones.
+#
+#   cube = Cube.load()
+#   cube.query('TotalAmount', by='Hour', Country='Germany', Month=11)
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from retail.aggregation import factorize
+from retail.config import CACHE_DIR
+
+CUBE_DIR = os.path.join(CACHE_DIR, 'cubo')
+
+DIMENSIONS = ['Country', 'Month', 'DayOfWeek', 'Hour']
+
+# Medida -> tipo del array
+MEASURES = {'TotalAmount': 'float64', 'Quantity': 'int64', 'count': 'int64'}
+
+# Las dimensiones de calendario tienen etiquetas fijas
+CALENDAR_LABELS = {'Month': list(range(1, 13)), 'DayOfWeek': list(range(7)), 'Hour': list(range(24))}
+
+
+def parse_labels(text):
+    """Filtro escrito como texto: 'Germany' fija la dimensión, '11,12' la trocea."""
+    labels = text.split(',')
+    return labels if len(labels) > 1 else labels[0]
+
+
+class Cube:
+    """Medidas densas indexadas por dimensiones con etiquetas."""
+
+    def __init__(self, dimensions, measures):
+        # dimensions: nombre -> lista de etiquetas, en el orden de los ejes
+        # measures: nombre -> ndarray (o memmap) con un eje por dimensión
+        self.dimensions = dict(dimensions)
+        self.measures = dict(measures)
+        self._positions = {name: {label: pos for pos, label in enumerate(labels)}
+                           for name, labels in self.dimensions.items()}
+
+    @classmethod
+    def from_frame(cls, df):
+        """Cubo completo a partir de df_analysis (una pasada con bincount)."""
+        country_codes, countries = factorize(df['Country'])
+        codes = [country_codes] + [df[name].to_numpy(dtype='int64') - labels[0]
+                                   for name, labels in CALENDAR_LABELS.items()]
+        dimensions = {'Country': [str(country) for country in countries], **CALENDAR_LABELS}
+        shape = tuple(len(labels) for labels in dimensions.values())
+        cell = np.ravel_multi_index(codes, shape)
+        size = int(np.prod(shape))
+
+        measures = {
+            'TotalAmount': np.bincount(cell, weights=df['TotalAmount'].to_numpy(dtype='float64'), minlength=size),
+            'Quantity': np.bincount(cell, weights=df['Quantity'].to_numpy(dtype='float64'), minlength=size),
+            'count': np.bincount(cell, minlength=size),
+        }
+        return cls(dimensions, {name: values.astype(MEASURES[name]).reshape(shape)
+                                for name, values in measures.items()})
+
+    @property
+    def shape(self):
+        return tuple(len(labels) for labels in self.dimensions.values())
+
+    def save(self, directory=CUBE_DIR):
+        # Cada archivo se escribe aparte y se renombra: un proceso que ya tiene
+        # el cubo anterior mapeado en memoria (el servicio de consultas) sigue
+        # leyendo el archivo viejo en lugar de ver uno truncado
+        os.makedirs(directory, exist_ok=True)
+        for name, values in self.measures.items():
+            path = os.path.join(directory, f'{name}.npy')
+            with open(path + '.tmp', 'wb') as fh:
+                np.save(fh, np.ascontiguousarray(values))
+            os.replace(path + '.tmp', path)
+        path = os.path.join(directory, 'dimensiones.json')
+        with open(path + '.tmp', 'w', encoding='utf-8') as fh:
+            json.dump({'dimensions': self.dimensions, 'measures': list(self.measures)}, fh, indent=2,
+                      ensure_ascii=False)
+        os.replace(path + '.tmp', path)
+
+    @classmethod
+    def load(cls, directory=CUBE_DIR):
+        """Abre el cubo guardado; los arrays se leen con memoria mapeada."""
+        with open(os.path.join(directory, 'dimensiones.json'), encoding='utf-8') as fh:
+            meta = json.load(fh)
+        measures = {name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r')
+                    for name in meta['measures']}
+        return cls(meta['dimensions'], measures)
+
+    @staticmethod
+    def exists(directory=CUBE_DIR):
+        return os.path.exists(os.path.join(directory, 'dimensiones.json'))
+
+    def _axis(self, dimension):
+        if dimension not in self.dimensions:
+            raise KeyError(f"Dimensión desconocida: {dimension} (use {', '.join(self.dimensions)})")
+        return list(self.dimensions).index(dimension)
+
+    def _position(self, dimension, label):
+        positions = self._positions[dimension]
+        if label not in positions:
+            # Las etiquetas que llegan como texto (línea de comandos) se
+            # convierten al tipo de la dimensión
+            labels = self.dimensions[dimension]
+            if isinstance(label, str) and labels and isinstance(labels[0], int) and label.lstrip('-').isdigit():
+                label = int(label)
+            if label not in positions:
+                raise KeyError(f"{dimension} no tiene la etiqueta {label!r}")
+        return positions[label]
+
+    def slice(self, **selection):
+        """Fija una etiqueta por dimensión y elimina esas dimensiones del cubo."""
+        index = [slice(None)] * len(self.dimensions)
+        for dimension, label in selection.items():
+            index[self._axis(dimension)] = self._position(dimension, label)
+        dimensions = {name: labels for name, labels in self.dimensions.items() if name not in selection}
+        return Cube(dimensions, {name: values[tuple(index)] for name, values in self.measures.items()})
+
+    def dice(self, **selection):
+        """Restringe cada dimensión a una lista de etiquetas (se conservan las dimensiones)."""
+        dimensions = dict(self.dimensions)
+        measures = dict(self.measures)
+        for dimension, labels in selection.items():
+            axis = self._axis(dimension)
+            positions = [self._position(dimension, label) for label in labels]
+            dimensions[dimension] = [self.dimensions[dimension][pos] for pos in positions]
+            measures = {name: np.take(values, positions, axis=axis) for name, values in measures.items()}
+        return Cube(dimensions, measures)
+
+    def rollup(self, measure='TotalAmount', by=()):
+        """Suma `measure` sobre todas las dimensiones que no están en `by`.
+
+        Devuelve un escalar (by vacío) o una Serie indexada por las
+        dimensiones de `by`, en ese orden.
+        """
+        if measure not in self.measures:
+            raise KeyError(f"Medida desconocida: {measure} (use {', '.join(self.measures)})")
+        by = [by] if isinstance(by, str) else list(by)
+        axes = [self._axis(dimension) for dimension in by]
+        values = self.measures[measure]
+        other = tuple(axis for axis in range(values.ndim) if axis not in axes)
+        values = np.asarray(values.sum(axis=other))
+        if not by:
+            return values.item()
+        # Los ejes que quedan están en el orden del cubo: se llevan al de `by`
+        values = np.transpose(values, np.argsort(np.argsort(axes)))
+        if len(by) == 1:
+            index = pd.Index(self.dimensions[by[0]], name=by[0])
+        else:
+            index = pd.MultiIndex.from_product([self.dimensions[dimension] for dimension in by], names=by)
+        return pd.Series(values.ravel(), index=index, name=measure)
+
+    def query(self, measure='TotalAmount', by=(), **filters):
+        """Rollup de `measure` por `by` con filtros: una etiqueta corta y una lista trocea.
+
+        cube.query('TotalAmount', by='Hour', Country='Germany', Month=11)
+        cube.query('count', by=['Country', 'Month'], Month=[11, 12])
+        """
+        fixed = {name: value for name, value in filters.items() if not isinstance(value, (list, tuple))}
+        ranges = {name: value for name, value in filters.items() if isinstance(value, (list, tuple))}
+        cube = self.dice(**ranges) if ranges else self
+        return (cube.slice(**fixed) if fixed else cube).rollup(measure, by)
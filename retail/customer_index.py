@@ -0,0 +1,182 @@
+# Índice de historial por cliente
+# -------------------------------
+# Cualquier pregunta sobre un cliente (sus facturas, su gasto en el tiempo, los
+# datos de su RFM) obligaba a filtrar otra vez todas las transacciones. El
+# índice ordena una sola vez las transacciones con CustomerID por
+# (CustomerID, InvoiceDate) y guarda en cache/clientes:
+# - una columna por archivo .npy (los textos como códigos int32 y sus
+#   etiquetas en indice.json),
+# - offsets.npy: las filas del cliente i son offsets[i]:offsets[i + 1],
+# - slots.npy: tabla de acceso directo CustomerID - primer id -> posición del
+#   cliente (-1 si no existe), de modo que encontrar a un cliente es O(1).
+# Los arrays se abren con memoria mapeada: el historial de un cliente es un
+# corte contiguo que solo lee sus filas, sin recorrer el resto.
+#
+#   index = CustomerIndex.load()
+#   index.history(12347)
+#   index.invoices(12347)
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from retail.aggregation import factorize
+from retail.config import CACHE_DIR
+from retail.schema import customer_ids
+
+CUSTOMER_INDEX_DIR = os.path.join(CACHE_DIR, 'clientes')
+
+# Columnas del historial -> tipo guardado ('codes': texto como códigos + etiquetas)
+INDEX_COLUMNS = {
+    'InvoiceNo': 'codes',
+    'InvoiceDate': 'datetime64[ns]',
+    'StockCode': 'codes',
+    'Description': 'codes',
+    'Quantity': 'int64',
+    'UnitPrice': 'float64',
+    'TotalAmount': 'float64',
+    'Country': 'codes',
+}
+
+# Rango máximo de CustomerID para la tabla de acceso directo; con rangos
+# mayores se busca por bisección en customers.npy
+MAX_DIRECT_SLOTS = 10_000_000
+
+
+class CustomerIndex:
+    """Transacciones ordenadas por cliente con offsets y búsqueda directa por CustomerID."""
+
+    def __init__(self, customers, offsets, columns, labels, slots=None):
+        self.customers = customers
+        self.offsets = offsets
+        self.columns = columns
+        self.labels = {name: np.asarray(values, dtype=object) for name, values in labels.items()}
+        self.slots = slots
+
+    @classmethod
+    def from_frame(cls, df):
+        """Índice de las filas de df_analysis con CustomerID válido."""
+        valid = df['CustomerID'].notna().to_numpy()
+        ids = customer_ids(df, valid)
+        rows = df.loc[valid]
+        timestamps = rows['InvoiceDate'].to_numpy().astype('datetime64[ns]')
+        order = np.lexsort((timestamps.astype('int64'), ids))
+        ids = ids[order]
+        customers, starts = np.unique(ids, return_index=True)
+        offsets = np.append(starts, len(ids)).astype('int64')
+
+        columns, labels = {}, {}
+        for name, kind in INDEX_COLUMNS.items():
+            if kind == 'codes':
+                codes, uniques = factorize(rows[name])
+                columns[name] = codes.astype('int32')[order]
+                labels[name] = [str(value) for value in uniques]
+            elif name == 'InvoiceDate':
+                columns[name] = timestamps[order]
+            else:
+                columns[name] = rows[name].to_numpy(dtype=kind)[order]
+        return cls(customers.astype('int64'), offsets, columns, labels, _direct_slots(customers))
+
+    def save(self, directory=CUSTOMER_INDEX_DIR):
+        # Igual que el cubo: cada archivo se escribe aparte y se renombra, e
+        # indice.json se escribe el último
+        os.makedirs(directory, exist_ok=True)
+        arrays = {'customers': self.customers, 'offsets': self.offsets, **self.columns}
+        if self.slots is not None:
+            arrays['slots'] = self.slots
+        for name, values in arrays.items():
+            path = os.path.join(directory, f'{name}.npy')
+            with open(path + '.tmp', 'wb') as fh:
+                np.save(fh, np.ascontiguousarray(values))
+            os.replace(path + '.tmp', path)
+        path = os.path.join(directory, 'indice.json')
+        with open(path + '.tmp', 'w', encoding='utf-8') as fh:
+            json.dump({'columns': list(self.columns), 'labels': {name: list(values) for name, values in
+                                                                  self.labels.items()},
+                       'customers': len(self.customers), 'rows': int(self.offsets[-1]),
+                       'slots': self.slots is not None}, fh, ensure_ascii=False)
+        os.replace(path + '.tmp', path)
+        return directory
+
+    @classmethod
+    def load(cls, directory=CUSTOMER_INDEX_DIR):
+        """Abre el índice guardado; los arrays se leen con memoria mapeada."""
+        with open(os.path.join(directory, 'indice.json'), encoding='utf-8') as fh:
+            meta = json.load(fh)
+
+        def array(name):
+            return np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r')
+
+        return cls(array('customers'), array('offsets'), {name: array(name) for name in meta['columns']},
+                   meta['labels'], array('slots') if meta['slots'] else None)
+
+    @staticmethod
+    def exists(directory=CUSTOMER_INDEX_DIR):
+        return os.path.exists(os.path.join(directory, 'indice.json'))
+
+    def __len__(self):
+        return len(self.customers)
+
+    def position(self, customer_id):
+        """Posición del cliente en el índice; KeyError si no tiene transacciones."""
+        customer_id = int(customer_id)
+        first = int(self.customers[0]) if len(self.customers) else 0
+        if self.slots is not None:
+            slot = customer_id - first
+            position = int(self.slots[slot]) if 0 <= slot < len(self.slots) else -1
+        else:
+            position = int(np.searchsorted(self.customers, customer_id))
+            if position == len(self.customers) or self.customers[position] != customer_id:
+                position = -1
+        if position < 0:
+            raise KeyError(f"Cliente desconocido: {customer_id}")
+        return position
+
+    def rows(self, customer_id):
+        """Rango [inicio, fin) de las filas del cliente."""
+        position = self.position(customer_id)
+        return int(self.offsets[position]), int(self.offsets[position + 1])
+
+    def history(self, customer_id):
+        """Transacciones del cliente ordenadas por fecha (un corte de cada columna)."""
+        start, end = self.rows(customer_id)
+        data = {}
+        for name, values in self.columns.items():
+            part = np.asarray(values[start:end])
+            data[name] = self.labels[name][part] if name in self.labels else part
+        return pd.DataFrame(data)
+
+    def invoices(self, customer_id):
+        """Facturas del cliente: fecha, líneas, unidades e importe."""
+        history = self.history(customer_id)
+        return history.groupby('InvoiceNo', sort=False).agg(
+            InvoiceDate=('InvoiceDate', 'first'), lines=('StockCode', 'size'), Quantity=('Quantity', 'sum'),
+            TotalAmount=('TotalAmount', 'sum'))
+
+    def spend_over_time(self, customer_id, freq='MS'):
+        """Gasto del cliente por periodo (por defecto, por mes)."""
+        history = self.history(customer_id)
+        return history.set_index('InvoiceDate')['TotalAmount'].resample(freq).sum()
+
+    def rfm_inputs(self, customer_id, max_date=None):
+        """Última compra, número de facturas y gasto total del cliente (las entradas de su RFM).
+
+        Con `max_date` (fecha más reciente del análisis) se añade Recency en días.
+        """
+        history = self.history(customer_id)
+        inputs = {'LastPurchase': history['InvoiceDate'].max(), 'Frequency': history['InvoiceNo'].nunique(),
+                  'Monetary': history['TotalAmount'].sum()}
+        if max_date is not None:
+            inputs['Recency'] = (pd.Timestamp(max_date) - inputs['LastPurchase']).days
+        return pd.Series(inputs, name=int(customer_id))
+
+
+def _direct_slots(customers):
+    # Tabla CustomerID - primer id -> posición, si el rango de ids es razonable
+    if not len(customers) or customers[-1] - customers[0] >= MAX_DIRECT_SLOTS:
+        return None
+    slots = np.full(int(customers[-1] - customers[0]) + 1, -1, dtype='int32')
+    slots[customers - customers[0]] = np.arange(len(customers), dtype='int32')
+    return slots
@@ -0,0 +1,173 @@
+# Resúmenes de distribución pre-agrupados
+# ---------------------------------------
+# Cada gráfico de distribución llamaba a sns.histplot(..., kde=True) y a
+# sns.boxplot sobre la columna completa (400 000+ filas): una estimación de
+# densidad por núcleos y una ordenación completa por gráfico. Aquí cada
+# distribución se resume una sola vez, con NumPy vectorizado, en un
+# histograma de bins finos fijos sobre el rango del gráfico [low, high] más
+# los momentos, el mínimo y el máximo. De ese resumen salen:
+# - el histograma de 50 barras sobre el rango ocupado (cada barra agrupa
+#   bins finos contiguos),
+# - un KDE aproximado: los conteos finos convolucionados con un núcleo
+#   gaussiano con el ancho de banda de Scott (el que usa seaborn),
+# - las estadísticas del boxplot (cuartiles interpolados en los bins finos,
+#   bigotes a 1,5·IQR y una muestra acotada de valores atípicos).
+# El coste de dibujar ya no depende del número de filas. Dos resúmenes con el
+# mismo rango se combinan sumando conteos y momentos, y se guardan como JSON.
+
+import numpy as np
+
+# Bins finos del resumen y barras del histograma (FINE_BINS múltiplo de HISTOGRAM_BINS)
+FINE_BINS = 1000
+HISTOGRAM_BINS = 50
+
+# Valores atípicos que se dibujan como máximo en un boxplot
+MAX_FLIERS = 200
+
+# Columnas por fila con gráfico de distribución -> límite superior del gráfico
+ROW_DISTRIBUTIONS = {'Quantity': 50, 'UnitPrice': 100, 'TotalAmount': 500}
+
+
+class DistributionSummary:
+    """Histograma fino y momentos de unos valores recortados a [low, high]."""
+
+    def __init__(self, low, high, fine_bins=FINE_BINS):
+        self.low = float(low)
+        self.high = float(high)
+        self.fine_bins = fine_bins
+        self.counts = np.zeros(fine_bins, dtype='int64')
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    @classmethod
+    def from_values(cls, values, low, high, fine_bins=FINE_BINS):
+        return cls(low, high, fine_bins).update(values)
+
+    @property
+    def count(self):
+        return int(self.counts.sum())
+
+    @property
+    def width(self):
+        return (self.high - self.low) / self.fine_bins
+
+    def update(self, values):
+        """Incorpora valores (se recortan a [low, high], igual que Series.clip; los NaN se ignoran)."""
+        values = np.asarray(values, dtype='float64').ravel()
+        values = np.clip(values[~np.isnan(values)], self.low, self.high)
+        if not len(values):
+            return self
+        bins = np.minimum(((values - self.low) / self.width).astype('int64'), self.fine_bins - 1)
+        # Un valor justo en un borde puede quedar en el bin vecino por redondeo:
+        # se corrige para que coincida con los bordes low + i·width de histogram()
+        bins -= values < self.low + bins * self.width
+        bins += (bins < self.fine_bins - 1) & (values >= self.low + (bins + 1) * self.width)
+        self.counts += np.bincount(bins, minlength=self.fine_bins)
+        self.total += values.sum()
+        self.total_sq += np.square(values).sum()
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        return self
+
+    def merge(self, other):
+        """Combina `other` (mismo rango y bins) en este resumen y lo devuelve."""
+        if (other.low, other.high, other.fine_bins) != (self.low, self.high, self.fine_bins):
+            raise ValueError("Solo se pueden combinar resúmenes con el mismo rango y número de bins")
+        self.counts = self.counts + other.counts
+        self.total += other.total
+        self.total_sq += other.total_sq
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def copy(self):
+        return DistributionSummary.from_dict(self.to_dict())
+
+    def std(self):
+        n = self.count
+        if n < 2:
+            return float('nan')
+        mean = self.total / n
+        return float(np.sqrt(max(self.total_sq - n * mean * mean, 0.0) / (n - 1)))
+
+    def _span(self):
+        """Primer y último (exclusivo) bin fino con valores."""
+        present = np.flatnonzero(self.counts)
+        return (int(present[0]), int(present[-1]) + 1) if len(present) else (0, self.fine_bins)
+
+    def histogram(self, bins=HISTOGRAM_BINS):
+        """Bordes y conteos de `bins` barras sobre el rango ocupado, como sns.histplot.
+
+        Cada barra agrupa bins finos contiguos (con FINE_BINS = 1000 los bordes
+        se desplazan como mucho una milésima del rango del gráfico).
+        """
+        first, last = self._span()
+        cuts = np.unique(np.round(np.linspace(first, last, bins + 1)).astype('int64'))
+        return self.low + cuts * self.width, np.add.reduceat(self.counts, cuts[:-1])[:len(cuts) - 1]
+
+    def kde(self, bins=HISTOGRAM_BINS):
+        """KDE gaussiano aproximado sobre los bins finos, en la escala del histograma de `bins` barras.
+
+        Devuelve (x, y) dentro de [min, max], como el KDE de sns.histplot.
+        """
+        n = self.count
+        centers = self.low + (np.arange(self.fine_bins) + 0.5) * self.width
+        std = self.std()
+        if n < 2 or not std > 0:
+            return centers[:0], centers[:0]
+        # Ancho de banda de Scott (gaussian_kde de scipy, que usa seaborn)
+        sigma = std * n ** (-1 / 5) / self.width
+        radius = int(min(np.ceil(4 * sigma), self.fine_bins))
+        offsets = np.arange(-radius, radius + 1)
+        kernel = np.exp(-0.5 * (offsets / sigma) ** 2)
+        smooth = np.convolve(self.counts, kernel / kernel.sum(), mode='same')
+        inside = (centers >= self.min) & (centers <= self.max)
+        # Conteo por bin fino -> conteo por barra del histograma
+        first, last = self._span()
+        return centers[inside], smooth[inside] * ((last - first) / bins)
+
+    def quantile(self, q):
+        """Cuantil interpolando linealmente dentro de los bins finos."""
+        cumulative = np.cumsum(self.counts)
+        target = q * self.count
+        position = int(np.searchsorted(cumulative, target, side='left'))
+        position = min(position, self.fine_bins - 1)
+        before = cumulative[position - 1] if position else 0
+        inside = self.counts[position]
+        fraction = (target - before) / inside if inside else 0.0
+        return float(np.clip(self.low + (position + fraction) * self.width, self.min, self.max))
+
+    def box_stats(self, whis=1.5, max_fliers=MAX_FLIERS):
+        """Estadísticas para Axes.bxp: cuartiles, bigotes y valores atípicos (muestra acotada)."""
+        q1, median, q3 = (self.quantile(q) for q in (0.25, 0.5, 0.75))
+        iqr = q3 - q1
+        centers = np.clip(self.low + (np.arange(self.fine_bins) + 0.5) * self.width, self.min, self.max)
+        present = self.counts > 0
+        inner = present & (centers >= q1 - whis * iqr) & (centers <= q3 + whis * iqr)
+        whislo = min(centers[inner].min(), q1) if inner.any() else q1
+        whishi = max(centers[inner].max(), q3) if inner.any() else q3
+        # Un punto por bin fino con valores fuera de los bigotes, como mucho max_fliers
+        fliers = centers[present & ~inner]
+        if len(fliers) > max_fliers:
+            fliers = fliers[np.linspace(0, len(fliers) - 1, max_fliers).astype('int64')]
+        return {'med': median, 'q1': q1, 'q3': q3, 'whislo': whislo, 'whishi': whishi, 'fliers': fliers}
+
+    def to_dict(self):
+        return {'low': self.low, 'high': self.high, 'fine_bins': self.fine_bins, 'counts': self.counts.tolist(),
+                'total': self.total, 'total_sq': self.total_sq, 'min': self.min, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, data):
+        summary = cls(data['low'], data['high'], data['fine_bins'])
+        summary.counts = np.asarray(data['counts'], dtype='int64')
+        summary.total, summary.total_sq = data['total'], data['total_sq']
+        summary.min, summary.max = data['min'], data['max']
+        return summary
+
+
+def row_distributions(df):
+    """Resúmenes de las columnas de ROW_DISTRIBUTIONS de un bloque de df_analysis."""
+    return {col: DistributionSummary.from_values(df[col].to_numpy(dtype='float64'), 0, limit)
+            for col, limit in ROW_DISTRIBUTIONS.items()}
@@ -0,0 +1,70 @@
+# Exportación de las tablas del análisis
+# --------------------------------------
+# El modo "solo números" (python main.py --numbers-only) no dibuja: guarda las
+# tablas calculadas en JSON (un único archivo) o CSV (un archivo por tabla)
+# para que un proceso programado las consuma sin leer la salida impresa.
+# Este módulo no importa matplotlib ni seaborn.
+
+import json
+import os
+
+import pandas as pd
+
+from retail.cohorts import retention
+
+EXPORT_FORMATS = ['json', 'csv']
+
+
+def report_tables(results, segmentation):
+    """Tablas del informe a partir de AnalysisResults y la etapa de segmentación."""
+    return {
+        'country_counts': results.country_counts,
+        'country_sales': results.country_sales,
+        'monthly_sales': results.monthly_sales,
+        'monthly_quantity': results.monthly_quantity,
+        'weekday_sales': results.weekday_sales,
+        'hourly_sales': results.hourly_sales,
+        'top_products_quantity': results.top_products_quantity.head(10),
+        'top_products_revenue': results.top_products_revenue.head(10),
+        'order_size_stats': results.order_size.describe(),
+        'order_value_stats': results.order_value.describe(),
+        'customer_transactions_stats': results.customer_transactions.describe(),
+        'customer_spending_stats': results.customer_spending.describe(),
+        'daily_sales_stats': results.daily_sales.describe(),
+        'cohort_retention': retention(results.cohort_counts),
+        'rfm': segmentation['rfm'],
+        'segment_counts': segmentation['customer_categories'],
+    }
+
+
+def _as_frame(table):
+    if isinstance(table, pd.Series):
+        table = table.to_frame(table.name if table.name is not None else 'value')
+    if table.index.names == [None]:
+        table = table.rename_axis('statistic' if table.index.dtype == object else 'index')
+    return table.reset_index()
+
+
+def export_tables(tables, directory, fmt='json'):
+    """Guarda `tables` en `directory` y devuelve las rutas escritas."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Formato desconocido: {fmt} (use {', '.join(EXPORT_FORMATS)})")
+    os.makedirs(directory, exist_ok=True)
+    frames = {name: _as_frame(table) for name, table in tables.items()}
+
+    if fmt == 'csv':
+        paths = []
+        for name, frame in frames.items():
+            path = os.path.join(directory, f'{name}.csv')
+            frame.to_csv(path, index=False)
+            paths.append(path)
+        return paths
+
+    # to_json resuelve fechas, NaN y tipos de numpy; se vuelve a leer para
+    # escribir un único documento con una lista de registros por tabla
+    document = {name: json.loads(frame.to_json(orient='records', date_format='iso'))
+                for name, frame in frames.items()}
+    path = os.path.join(directory, 'tablas.json')
+    with open(path, 'w', encoding='utf-8') as fh:
+        json.dump(document, fh, indent=2, ensure_ascii=False)
+    return [path]
@@ -0,0 +1,168 @@
+# Modo incremental para archivos diarios de facturas
+# --------------------------------------------------
+# Cada día llega un archivo nuevo con facturas. En lugar de reprocesar todo el
+# histórico, el estado del análisis (todas las tablas agregadas que usa el
+# informe: ventas por mes, día de la semana y hora, países, productos, tamaño y
+# valor de cada factura, ventas diarias y estadísticas de clientes) se guarda en
+# cache/incremental como PartialAggregates. Un archivo nuevo se reduce a sus
+# propios agregados parciales, se combina con el estado y solo se regeneran los
+# gráficos cuyas tablas cambiaron.
+#
+# Los gráficos de distribución de Quantity/UnitPrice/TotalAmount se dibujan
+# desde los histogramas finos del estado (retail/distribution.py), la matriz
+# de correlación desde sus co-momentos (retail/correlation.py) y la retención
+# por cohortes desde los pares (cliente, mes) con compras (retail/cohorts.py);
+# todos se combinan igual que las tablas.
+
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from retail.aggregation import compute_aggregates, mismatched_tables
+from retail.cache import file_fingerprint
+from retail.config import CACHE_DIR, IMAGES_DIR
+from retail.render import render_charts
+from retail.rfm import score_rfm
+from retail.stages import AGGREGATE_CHARTS, aggregate_chart, row_distribution_chart, segmentation_chart
+from retail.streaming import DEFAULT_CHUNK_SIZE, PartialAggregates, aggregate_stream, clean_chunk, iter_source
+
+INCREMENTAL_DIR = os.path.join(CACHE_DIR, 'incremental')
+
+MANIFEST = 'archivos.csv'
+
+
+class IncrementalStore:
+    """Estado agregado persistido y la lista de archivos ya incorporados."""
+
+    def __init__(self, directory=INCREMENTAL_DIR):
+        self.directory = directory
+
+    @property
+    def state_dir(self):
+        return os.path.join(self.directory, 'estado')
+
+    def exists(self):
+        return os.path.exists(os.path.join(self.state_dir, 'estado.json'))
+
+    def load(self):
+        return PartialAggregates.load(self.state_dir) if self.exists() else PartialAggregates()
+
+    def processed_files(self):
+        path = os.path.join(self.directory, MANIFEST)
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=['sha256', 'path', 'rows'])
+        return pd.read_csv(path)
+
+    def save(self, state, rows, fingerprint, path):
+        """Guarda el estado y anota `path` (con las `rows` filas que aportó) en el manifiesto."""
+        # Se escribe en un directorio nuevo y se intercambia al final, para no
+        # dejar un estado a medio escribir si el proceso se interrumpe
+        new_dir = self.state_dir + '.nuevo'
+        old_dir = self.state_dir + '.anterior'
+        shutil.rmtree(new_dir, ignore_errors=True)
+        state.save(new_dir)
+        if os.path.exists(self.state_dir):
+            os.replace(self.state_dir, old_dir)
+        os.replace(new_dir, self.state_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+        manifest = self.processed_files()
+        manifest.loc[len(manifest)] = [fingerprint['sha256'], os.path.abspath(path), rows]
+        manifest.to_csv(os.path.join(self.directory, MANIFEST), index=False)
+
+    def update(self, path, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Incorpora `path` al estado.
+
+        Devuelve (resultados anteriores, resultados nuevos) como AnalysisResults,
+        o None si el archivo ya se había procesado.
+        """
+        fingerprint = file_fingerprint(path)
+        if fingerprint['sha256'] in set(self.processed_files()['sha256']):
+            return None
+
+        state = self.load()
+        before = state.finalize() if state.tables else None
+        delta = aggregate_stream(path, chunk_size)
+        state.merge(delta)
+        after = state.finalize()
+        self.save(state, delta.rows_in, fingerprint, path)
+        return before, after
+
+
+def changed_tables(before, after):
+    """Nombres de las tablas de AnalysisResults que cambiaron."""
+    if before is None:
+        return set(after.FIELDS)
+    changed = set()
+    for name in after.FIELDS:
+        old, new = getattr(before, name), getattr(after, name)
+        if old is None or not old.equals(new):
+            changed.add(name)
+    return changed
+
+
+def affected_charts(before, after):
+    """Gráficos a regenerar: los que leen alguna tabla que cambió.
+
+    Los gráficos de top 10 solo se regeneran si cambian los 10 primeros; los de
+    distribución por fila, si cambió su histograma.
+    """
+    changed = changed_tables(before, after)
+    charts = []
+    for filename, (tables, _) in AGGREGATE_CHARTS.items():
+        if not changed.intersection(tables):
+            continue
+        if before is not None and filename.startswith('top_10'):
+            old_chart, new_chart = aggregate_chart(filename, before), aggregate_chart(filename, after)
+            if old_chart.data.equals(new_chart.data):
+                continue
+        charts.append(aggregate_chart(filename, after))
+
+    for col, summary in after.distributions.items():
+        old = before.distributions.get(col) if before is not None else None
+        if old is None or not np.array_equal(old.counts, summary.counts):
+            charts.append(row_distribution_chart(col, after))
+
+    if 'rfm' in changed:
+        new_categories = score_rfm(after.rfm)['Customer_Category'].value_counts()
+        if before is None or not score_rfm(before.rfm)['Customer_Category'].value_counts().equals(new_categories):
+            charts.append(segmentation_chart(new_categories))
+    return charts
+
+
+def update_and_render(path, store=None, images_dir=IMAGES_DIR, chunk_size=DEFAULT_CHUNK_SIZE, workers=None):
+    """Incorpora `path` y regenera solo los gráficos afectados.
+
+    Devuelve (tablas que cambiaron, rutas de gráficos regenerados, resultados
+    actualizados), o None si el archivo ya estaba incorporado.
+    """
+    store = store or IncrementalStore()
+    outcome = store.update(path, chunk_size)
+    if outcome is None:
+        return None
+    before, after = outcome
+    charts = affected_charts(before, after)
+    paths = render_charts(charts, images_dir, workers=workers) if charts else []
+    return sorted(changed_tables(before, after)), paths, after
+
+
+def verify_against_full(paths, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Comprueba que aplicar `paths` uno a uno da lo mismo que un recálculo completo.
+
+    El recálculo completo concatena todos los archivos en memoria y usa
+    compute_aggregates(), un camino de código independiente de los merges.
+    Devuelve la lista de tablas que no coinciden (vacía si todo es correcto).
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        store = IncrementalStore(tmp)
+        for path in paths:
+            store.update(path, chunk_size)
+        incremental = store.load().finalize()
+
+    transactions = pd.concat([clean_chunk(chunk) for path in paths for chunk in iter_source(path, chunk_size)],
+                             ignore_index=True)
+    full = compute_aggregates(transactions)
+    return mismatched_tables(full, incremental)
@@ -0,0 +1,144 @@
+# Ingesta de varios libros, hojas y CSV
+# -------------------------------------
+# La exportación Online Retail II trae una hoja por año y cada tienda regional
+# envía su propio libro. ingest() recibe una lista de fuentes:
+# - rutas o patrones glob (datos/*.xlsx, ventas_*.csv),
+# - LIBRO#HOJA para leer una sola hoja; un libro sin hoja se lee entero (una
+#   parte por hoja).
+# Cada parte (un CSV, un Parquet o una hoja) se lee en un pool de procesos:
+# leer Excel es trabajo de CPU en Python, así que los hilos no ayudarían. Los
+# nombres de columna se normalizan (Invoice -> InvoiceNo, Price -> UnitPrice,
+# Customer ID -> CustomerID; ver retail/schema.py) y se fijan los tipos en cada
+# proceso. Al final, cada columna de la tabla se reserva una sola vez con el
+# total de filas y las partes se copian en su tramo, en el orden de las fuentes,
+# en lugar de concatenar tablas intermedias.
+#
+#   df = ingest(['regiones/*.xlsx', 'online_retail_II.xlsx#Year 2010-2011'], workers=4)
+
+import glob
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from retail.cache import file_fingerprint, read_source
+
+# Separa la ruta de un libro del nombre de una de sus hojas
+SHEET_SEPARATOR = '#'
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xlsm', '.xls')
+
+# Tipo de cada columna de la tabla combinada
+INGEST_DTYPES = {
+    'InvoiceNo': object,
+    'StockCode': object,
+    'Description': object,
+    'Quantity': 'int64',
+    'InvoiceDate': 'datetime64[ns]',
+    'UnitPrice': 'float64',
+    'CustomerID': 'float64',
+    'Country': object,
+}
+
+
+def split_sheet(spec):
+    """(ruta, hoja) de una fuente LIBRO#HOJA; hoja es None si no se indica."""
+    path, separator, sheet = spec.partition(SHEET_SEPARATOR)
+    return path, (sheet if separator else None)
+
+
+def excel_sheets(path):
+    """Nombres de las hojas de un libro de Excel."""
+    with pd.ExcelFile(path) as book:
+        return book.sheet_names
+
+
+def expand_sources(specs):
+    """Partes (ruta, hoja) de una lista de rutas, patrones glob y fuentes LIBRO#HOJA."""
+    parts = []
+    for spec in [specs] if isinstance(specs, str) else specs:
+        pattern, sheet = split_sheet(spec)
+        paths = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        if not paths:
+            raise FileNotFoundError(f"Ningún archivo coincide con {pattern}")
+        for path in paths:
+            if not path.lower().endswith(EXCEL_EXTENSIONS):
+                if sheet is not None:
+                    raise ValueError(f"{path} no es un libro de Excel: no tiene hojas")
+                parts.append((path, None))
+            elif sheet is not None:
+                parts.append((path, sheet))
+            else:
+                parts.extend((path, name) for name in excel_sheets(path))
+    return parts
+
+
+def source_paths(specs):
+    """Archivos distintos de `specs`, en orden (sin abrir los libros para listar sus hojas)."""
+    paths = []
+    for spec in [specs] if isinstance(specs, str) else specs:
+        pattern, _ = split_sheet(spec)
+        for path in sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]:
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+
+def part_label(part):
+    path, sheet = part
+    return path if sheet is None else f'{path}{SHEET_SEPARATOR}{sheet}'
+
+
+def read_part(part):
+    """Tabla de una parte con las columnas de INGEST_DTYPES (nombres y tipos normalizados)."""
+    df = read_source(*part)
+    missing = [col for col in INGEST_DTYPES if col not in df.columns]
+    if missing:
+        raise ValueError(f"{part_label(part)}: faltan las columnas {', '.join(missing)}")
+    return df[list(INGEST_DTYPES)]
+
+
+def read_parts(parts, workers=None):
+    """Tablas de `parts` (en el mismo orden), leídas en `workers` procesos."""
+    workers = min(workers or os.cpu_count() or 1, len(parts))
+    if workers <= 1:
+        return [read_part(part) for part in parts]
+    # Los archivos grandes primero reparten mejor la carga entre procesos
+    order = sorted(range(len(parts)), key=lambda i: os.path.getsize(parts[i][0]), reverse=True)
+    frames = [None] * len(parts)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for position, frame in zip(order, pool.map(read_part, [parts[i] for i in order])):
+            frames[position] = frame
+    return frames
+
+
+def combine_parts(frames):
+    """Una tabla con las filas de `frames`: cada columna se reserva una vez y se llena por tramos."""
+    total = sum(len(frame) for frame in frames)
+    columns = {}
+    for col, dtype in INGEST_DTYPES.items():
+        values = np.empty(total, dtype=dtype)
+        start = 0
+        for frame in frames:
+            values[start:start + len(frame)] = frame[col].to_numpy(dtype=dtype)
+            start += len(frame)
+        columns[col] = values
+    return pd.DataFrame(columns, copy=False)
+
+
+def ingest(specs, workers=None):
+    """Lee todas las fuentes de `specs` en paralelo y devuelve una sola tabla tipada."""
+    parts = expand_sources(specs)
+    frames = read_parts(parts, workers)
+    return combine_parts(frames)
+
+
+def sources_fingerprint(specs):
+    """SHA-256 del contenido de todas las partes (cambia si cambia cualquier archivo u hoja)."""
+    digest = hashlib.sha256()
+    for path, sheet in expand_sources(specs):
+        digest.update(file_fingerprint(path)['sha256'].encode())
+        digest.update(str(sheet).encode())
+    return digest.hexdigest()
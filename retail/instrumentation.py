@@ -0,0 +1,143 @@
+# Instrumentación por etapa
+# -------------------------
+# Cuando una ejecución se vuelve lenta hay que saber qué etapa es la culpable
+# (la lectura del Excel, la extracción de fechas, el RFM, los gráficos...).
+# Un Tracer se conecta al Pipeline y envuelve cada etapa que se calcula:
+# registra tiempo de reloj, CPU del proceso y de los procesos hijos ya
+# terminados (el pool que dibuja), pico de memoria con tracemalloc y filas de
+# entrada y salida. Las etapas leídas de la cache de disco también aparecen,
+# marcadas como `cached`. El resultado se guarda como JSON y, opcionalmente,
+# en el formato de Chrome trace (chrome://tracing o https://ui.perfetto.dev).
+# Una única etapa puede ejecutarse además bajo cProfile.
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import time
+import tracemalloc
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def children_cpu():
+    """CPU (usuario + sistema) de los procesos hijos ya finalizados."""
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def max_rss_mb():
+    """Pico de memoria residente del proceso (None si no se puede medir)."""
+    if resource is None:
+        return None
+    # ru_maxrss está en KB en Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def count_rows(value):
+    """Filas de un DataFrame/Serie (None para otros resultados)."""
+    return len(value) if isinstance(value, (pd.DataFrame, pd.Series)) else None
+
+
+class Tracer:
+    """Registra métricas de cada etapa ejecutada por un Pipeline."""
+
+    def __init__(self, trace_memory=True, profile_stage=None, profile_path=None):
+        self.trace_memory = trace_memory
+        self.profile_stage = profile_stage
+        self.profile_path = profile_path or (f'perfil-{profile_stage}.prof' if profile_stage else None)
+        self.events = []
+        self._origin = time.perf_counter()
+        self._started_tracemalloc = False
+
+    def call(self, name, func, inputs):
+        """Ejecuta func(*inputs) como la etapa `name` y registra sus métricas."""
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            memory_before, _ = tracemalloc.get_traced_memory()
+
+        profiler = cProfile.Profile() if name == self.profile_stage else None
+        start, cpu, children = time.perf_counter(), time.process_time(), children_cpu()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            result = func(*inputs)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+        end = time.perf_counter()
+
+        rows_in = [rows for rows in map(count_rows, inputs) if rows is not None]
+        event = {
+            'stage': name,
+            'start_s': start - self._origin,
+            'wall_s': end - start,
+            'cpu_s': time.process_time() - cpu,
+            'children_cpu_s': children_cpu() - children,
+            'rows_in': sum(rows_in) if rows_in else None,
+            'rows_out': count_rows(result),
+            'max_rss_mb': max_rss_mb(),
+            'cached': False,
+        }
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            event['peak_traced_mb'] = (peak - memory_before) / 2 ** 20
+            event['retained_mb'] = (current - memory_before) / 2 ** 20
+        if profiler is not None:
+            profiler.dump_stats(self.profile_path)
+            event['profile'] = os.path.abspath(self.profile_path)
+            self._print_profile(profiler)
+        self.events.append(event)
+        return result
+
+    def cached(self, name, result, wall_s):
+        """Registra una etapa leída desde la cache de disco."""
+        self.events.append({'stage': name, 'start_s': time.perf_counter() - wall_s - self._origin,
+                            'wall_s': wall_s, 'rows_out': count_rows(result), 'cached': True})
+
+    def close(self):
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def summary(self):
+        """Tabla con una fila por etapa."""
+        columns = ['wall_s', 'cpu_s', 'children_cpu_s', 'peak_traced_mb', 'rows_in', 'rows_out', 'cached']
+        table = pd.DataFrame(self.events).set_index('stage') if self.events else pd.DataFrame(columns=columns)
+        table = table.reindex(columns=[col for col in columns if col in table.columns])
+        for col in ('rows_in', 'rows_out'):
+            if col in table.columns:
+                table[col] = table[col].astype('Int64')
+        return table
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as fh:
+            json.dump({'stages': self.events, 'total_wall_s': sum(event['wall_s'] for event in self.events)}, fh,
+                      indent=2)
+
+    def write_chrome_trace(self, path):
+        """Eventos completos ('X') en microsegundos, uno por etapa."""
+        pid = os.getpid()
+        trace = [{'name': event['stage'], 'cat': 'cache' if event['cached'] else 'etapa', 'ph': 'X',
+                  'ts': event['start_s'] * 1e6, 'dur': event['wall_s'] * 1e6, 'pid': pid, 'tid': 1,
+                  'args': {key: value for key, value in event.items() if key not in ('stage', 'start_s')}}
+                 for event in self.events]
+        with open(path, 'w', encoding='utf-8') as fh:
+            json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, fh)
+
+    def _print_profile(self, profiler):
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(20)
+        print(f"\nPerfil de la etapa '{self.profile_stage}' (guardado en {self.profile_path}):")
+        print(stream.getvalue())
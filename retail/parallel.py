@@ -0,0 +1,89 @@
+# Map-reduce en varios procesos
+# -----------------------------
+# Las transacciones limpias se parten por una clave (mes o país) y cada
+# partición se reduce a PartialAggregates en un pool de procesos; luego los
+# parciales se combinan con merge(), el mismo mecanismo del modo por bloques.
+# Las estadísticas por factura y por cliente que cruzan particiones (un cliente
+# compra en varios meses) se resuelven en el merge: sumas, máximos y la tabla
+# factura -> cliente. Los parciales se combinan siempre en el orden de las
+# particiones, así que el resultado no depende del número de procesos.
+#
+# La fase map usa los mismos kernels que compute_aggregates() (cada clave se
+# factoriza una vez y las tablas salen de np.bincount) y no calcula momentos ni
+# sketches, que finalize() no necesita. Cada tarea lleva solo las filas de su
+# partición y las columnas de MAP_COLUMNS, no el DataFrame completo.
+#
+# Aun así el proceso principal hace por fila más trabajo que la pasada en
+# serie: partir y serializar las particiones, recibir los parciales y
+# combinarlos (≈0,45 µs por fila frente a ≈0,33 µs de compute_aggregates con
+# los datos sintéticos). Ese trabajo crece con las filas igual que la pasada en
+# serie, así que con esta forma de datos no hay número de filas a partir del
+# cual compense; con un solo proceso la etapa usa directamente la pasada en
+# serie (ver build_pipeline en retail/stages.py).
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from retail.aggregation import factorize
+from retail.streaming import PartialAggregates
+
+# Claves de partición disponibles -> columna de df_analysis
+PARTITION_KEYS = {'month': 'Month', 'country': 'Country'}
+
+# Columnas que usa PartialAggregates.from_frame (Year y Day, para no volver a
+# calcularlas desde InvoiceDate en la matriz de correlación)
+MAP_COLUMNS = ['InvoiceNo', 'StockCode', 'Description', 'Quantity', 'InvoiceDate', 'UnitPrice', 'CustomerID',
+               'Country', 'Year', 'Month', 'Day', 'DayOfWeek', 'Hour', 'TotalAmount']
+
+
+def map_frame(df_analysis):
+    """Columnas de df_analysis que necesita la fase map, más la hora de cada venta (HourStart)."""
+    frame = df_analysis[MAP_COLUMNS]
+    return frame.assign(HourStart=frame['InvoiceDate'].dt.floor('h'))
+
+
+def partition_positions(frame, key):
+    """Posiciones de las filas de cada partición, de la más grande a la más pequeña."""
+    if key not in PARTITION_KEYS:
+        raise ValueError(f"Clave de partición desconocida: {key} (use {', '.join(PARTITION_KEYS)})")
+    codes, _ = factorize(frame[PARTITION_KEYS[key]])
+    order = np.argsort(codes, kind='stable')
+    boundaries = np.flatnonzero(np.diff(codes[order])) + 1
+    parts = np.split(order, boundaries)
+    # Las particiones grandes primero reparten mejor la carga entre procesos
+    return sorted(parts, key=len, reverse=True)
+
+
+def partition_aggregates(part):
+    """Agregados parciales de las filas de una partición."""
+    return PartialAggregates.from_frame(part, moments=False)
+
+
+def pool_workers(workers=None):
+    """Procesos del pool: `workers` o uno por núcleo."""
+    return workers or os.cpu_count() or 1
+
+
+def map_partitions(frame, parts, workers=None):
+    """Agregados parciales de cada partición (en el orden de `parts`)."""
+    workers = pool_workers(workers)
+    slices = (frame.iloc[positions] for positions in parts)
+    if workers == 1 or len(parts) <= 1:
+        return [partition_aggregates(part) for part in slices]
+    with ProcessPoolExecutor(max_workers=min(workers, len(parts))) as pool:
+        return list(pool.map(partition_aggregates, slices))
+
+
+def parallel_aggregates(df_analysis, key='month', workers=None):
+    """Las mismas tablas que compute_aggregates(), calculadas por particiones.
+
+    Devuelve un AnalysisResults.
+    """
+    frame = map_frame(df_analysis)
+    partials = map_partitions(frame, partition_positions(frame, key), workers)
+    # Los parciales ya están todos en memoria: las tablas se combinan una vez
+    total = PartialAggregates().merge_all(partials, fold=False)
+    total.rows_in = len(frame)
+    return total.finalize()
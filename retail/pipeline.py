@@ -0,0 +1,136 @@
+# Grafo de etapas con memoización
+# -------------------------------
+# Cada etapa declara su nombre, la función que la calcula y las etapas de las
+# que depende. Pedir una etapa ejecuta antes (una sola vez) todo lo que necesita
+# y guarda el resultado en memoria; las etapas marcadas con persist=True también
+# se guardan en disco, identificadas por una clave que combina el nombre de la
+# etapa, su versión y las claves de sus entradas. Así, si los datos de origen
+# no cambian, una nueva ejecución reutiliza los resultados ya calculados.
+# Con un `tracer` (ver retail/instrumentation.py) cada etapa se mide al ejecutarse.
+
+import hashlib
+import os
+import pickle
+import time
+
+
+class Stage:
+    """Una etapa del análisis: func(*resultados_de_inputs) -> resultado."""
+
+    def __init__(self, name, func, inputs=(), persist=False, version=1, key=None):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.persist = persist
+        self.version = version
+        # Para etapas raíz: función que devuelve una huella de sus datos de origen
+        self.key = key
+
+
+class Pipeline:
+    """Conjunto de etapas que se ejecutan bajo demanda respetando dependencias."""
+
+    def __init__(self, cache_dir=None, tracer=None):
+        self.stages = {}
+        self.cache_dir = cache_dir
+        self.tracer = tracer
+        self._results = {}
+        self._keys = {}
+
+    def add(self, name, func, inputs=(), persist=False, version=1, key=None):
+        for dependency in inputs:
+            if dependency not in self.stages:
+                raise KeyError(f"La etapa '{name}' depende de '{dependency}', que no está definida")
+        self.stages[name] = Stage(name, func, inputs, persist, version, key)
+        return self.stages[name]
+
+    def stage(self, name, inputs=(), persist=False, version=1, key=None):
+        """Decorador equivalente a add()."""
+        def register(func):
+            self.add(name, func, inputs, persist, version, key)
+            return func
+        return register
+
+    def order(self, targets):
+        """Etapas necesarias para `targets`, en orden de ejecución."""
+        ordered, seen = [], set()
+
+        def visit(name):
+            if name in seen:
+                return
+            if name not in self.stages:
+                raise KeyError(f"Etapa desconocida: '{name}'")
+            seen.add(name)
+            for dependency in self.stages[name].inputs:
+                visit(dependency)
+            ordered.append(name)
+
+        for target in targets:
+            visit(target)
+        return ordered
+
+    def run(self, name):
+        """Devuelve el resultado de `name`, calculándolo solo si hace falta."""
+        if name in self._results:
+            return self._results[name]
+        stage = self.stages[name]
+
+        # Si la etapa está en disco no hace falta calcular sus entradas
+        cache_path = self._cache_path(stage) if stage.persist else None
+        if cache_path and os.path.exists(cache_path):
+            start = time.perf_counter()
+            with open(cache_path, 'rb') as fh:
+                result = pickle.load(fh)
+            if self.tracer is not None:
+                self.tracer.cached(name, result, time.perf_counter() - start)
+        else:
+            inputs = [self.run(dependency) for dependency in stage.inputs]
+            if self.tracer is not None:
+                result = self.tracer.call(name, stage.func, inputs)
+            else:
+                result = stage.func(*inputs)
+            if cache_path:
+                self._store(cache_path, result)
+        self._results[name] = result
+        return result
+
+    def run_all(self, targets=None):
+        """Ejecuta `targets` (o todas las etapas) y devuelve sus resultados."""
+        targets = list(self.stages) if targets is None else list(targets)
+        # run() resuelve las dependencias bajo demanda: las entradas de una etapa
+        # leída desde disco no se llegan a calcular
+        for name in targets:
+            self.run(name)
+        return {name: self._results[name] for name in targets}
+
+    def invalidate(self, name):
+        """Olvida el resultado en memoria de `name` y de todo lo que depende de él."""
+        self._results.pop(name, None)
+        self._keys.pop(name, None)
+        for other in self.stages.values():
+            if name in other.inputs:
+                self.invalidate(other.name)
+
+    def stage_key(self, name):
+        """Huella de una etapa: nombre, versión y claves de sus entradas."""
+        if name not in self._keys:
+            stage = self.stages[name]
+            digest = hashlib.sha256(f'{stage.name}:{stage.version}'.encode())
+            if stage.key is not None:
+                digest.update(str(stage.key()).encode())
+            for dependency in stage.inputs:
+                digest.update(self.stage_key(dependency).encode())
+            self._keys[name] = digest.hexdigest()
+        return self._keys[name]
+
+    def _cache_path(self, stage):
+        if not self.cache_dir:
+            return None
+        return os.path.join(self.cache_dir, f'{stage.name}-{self.stage_key(stage.name)[:16]}.pkl')
+
+    def _store(self, path, result):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as fh:
+            pickle.dump(result, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
@@ -0,0 +1,176 @@
+# Render de gráficos en paralelo
+# ------------------------------
+# Las secciones del análisis no dibujan: devuelven objetos Chart con los datos
+# ya agregados (series pequeñas, no el DataFrame completo) y las opciones del
+# gráfico. render_charts() los dibuja en un pool de procesos con el backend Agg
+# (sin pantalla) y cierra cada figura al guardarla, de modo que la memoria no
+# crece con el número de gráficos. matplotlib y seaborn solo se importan dentro
+# de los procesos que dibujan.
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Tipos de gráfico con su coste relativo aproximado: se envían primero los más
+# costosos para repartir mejor la carga. Los de distribución dibujan resúmenes
+# pre-agrupados, así que su coste ya no depende del número de filas.
+CHART_COSTS = {'distribution': 2, 'histograms': 2, 'heatmap': 2, 'line': 1, 'bar': 1, 'pie': 1}
+
+
+class Chart:
+    """Datos y opciones de un gráfico que se guarda como `filename`.
+
+    kind puede ser:
+    - 'bar', 'line', 'pie': `data` es una Serie ya agregada.
+    - 'heatmap': `data` es un DataFrame (matriz de correlación, retención por cohortes).
+    - 'distribution': histograma con KDE y boxplot; `data` es un DistributionSummary.
+    - 'histograms': varios histogramas; `data` es una lista de (DistributionSummary, título, etiqueta x).
+    """
+
+    def __init__(self, filename, kind, data, title=None, xlabel=None, ylabel=None, figsize=(12, 8), **options):
+        self.filename = filename
+        self.kind = kind
+        self.data = data
+        self.title = title
+        self.xlabel = xlabel
+        self.ylabel = ylabel
+        self.figsize = figsize
+        self.options = options
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def render_charts(charts, images_dir, workers=None):
+    """Dibuja y guarda `charts` en `images_dir`; devuelve las rutas escritas.
+
+    Con workers=1 se dibuja en el proceso actual; el resultado es el mismo PNG
+    que con varios procesos porque cada figura se dibuja de forma independiente.
+    """
+    workers = workers or default_workers()
+    charts = sorted(charts, key=lambda chart: -CHART_COSTS.get(chart.kind, 1))
+    os.makedirs(images_dir, exist_ok=True)
+    paths = [os.path.join(images_dir, chart.filename) for chart in charts]
+
+    if workers == 1 or len(charts) <= 1:
+        _init_worker()
+        for chart, path in zip(charts, paths):
+            render_chart(chart, path)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(charts)), initializer=_init_worker) as pool:
+            list(pool.map(render_chart, charts, paths))
+    return paths
+
+
+def _init_worker():
+    # Backend sin pantalla y el estilo de las visualizaciones del análisis
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.style.use('ggplot')
+    sns.set(style="whitegrid")
+    plt.rcParams['figure.figsize'] = (12, 8)
+    plt.rcParams['font.size'] = 12
+
+
+def render_chart(chart, path):
+    """Dibuja un único gráfico y cierra su figura."""
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure(figsize=chart.figsize)
+    try:
+        DRAWERS[chart.kind](plt, chart)
+        plt.tight_layout()
+        fig.savefig(path)
+    finally:
+        plt.close(fig)
+    return path
+
+
+def _labels(plt, chart):
+    if chart.title is not None:
+        plt.title(chart.title)
+    if chart.xlabel is not None:
+        plt.xlabel(chart.xlabel)
+    if chart.ylabel is not None:
+        plt.ylabel(chart.ylabel)
+
+
+def _ticks(plt, chart):
+    if 'rotation' in chart.options:
+        plt.xticks(rotation=chart.options['rotation'])
+    if 'xticks' in chart.options:
+        plt.xticks(*chart.options['xticks'])
+    if chart.options.get('grid'):
+        plt.grid(True)
+
+
+def _draw_bar(plt, chart):
+    chart.data.plot(kind='bar')
+    _labels(plt, chart)
+    _ticks(plt, chart)
+
+
+def _draw_line(plt, chart):
+    if 'marker' in chart.options:
+        chart.data.plot(kind='line', marker=chart.options['marker'])
+    else:
+        chart.data.plot(kind='line')
+    _labels(plt, chart)
+    _ticks(plt, chart)
+
+
+def _draw_pie(plt, chart):
+    chart.data.plot(kind='pie', autopct=chart.options.get('autopct'))
+    _labels(plt, chart)
+
+
+def _draw_heatmap(plt, chart):
+    import seaborn as sns
+
+    sns.heatmap(chart.data, annot=True, cmap=chart.options.get('cmap', 'coolwarm'), fmt=chart.options.get('fmt', '.2f'))
+    _labels(plt, chart)
+
+
+def _draw_summary_histogram(plt, summary):
+    # Barras y KDE desde el resumen pre-agrupado (retail/distribution.py)
+    edges, counts = summary.histogram()
+    plt.bar(edges[:-1], counts, width=edges[1:] - edges[:-1], align='edge', color='C0', alpha=0.75,
+            edgecolor='white', linewidth=0.5)
+    x, y = summary.kde()
+    plt.plot(x, y, color='C0')
+    plt.ylabel('Count')
+
+
+def _draw_distribution(plt, chart):
+    plt.subplot(1, 2, 1)
+    _draw_summary_histogram(plt, chart.data)
+    plt.title(chart.title)
+    plt.xlabel(chart.xlabel)
+
+    ax = plt.subplot(1, 2, 2)
+    ax.bxp([chart.data.box_stats()], widths=0.6, patch_artist=True, boxprops={'facecolor': 'C0', 'alpha': 0.75},
+           medianprops={'color': 'black'}, flierprops={'marker': 'd', 'markersize': 4})
+    ax.set_xticks([])
+    plt.ylabel(chart.options.get('name') or '')
+    plt.title(chart.options['box_title'])
+
+
+def _draw_histograms(plt, chart):
+    for position, (summary, title, xlabel) in enumerate(chart.data, start=1):
+        plt.subplot(1, len(chart.data), position)
+        _draw_summary_histogram(plt, summary)
+        plt.title(title)
+        plt.xlabel(xlabel)
+
+
+DRAWERS = {
+    'bar': _draw_bar,
+    'line': _draw_line,
+    'pie': _draw_pie,
+    'heatmap': _draw_heatmap,
+    'distribution': _draw_distribution,
+    'histograms': _draw_histograms,
+}
@@ -0,0 +1,243 @@
+# Motor RFM vectorizado e incremental
+# -----------------------------------
+# Recency, Frequency y Monetary se obtienen con reducciones vectorizadas por
+# cliente (bincount / maximum.at sobre códigos enteros), sin funciones lambda
+# que se llamen una vez por cliente. RFMState guarda por cliente la última
+# compra, su factura, el número de facturas y el gasto total: una nueva tanda
+# de facturas actualiza esa tabla y los segmentos de la sección 9 se recalculan
+# sobre los clientes, sin volver a recorrer el histórico de transacciones. El
+# estado crece con los clientes, no con las facturas.
+#
+# Se asume que cada archivo nuevo trae líneas nuevas y que los archivos llegan
+# en orden cronológico. Una factura puede repartirse entre dos archivos: todas
+# sus líneas suman gasto y última compra, y como la factura que continúa es la
+# última del cliente (LastInvoice) no vuelve a contar en la frecuencia. Volver
+# a aplicar un archivo se detecta por su huella (SHA-256), como en
+# IncrementalStore; el análisis completo registra las de sus archivos de
+# origen. Las líneas repetidas dentro de archivos distintos no se detectan.
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from retail.config import CACHE_DIR
+from retail.schema import customer_ids
+from retail.sketches import quantile_edges
+
+NS_PER_DAY = 24 * 3600 * 10 ** 9
+
+RFM_STATE_DIR = os.path.join(CACHE_DIR, 'rfm')
+
+CATEGORY_THRESHOLDS = [
+    (13, 'Champions'),
+    (10, 'Loyal Customers'),
+    (7, 'Potential Loyalists'),
+    (5, 'At Risk Customers'),
+]
+
+
+def customer_reductions(customer_ids, invoice_codes, n_invoices, timestamps, amount):
+    """Última compra, frecuencia y gasto por cliente.
+
+    - customer_ids: CustomerID enteros (sin nulos)
+    - invoice_codes: códigos enteros de InvoiceNo en [0, n_invoices)
+    - timestamps: InvoiceDate como int64 (nanosegundos)
+    - amount: TotalAmount
+    Devuelve un DataFrame indexado por CustomerID con LastPurchase (int64 ns),
+    Frequency y Monetary.
+    """
+    customer_codes, customers = pd.factorize(customer_ids, sort=True)
+    n_customers = len(customers)
+
+    monetary = np.bincount(customer_codes, weights=amount, minlength=n_customers)
+
+    # Frecuencia: pares (cliente, factura) distintos, contados por cliente
+    pairs = pd.unique(customer_codes.astype('int64') * n_invoices + invoice_codes)
+    frequency = np.bincount(pairs // n_invoices, minlength=n_customers)
+
+    last_purchase = np.full(n_customers, np.iinfo('int64').min, dtype='int64')
+    np.maximum.at(last_purchase, customer_codes, timestamps)
+
+    return pd.DataFrame({'LastPurchase': last_purchase, 'Frequency': frequency, 'Monetary': monetary},
+                        index=pd.Index(customers, name='CustomerID'))
+
+
+def rfm_from_state(customers, max_date):
+    """Tabla Recency/Frequency/Monetary a partir del estado por cliente."""
+    recency = (max_date - customers['LastPurchase'].to_numpy()) // NS_PER_DAY
+    return pd.DataFrame({'Recency': recency, 'Frequency': customers['Frequency'].to_numpy(),
+                         'Monetary': customers['Monetary'].to_numpy()}, index=customers.index)
+
+
+def _customer_rows(df):
+    # Solo analizamos clientes con CustomerID válido
+    valid = df['CustomerID'].notna().to_numpy()
+    rows = df.loc[valid]
+    return (customer_ids(rows), rows['InvoiceNo'].to_numpy(dtype=object),
+            rows['InvoiceDate'].to_numpy().astype('datetime64[ns]').astype('int64'),
+            rows['TotalAmount'].to_numpy(dtype='float64'))
+
+
+class RFMState:
+    """Estado RFM por cliente que se actualiza con nuevas facturas."""
+
+    def __init__(self, customers=None, max_date=None, files=None):
+        if customers is None:
+            customers = pd.DataFrame({'LastPurchase': pd.Series(dtype='int64'),
+                                      'Frequency': pd.Series(dtype='int64'),
+                                      'Monetary': pd.Series(dtype='float64'),
+                                      'LastInvoice': pd.Series(dtype=object)},
+                                     index=pd.Index([], dtype='int64', name='CustomerID'))
+        elif 'LastInvoice' not in customers.columns:
+            # Estados guardados antes de LastInvoice: la siguiente tanda no puede
+            # reconocer la continuación de una factura
+            customers = customers.assign(LastInvoice=None)
+        self.customers = customers
+        self.max_date = np.iinfo('int64').min if max_date is None else int(max_date)
+        # Huellas (SHA-256) de los archivos ya incorporados
+        self.files = list(files or [])
+
+    @classmethod
+    def from_frame(cls, df, files=None):
+        """Estado a partir de transacciones limpias (df_analysis o un bloque).
+
+        `files` son las huellas de los archivos de origen de `df`, para que
+        update() no los vuelva a aplicar.
+        """
+        state = cls(files=files)
+        state.update(df)
+        return state
+
+    def update(self, df, fingerprint=None):
+        """Incorpora las transacciones de `df` y devuelve los CustomerID afectados.
+
+        Todas las filas suman gasto y última compra; la última factura de cada
+        cliente, si continúa en `df`, no vuelve a contar en Frequency. Con
+        `fingerprint` (SHA-256 del archivo de origen) un archivo ya aplicado se
+        ignora y se devuelve None.
+        """
+        if fingerprint is not None:
+            if fingerprint in self.files:
+                return None
+            self.files.append(fingerprint)
+        customer_ids, invoice_numbers, timestamps, amount = _customer_rows(df)
+        if not len(customer_ids):
+            return pd.Index([], dtype='int64', name='CustomerID')
+
+        invoice_codes, invoices = pd.factorize(invoice_numbers)
+        delta = customer_reductions(customer_ids, invoice_codes, len(invoices), timestamps, amount)
+        codes = delta.index.get_indexer(customer_ids)
+        # Factura de la compra más reciente de cada cliente en esta tanda
+        order = np.lexsort((timestamps, codes))
+        last_rows = order[np.append(np.flatnonzero(np.diff(codes[order])), len(order) - 1)]
+        last_invoice = invoice_numbers[last_rows]
+
+        # Clientes ya conocidos: se combinan con su estado anterior
+        last_purchase = delta['LastPurchase'].to_numpy().copy()
+        frequency = delta['Frequency'].to_numpy().copy()
+        monetary = delta['Monetary'].to_numpy().copy()
+        position = self.customers.index.get_indexer(delta.index)
+        known = position >= 0
+        previous = position[known]
+        if known.any():
+            stored_invoice = np.full(len(delta), None, dtype=object)
+            stored_invoice[known] = self.customers['LastInvoice'].to_numpy(dtype=object)[previous]
+            # La última factura del cliente continúa en esta tanda: ya estaba contada
+            continued = np.bincount(codes[invoice_numbers == stored_invoice[codes]], minlength=len(delta)) > 0
+            frequency -= continued
+
+            stored_purchase = self.customers['LastPurchase'].to_numpy()[previous]
+            older = last_purchase[known] < stored_purchase
+            last_invoice[np.flatnonzero(known)[older]] = stored_invoice[known][older]
+            last_purchase[known] = np.maximum(last_purchase[known], stored_purchase)
+            frequency[known] += self.customers['Frequency'].to_numpy()[previous]
+            monetary[known] += self.customers['Monetary'].to_numpy()[previous]
+
+        updated = pd.DataFrame({'LastPurchase': last_purchase, 'Frequency': frequency, 'Monetary': monetary,
+                                'LastInvoice': last_invoice}, index=delta.index)
+        untouched = self.customers[~self.customers.index.isin(delta.index)]
+        self.customers = pd.concat([untouched, updated]).sort_index()
+        self.max_date = max(self.max_date, int(timestamps.max()))
+        return delta.index
+
+    def rfm(self, as_of=None):
+        """Tabla RFM respecto a `as_of` (por defecto, la fecha más reciente vista)."""
+        max_date = self.max_date if as_of is None else pd.Timestamp(as_of).value
+        return rfm_from_state(self.customers, max_date)
+
+    def save(self, directory=RFM_STATE_DIR):
+        os.makedirs(directory, exist_ok=True)
+        customers = self.customers.assign(LastInvoice=self.customers['LastInvoice'].astype('string'))
+        customers.to_parquet(os.path.join(directory, 'clientes.parquet'))
+        # Los estados anteriores guardaban todas las facturas vistas
+        legacy = os.path.join(directory, 'facturas.parquet')
+        if os.path.exists(legacy):
+            os.remove(legacy)
+        with open(os.path.join(directory, 'estado.json'), 'w', encoding='utf-8') as fh:
+            json.dump({'max_date': self.max_date, 'customers': len(self.customers), 'files': self.files}, fh,
+                      indent=2)
+
+    @classmethod
+    def load(cls, directory=RFM_STATE_DIR):
+        customers = pd.read_parquet(os.path.join(directory, 'clientes.parquet'))
+        if 'LastInvoice' in customers.columns:
+            customers['LastInvoice'] = customers['LastInvoice'].to_numpy(dtype=object, na_value=None)
+        with open(os.path.join(directory, 'estado.json'), encoding='utf-8') as fh:
+            meta = json.load(fh)
+        # Los estados guardados antes de registrar las huellas no tienen 'files'
+        return cls(customers, meta['max_date'], meta.get('files'))
+
+    @staticmethod
+    def exists(directory=RFM_STATE_DIR):
+        return os.path.exists(os.path.join(directory, 'estado.json'))
+
+
+def categorize_scores(scores):
+    """Categoría de cliente para cada RFM_Score (vectorizado)."""
+    scores = np.asarray(scores)
+    conditions = [scores >= threshold for threshold, _ in CATEGORY_THRESHOLDS]
+    labels = [label for _, label in CATEGORY_THRESHOLDS]
+    return np.select(conditions, labels, default='Need Attention')
+
+
+def _quintiles(values, labels, approximate):
+    if not approximate:
+        return pd.qcut(values, 5, labels=labels, duplicates='drop')
+    # Mismo criterio que qcut con duplicates='drop', con cortes de un t-digest
+    edges = quantile_edges(values, 5)
+    if len(edges) - 1 != len(labels):
+        raise ValueError("Bin labels must be one fewer than the number of bin edges")
+    return pd.cut(values, bins=edges, labels=labels, include_lowest=True)
+
+
+def score_rfm(rfm, approximate=False):
+    """Agrega R_Segment, F_Segment, M_Segment, RFM_Score y Customer_Category.
+
+    Con approximate=True los quintiles se cortan con sketches de cuantiles
+    (retail/sketches.py) en lugar de ordenar cada columna.
+    """
+    rfm = rfm.copy()
+
+    # Dividimos cada métrica RFM en 5 segmentos
+    rfm['R_Segment'] = _quintiles(rfm['Recency'], [5, 4, 3, 2, 1], approximate)  # 5 es lo mejor (compra reciente)
+
+    # Para frequency, manejamos los duplicados con 'drop' o usamos rangos manuales si es necesario
+    try:
+        rfm['F_Segment'] = _quintiles(rfm['Frequency'].clip(1, 200), [1, 2, 3, 4, 5], approximate)
+    except ValueError:
+        # Alternativa: crear bins manualmente basados en los percentiles
+        freq_bins = [0, 1, 2, 4, 10, float('inf')]
+        rfm['F_Segment'] = pd.cut(rfm['Frequency'].clip(1, 200), bins=freq_bins, labels=[1, 2, 3, 4, 5], right=True,
+                                  include_lowest=True)
+
+    rfm['M_Segment'] = _quintiles(rfm['Monetary'].clip(0, 50000), [1, 2, 3, 4, 5],
+                                  approximate)  # 5 es lo mejor (alto valor)
+
+    # Calculamos RFM Score
+    rfm['RFM_Score'] = rfm['R_Segment'].astype(int) + rfm['F_Segment'].astype(int) + rfm['M_Segment'].astype(int)
+
+    # Creamos categorías de clientes
+    rfm['Customer_Category'] = categorize_scores(rfm['RFM_Score'])
+    return rfm
@@ -0,0 +1,132 @@
+# Esquema compacto de la tabla de transacciones
+# ---------------------------------------------
+# read_excel deja Country, StockCode, Description e InvoiceNo como columnas de
+# objetos Python, CustomerID como float64 (por los nulos) y el enriquecimiento
+# agregaba Year/Month/Day/DayOfWeek/Hour como int64 y una columna Date de
+# objetos date. Aquí se fijan tipos compactos:
+# - categorías para las claves de texto,
+# - Int32 (con nulos) para CustomerID e int32 para Quantity,
+# - enteros de 8/16 bits para las partes del calendario.
+# UnitPrice y TotalAmount se mantienen en float64: en float32 los precios
+# impresos cambian (41.7 pasa a 41.700001) y TotalAmount es la base de todas
+# las sumas monetarias.
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+CATEGORY_COLUMNS = ['InvoiceNo', 'StockCode', 'Description', 'Country']
+
+# Columnas del esquema Online Retail y sus otros nombres en las exportaciones
+# (Online Retail II usa Invoice, Price y Customer ID). Los nombres se comparan
+# sin distinguir mayúsculas, espacios ni guiones bajos.
+COLUMN_ALIASES = {
+    'InvoiceNo': ['Invoice'],
+    'StockCode': [],
+    'Description': [],
+    'Quantity': [],
+    'InvoiceDate': [],
+    'UnitPrice': ['Price'],
+    'CustomerID': [],
+    'Country': [],
+}
+
+CALENDAR_DTYPES = {'Year': 'int16', 'Month': 'int8', 'Day': 'int8', 'DayOfWeek': 'int8', 'Hour': 'int8'}
+
+# Tamaño de un objeto datetime.date, para estimar la antigua columna Date
+_DATE_OBJECT_BYTES = 32
+
+
+def _column_key(name):
+    return ''.join(str(name).split()).replace('_', '').lower()
+
+
+_COLUMN_LOOKUP = {_column_key(alias): col for col, aliases in COLUMN_ALIASES.items() for alias in [col, *aliases]}
+
+
+def normalize_columns(df):
+    """Renombra las columnas a los nombres del esquema Online Retail (Invoice -> InvoiceNo, ...)."""
+    renames = {name: _COLUMN_LOOKUP[_column_key(name)] for name in df.columns
+               if _column_key(name) in _COLUMN_LOOKUP and name != _COLUMN_LOOKUP[_column_key(name)]}
+    return df.rename(columns=renames) if renames else df
+
+
+def apply_load_schema(df):
+    """Tipos compactos para la tabla tal como se carga (antes de limpiar)."""
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    if 'Quantity' in df.columns:
+        df['Quantity'] = df['Quantity'].astype('int32')
+    if 'CustomerID' in df.columns:
+        df['CustomerID'] = df['CustomerID'].astype('Int32')
+    return df
+
+
+def compact_categories(df):
+    """Quita de las columnas categóricas las categorías que ya no aparecen (tras filtrar)."""
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].cat.remove_unused_categories()
+    return df
+
+
+def calendar_parts(dates):
+    """Year/Month/Day/DayOfWeek/Hour de una serie datetime64 con enteros estrechos."""
+    return {
+        'Year': dates.dt.year.astype(CALENDAR_DTYPES['Year']),
+        'Month': dates.dt.month.astype(CALENDAR_DTYPES['Month']),
+        'Day': dates.dt.day.astype(CALENDAR_DTYPES['Day']),
+        'DayOfWeek': dates.dt.dayofweek.astype(CALENDAR_DTYPES['DayOfWeek']),
+        'Hour': dates.dt.hour.astype(CALENDAR_DTYPES['Hour']),
+    }
+
+
+def customer_ids(df, valid=None):
+    """CustomerID como int64 para las filas con cliente válido."""
+    if valid is None:
+        valid = df['CustomerID'].notna().to_numpy()
+    return df['CustomerID'].to_numpy(dtype='float64', na_value=np.nan)[valid].astype('int64')
+
+
+def column_memory(df):
+    """Bytes por columna (incluyendo el contenido de las columnas de objetos)."""
+    return df.memory_usage(deep=True, index=False)
+
+
+def legacy_memory(df):
+    """Bytes estimados por columna con los tipos anteriores al esquema compacto.
+
+    Es una estimación, no una medida: se calcula sin materializar la tabla
+    antigua, contando un puntero por fila más sys.getsizeof de cada objeto
+    referenciado en las columnas de objetos.
+    """
+    n_rows = len(df)
+    usage = {}
+    for col in df.columns:
+        dtype = df[col].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            sizes = np.array([sys.getsizeof(value) for value in df[col].cat.categories], dtype='int64')
+            codes = df[col].cat.codes.to_numpy()
+            # Los nulos también son un objeto (float nan) en la versión antigua
+            object_bytes = np.where(codes >= 0, sizes[np.maximum(codes, 0)] if len(sizes) else 0,
+                                    sys.getsizeof(np.nan)).sum()
+            usage[col] = n_rows * 8 + int(object_bytes)
+        elif pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_datetime64_any_dtype(dtype):
+            usage[col] = n_rows * 8
+        else:
+            usage[col] = int(df[col].memory_usage(deep=True, index=False))
+    # Columna Date de objetos date que agregaba la sección 8
+    usage['Date'] = n_rows * (8 + _DATE_OBJECT_BYTES)
+    return pd.Series(usage)
+
+
+def memory_report(df):
+    """Memoria por columna (MB): estimada con los tipos anteriores y medida con el esquema compacto."""
+    legacy = legacy_memory(df)
+    compact = column_memory(df).reindex(legacy.index, fill_value=0)
+    report = pd.DataFrame({'antes_estimado_MB': legacy / 2 ** 20, 'despues_MB': compact / 2 ** 20,
+                           'tipo': df.dtypes.astype(str).reindex(legacy.index, fill_value='-')})
+    report.loc['TOTAL'] = [report['antes_estimado_MB'].sum(), report['despues_MB'].sum(), '']
+    return report
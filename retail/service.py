@@ -0,0 +1,325 @@
+# Servicio local de consultas
+# ---------------------------
+# Para consultar un número no hace falta volver a ejecutar todo el análisis:
+# `python main.py --serve` levanta un servidor HTTP con asyncio que carga una
+# sola vez lo que ya dejó guardado la última ejecución completa (el cubo de
+# cache/cubo, el estado RFM de cache/rfm, el índice de clientes de
+# cache/clientes y los totales por producto y la serie diaria de
+# cache/servicio) y responde en JSON:
+#
+#   GET /top-products?k=10&by=revenue     ranking de productos (revenue|quantity)
+#   GET /customer/12347                   RFM y segmento de un cliente
+#   GET /customer/12347/invoices          facturas de un cliente
+#   GET /customers?segment=Champions      clientes de un segmento (limit=N)
+#   GET /sales?by=Month&Country=Germany   consulta del cubo (ver retail/cube.py)
+#   GET /daily?start=2011-11-01           ventas diarias entre dos fechas
+#   GET /health                           versión de los datos cargados
+#
+# Una tarea comprueba periódicamente si esos archivos cambiaron (una nueva
+# ejecución del análisis) y vuelve a cargarlos en un hilo; la instantánea nueva
+# reemplaza a la anterior de una vez, así que cada consulta ve datos
+# coherentes. Solo usa la biblioteca estándar (asyncio), sin dependencias
+# nuevas.
+
+import asyncio
+import json
+import os
+import time
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import pandas as pd
+
+from retail.aggregation import ProductRanking
+from retail.config import CACHE_DIR
+from retail.cube import CUBE_DIR, Cube, parse_labels
+from retail.customer_index import CUSTOMER_INDEX_DIR, CustomerIndex
+from retail.rfm import RFM_STATE_DIR, RFMState, score_rfm
+
+SERVICE_DIR = os.path.join(CACHE_DIR, 'servicio')
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Tablas de AnalysisResults que consulta el servicio (los rankings de
+# productos se calculan por consulta sobre product_totals)
+SERVICE_TABLES = ['product_totals', 'daily_sales']
+
+# Archivos cuya modificación provoca una recarga
+WATCHED_FILES = [os.path.join(CUBE_DIR, 'dimensiones.json'), os.path.join(RFM_STATE_DIR, 'estado.json'),
+                 os.path.join(CUSTOMER_INDEX_DIR, 'indice.json'), os.path.join(SERVICE_DIR, 'estado.json')]
+
+# Respuestas guardadas como máximo por instantánea
+RESPONSE_CACHE_SIZE = 10000
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error',
+           503: 'Service Unavailable'}
+
+
+def save_service_tables(results, directory=SERVICE_DIR):
+    """Guarda los totales por producto y la serie diaria que consulta el servicio."""
+    os.makedirs(directory, exist_ok=True)
+    for name in SERVICE_TABLES:
+        _as_frame(getattr(results, name)).to_parquet(os.path.join(directory, f'{name}.parquet'))
+    # estado.json se escribe al final: es el archivo que vigila el servicio
+    with open(os.path.join(directory, 'estado.json'), 'w', encoding='utf-8') as fh:
+        json.dump({'tables': SERVICE_TABLES, 'created': time.time()}, fh, indent=2)
+    return directory
+
+
+def data_signature(paths=WATCHED_FILES):
+    """Fecha de modificación de los archivos vigilados (None si falta alguno)."""
+    try:
+        return tuple(os.stat(path).st_mtime_ns for path in paths)
+    except FileNotFoundError:
+        return None
+
+
+def _as_frame(table):
+    return table.to_frame() if isinstance(table, pd.Series) else table
+
+
+def _encode(body):
+    return json.dumps(body, ensure_ascii=False, default=str).encode('utf-8')
+
+
+def records(table):
+    """Filas de una Serie/DataFrame como lista de dicts serializables."""
+    frame = _as_frame(table).reset_index()
+    for col in frame.columns:
+        if pd.api.types.is_datetime64_any_dtype(frame[col]):
+            frame[col] = frame[col].dt.strftime('%Y-%m-%d')
+    return frame.to_dict(orient='records')
+
+
+class QueryError(Exception):
+    """Consulta inválida: se responde con el código HTTP indicado."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Snapshot:
+    """Todo lo que consulta el servicio, cargado una sola vez en memoria."""
+
+    def __init__(self, cube, rfm, products, daily_sales, signature, customer_index=None):
+        self.cube = cube
+        self.rfm = rfm
+        self.customer_index = customer_index
+        self.products = products
+        self.daily_sales = daily_sales
+        self.signature = signature
+        self.loaded = time.time()
+        # URL -> (código, cuerpo) ya calculados sobre estos datos
+        self.responses = {}
+
+    @classmethod
+    def load(cls):
+        signature = data_signature()
+        if signature is None:
+            raise FileNotFoundError("Faltan datos guardados: ejecute primero el análisis completo (python main.py)")
+        tables = {name: pd.read_parquet(os.path.join(SERVICE_DIR, f'{name}.parquet')) for name in SERVICE_TABLES}
+        rfm = score_rfm(RFMState.load().rfm())
+        return cls(Cube.load(), rfm, ProductRanking(tables['product_totals']), tables['daily_sales']['TotalAmount'],
+                   signature, CustomerIndex.load())
+
+    def top_products(self, k=10, by='revenue'):
+        measure = {'revenue': 'TotalAmount', 'quantity': 'Quantity'}.get(by)
+        if measure is None:
+            raise QueryError(400, "by debe ser revenue o quantity")
+        return records(self.products.top(measure, k))
+
+    def customer(self, customer_id):
+        try:
+            row = self.rfm.loc[[int(customer_id)]]
+        except (KeyError, ValueError):
+            raise QueryError(404, f"Cliente desconocido: {customer_id}")
+        return records(row)[0]
+
+    def invoices(self, customer_id):
+        try:
+            return records(self.customer_index.invoices(int(customer_id)))
+        except (KeyError, ValueError):
+            raise QueryError(404, f"Cliente desconocido: {customer_id}")
+
+    def customers(self, segment=None, limit=None):
+        rfm = self.rfm if segment is None else self.rfm[self.rfm['Customer_Category'] == segment]
+        return [int(customer) for customer in rfm.index[:limit]]
+
+    def sales(self, measure='TotalAmount', by=(), **filters):
+        try:
+            result = self.cube.query(measure, by, **filters)
+        except KeyError as error:
+            raise QueryError(400, error.args[0])
+        return records(result) if isinstance(result, pd.Series) else {measure: result}
+
+    def daily(self, start=None, end=None):
+        try:
+            return records(self.daily_sales.loc[start:end])
+        except (TypeError, ValueError):
+            raise QueryError(400, "start y end deben ser fechas (AAAA-MM-DD)")
+
+
+def _single(params, name, default=None):
+    values = params.get(name)
+    return values[-1] if values else default
+
+
+def answer(snapshot, path, params):
+    """Resultado JSON de una consulta GET sobre la instantánea."""
+    parts = [unquote(part) for part in path.strip('/').split('/') if part]
+    route = parts[0] if parts else ''
+    if route == 'health':
+        return {'signature': snapshot.signature, 'loaded': snapshot.loaded, 'customers': len(snapshot.rfm)}
+    if route == 'top-products':
+        try:
+            k = int(_single(params, 'k', 10))
+        except ValueError:
+            k = 0
+        if k <= 0:
+            raise QueryError(400, "k debe ser un entero positivo")
+        return snapshot.top_products(k, _single(params, 'by', 'revenue'))
+    if route == 'customer' and len(parts) == 2:
+        return snapshot.customer(parts[1])
+    if route == 'customer' and len(parts) == 3 and parts[2] == 'invoices':
+        return snapshot.invoices(parts[1])
+    if route == 'customers':
+        try:
+            limit = int(_single(params, 'limit')) if 'limit' in params else None
+        except ValueError:
+            limit = -1
+        if limit is not None and limit < 0:
+            raise QueryError(400, "limit debe ser un entero no negativo")
+        return snapshot.customers(_single(params, 'segment'), limit)
+    if route == 'sales':
+        by = [dimension for value in params.get('by', []) for dimension in value.split(',') if dimension]
+        measure = _single(params, 'measure', 'TotalAmount')
+        # Una etiqueta fija la dimensión; varias (separadas por comas) la trocean
+        filters = {name: parse_labels(values[-1]) for name, values in params.items() if name not in ('by', 'measure')}
+        return snapshot.sales(measure, by, **filters)
+    if route == 'daily':
+        return snapshot.daily(_single(params, 'start'), _single(params, 'end'))
+    raise QueryError(404, f"Ruta desconocida: /{'/'.join(parts)}")
+
+
+class QueryService:
+    """Servidor HTTP/1.1 (keep-alive) sobre una Snapshot que se recarga sola."""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, reload_interval=2.0):
+        self.host = host
+        self.port = port
+        self.reload_interval = reload_interval
+        self.snapshot = None
+        self.reloads = 0
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                try:
+                    length = int(headers.get('content-length', 0))
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    # Sin una longitud válida no se sabe dónde acaba el cuerpo:
+                    # se responde y se cierra la conexión
+                    status, payload = 400, _encode({'error': 'Content-Length mal formado'})
+                    keep_alive = False
+                else:
+                    if length:
+                        await reader.readexactly(length)
+                    status, payload = self.respond(request_line.decode('latin-1').split())
+                writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json; charset=utf-8"
+                             f"\r\nContent-Length: {len(payload)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1'))
+                writer.write(payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def respond(self, request):
+        """Código HTTP y cuerpo JSON (bytes) de una línea de petición."""
+        if len(request) < 2:
+            return 400, _encode({'error': 'Petición mal formada'})
+        method, target = request[0], request[1]
+        if method != 'GET':
+            return 405, _encode({'error': 'Solo se admite GET'})
+        snapshot = self.snapshot
+        if snapshot is None:
+            return 503, _encode({'error': 'Datos no cargados'})
+        # Los datos no cambian hasta la próxima recarga: las respuestas se
+        # guardan en la instantánea y se descartan con ella
+        cached = snapshot.responses.get(target)
+        if cached is not None:
+            return cached
+        url = urlsplit(target)
+        try:
+            response = 200, _encode(answer(snapshot, url.path, parse_qs(url.query)))
+        except QueryError as error:
+            response = error.status, _encode({'error': str(error)})
+        except Exception as error:  # un fallo inesperado no debe cortar la conexión sin respuesta
+            print(f"Error al responder {target}: {error!r}")
+            return 500, _encode({'error': 'Error interno del servicio'})
+        if len(snapshot.responses) < RESPONSE_CACHE_SIZE:
+            snapshot.responses[target] = response
+        return response
+
+    async def watch(self):
+        """Recarga la instantánea cuando cambian los archivos vigilados.
+
+        Un cambio se aplica cuando la firma se mantiene estable durante un
+        intervalo, para no cargar a mitad de una escritura del análisis.
+        """
+        loop = asyncio.get_running_loop()
+        pending = None
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            signature = data_signature()
+            if signature is None or signature == self.snapshot.signature:
+                pending = None
+                continue
+            if signature != pending:
+                pending = signature
+                continue
+            try:
+                snapshot = await loop.run_in_executor(None, Snapshot.load)
+            except Exception as error:  # los datos anteriores siguen sirviendo
+                print(f"No se pudieron recargar los datos: {error}")
+                continue
+            self.snapshot = snapshot
+            self.reloads += 1
+            pending = None
+            print(f"Datos recargados ({len(snapshot.rfm)} clientes)")
+
+    async def serve(self):
+        self.snapshot = Snapshot.load()
+        server = await asyncio.start_server(self.handle, self.host, self.port)
+        print(f"Servicio de consultas en http://{self.host}:{self.port} "
+              f"(clientes: {len(self.snapshot.rfm)}, recarga cada {self.reload_interval:g} s)")
+        watcher = asyncio.create_task(self.watch())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            watcher.cancel()
+
+
+def run_service(host=DEFAULT_HOST, port=DEFAULT_PORT, reload_interval=2.0):
+    try:
+        asyncio.run(QueryService(host, port, reload_interval).serve())
+    except KeyboardInterrupt:
+        print("\nServicio detenido.")
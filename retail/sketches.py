@@ -0,0 +1,310 @@
+# Sketches de cuantiles combinables
+# ---------------------------------
+# describe() y pd.qcut necesitan la columna completa en memoria y no se pueden
+# combinar entre bloques o días. Un t-digest resume una columna en unos pocos
+# centroides (media, peso) con memoria acotada por `compression`: con
+# compression=δ hay como mucho ~δ/2 centroides. La función de escala k1
+# (arcoseno) hace que los centroides sean pequeños en las colas y grandes en el
+# centro, así que el error en rango es del orden de 1/δ cerca de la mediana y
+# mucho menor cerca de los extremos (min y max son exactos). Dos digests se
+# combinan juntando sus centroides y volviendo a comprimir.
+#
+# Para conteos distintos (facturas por cliente, país o producto) HyperLogLog
+# guarda por cada clave 2^p registros de un byte en lugar del conjunto de
+# facturas; la unión de dos particiones es el máximo registro a registro.
+#
+# Para los productos más vendidos sobre una entrada sin límite, SpaceSaving
+# vigila como mucho `capacity` claves con su peso acumulado y una cota de error;
+# dos resúmenes se combinan sumando pesos y conservando las `capacity` mayores.
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_COMPRESSION = 200
+
+# Cuantiles que imprime describe()
+DESCRIBE_QUANTILES = [0.25, 0.5, 0.75]
+
+
+class TDigest:
+    """Sketch de cuantiles con memoria acotada que se puede combinar y guardar."""
+
+    def __init__(self, compression=DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        # Momentos exactos para count/mean/std de describe()
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    @classmethod
+    def from_values(cls, values, compression=DEFAULT_COMPRESSION):
+        return cls(compression).update(values)
+
+    def update(self, values):
+        """Incorpora un arreglo de valores (los NaN se ignoran) y devuelve el digest."""
+        values = np.asarray(values, dtype='float64').ravel()
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+        self.count += len(values)
+        self.total += values.sum()
+        self.total_sq += np.square(values).sum()
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self._compress(np.concatenate([self.means, values]),
+                       np.concatenate([self.weights, np.ones(len(values))]))
+        return self
+
+    def merge(self, other):
+        """Combina `other` en este digest y lo devuelve."""
+        if not other.count:
+            return self
+        self.count += other.count
+        self.total += other.total
+        self.total_sq += other.total_sq
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress(np.concatenate([self.means, other.means]), np.concatenate([self.weights, other.weights]))
+        return self
+
+    def _compress(self, means, weights):
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        cumulative = np.cumsum(weights)
+        total = cumulative[-1]
+        # Cada centroide cubre un intervalo de longitud 1 en la escala
+        # k1(q) = δ/(2π)·asin(2q - 1); los puntos se asignan por su cuantil central
+        q_mid = (cumulative - weights / 2) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q_mid - 1)
+        cluster = np.floor(k - k[0]).astype('int64')
+        _, cluster = np.unique(cluster, return_inverse=True)
+        new_weights = np.bincount(cluster, weights=weights)
+        self.means = np.bincount(cluster, weights=means * weights) / new_weights
+        self.weights = new_weights
+
+    def quantile(self, q):
+        """Cuantil(es) aproximado(s) para q en [0, 1]."""
+        q = np.asarray(q, dtype='float64')
+        if not self.count:
+            return np.full(q.shape, np.nan) if q.ndim else np.nan
+        # Cada centroide representa su peso centrado en su media; los extremos
+        # se anclan en min y max exactos
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate([[0.0], centers, [self.count]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return np.interp(q * self.count, positions, values)
+
+    def mean(self):
+        return self.total / self.count if self.count else np.nan
+
+    def std(self):
+        if self.count < 2:
+            return np.nan
+        mean = self.mean()
+        return np.sqrt(max(self.total_sq - self.count * mean * mean, 0.0) / (self.count - 1))
+
+    def describe(self, name=None):
+        """count, mean, std, min, 25%, 50%, 75% y max, con el formato de describe()."""
+        quartiles = self.quantile(DESCRIBE_QUANTILES) if self.count else [np.nan] * len(DESCRIBE_QUANTILES)
+        summary = {'count': float(self.count), 'mean': self.mean(), 'std': self.std(),
+                   'min': self.min if self.count else np.nan}
+        summary.update({f'{q:.0%}': value for q, value in zip(DESCRIBE_QUANTILES, quartiles)})
+        summary['max'] = self.max if self.count else np.nan
+        return pd.Series(summary, name=name)
+
+    def to_dict(self):
+        return {'compression': self.compression, 'count': self.count, 'total': self.total,
+                'total_sq': self.total_sq, 'min': self.min if self.count else None,
+                'max': self.max if self.count else None,
+                'means': self.means.tolist(), 'weights': self.weights.tolist()}
+
+    @classmethod
+    def from_dict(cls, data):
+        digest = cls(data['compression'])
+        digest.count = data['count']
+        digest.total = data['total']
+        digest.total_sq = data['total_sq']
+        if data['count']:
+            digest.min, digest.max = data['min'], data['max']
+        digest.means = np.array(data['means'], dtype='float64')
+        digest.weights = np.array(data['weights'], dtype='float64')
+        return digest
+
+
+def quantile_edges(values, n_bins, compression=DEFAULT_COMPRESSION):
+    """Puntos de corte de `n_bins` intervalos de igual frecuencia (sin repetidos).
+
+    Es la parte de pd.qcut que necesita ordenar la columna; aquí sale de un
+    t-digest. `values` puede ser un arreglo o un TDigest ya construido.
+    """
+    digest = values if isinstance(values, TDigest) else TDigest.from_values(values, compression)
+    return np.unique(digest.quantile(np.linspace(0, 1, n_bins + 1)))
+
+
+# Constante de corrección de HyperLogLog según el número de registros
+_HLL_ALPHA = {16: 0.673, 32: 0.697, 64: 0.709}
+
+DEFAULT_PRECISION = 8
+
+
+class HyperLogLog:
+    """Conteo aproximado de valores distintos por clave, combinable y persistible.
+
+    Con precisión p cada clave ocupa 2^p bytes y el error relativo típico es
+    1.04 / sqrt(2^p); para conteos pequeños (menos de ~2.5·2^p) se usa conteo
+    lineal, que es prácticamente exacto.
+    """
+
+    def __init__(self, precision=DEFAULT_PRECISION):
+        self.precision = precision
+        self.keys = pd.Index([])
+        self.registers = np.zeros((0, 2 ** precision), dtype='uint8')
+
+    @property
+    def n_registers(self):
+        return 2 ** self.precision
+
+    def memory_bytes(self):
+        return self.registers.nbytes
+
+    def update(self, keys, items):
+        """Agrega `items` (p. ej. InvoiceNo) al conjunto de su clave en `keys`."""
+        keys = pd.Index(keys)
+        if not len(keys):
+            return self
+        hashes = pd.util.hash_array(pd.Series(items).astype(str).to_numpy(dtype=object))
+        rest_bits = 64 - self.precision
+        bucket = (hashes >> np.uint64(rest_bits)).astype('int64')
+        rest = hashes & np.uint64((1 << rest_bits) - 1)
+        # Rango = posición del bit 1 más bajo (geométrico con p = 1/2)
+        lowest = rest & (~rest + np.uint64(1))
+        rank = np.where(rest == 0, rest_bits + 1,
+                        np.log2(np.maximum(lowest, 1).astype('float64')).astype('int64') + 1).astype('uint8')
+
+        new_keys = keys.unique().difference(self.keys)
+        if len(new_keys):
+            self.keys = self.keys.append(new_keys) if len(self.keys) else new_keys
+            self.registers = np.vstack([self.registers, np.zeros((len(new_keys), self.n_registers), dtype='uint8')])
+        np.maximum.at(self.registers, (self.keys.get_indexer(keys), bucket), rank)
+        return self
+
+    def merge(self, other):
+        """Unión con `other` (misma precisión): máximo registro a registro."""
+        if other.precision != self.precision:
+            raise ValueError("Solo se pueden combinar HyperLogLog con la misma precisión")
+        if not len(self.keys):
+            self.keys, self.registers = other.keys, other.registers.copy()
+            return self
+        keys = self.keys.union(other.keys, sort=False)
+        registers = np.zeros((len(keys), self.n_registers), dtype='uint8')
+        registers[keys.get_indexer(self.keys)] = self.registers
+        position = keys.get_indexer(other.keys)
+        registers[position] = np.maximum(registers[position], other.registers)
+        self.keys, self.registers = keys, registers
+        return self
+
+    def estimate(self):
+        """Serie con el número estimado de valores distintos por clave."""
+        m = self.n_registers
+        alpha = _HLL_ALPHA.get(m, 0.7213 / (1 + 1.079 / m))
+        raw = alpha * m * m / np.ldexp(1.0, -self.registers.astype('int64')).sum(axis=1)
+        zeros = (self.registers == 0).sum(axis=1)
+        small = (raw <= 2.5 * m) & (zeros > 0)
+        linear = m * np.log(m / np.maximum(zeros, 1))
+        return pd.Series(np.where(small, linear, raw), index=self.keys).sort_index()
+
+    def to_frame(self):
+        """Una fila por clave con sus registros como bytes (para Parquet)."""
+        return pd.DataFrame({'key': self.keys, 'registers': [row.tobytes() for row in self.registers]})
+
+    @classmethod
+    def from_frame(cls, frame, precision):
+        hll = cls(precision)
+        hll.keys = pd.Index(frame['key'])
+        hll.registers = np.frombuffer(b''.join(frame['registers']), dtype='uint8').reshape(len(frame), -1).copy()
+        return hll
+
+
+DEFAULT_CAPACITY = 1000
+
+
+class SpaceSaving:
+    """Heavy hitters ponderados (Space-Saving combinable) con memoria acotada.
+
+    Vigila como mucho `capacity` claves. Para cada una, `counts` es una cota
+    superior de su peso real y `counts - errors` una cota inferior; cualquier
+    clave no vigilada pesa como mucho `floor`. Las claves con peso mayor que
+    `floor` están siempre vigiladas.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype='float64')
+        self.errors = pd.Series(dtype='float64')
+        self.floor = 0.0
+        self.total = 0.0
+
+    @classmethod
+    def from_counts(cls, counts, capacity=DEFAULT_CAPACITY):
+        """Resumen de pesos exactos por clave (p. ej. un groupby de un bloque)."""
+        summary = cls(capacity)
+        counts = counts.astype('float64')
+        summary.total = float(counts.sum())
+        summary._truncate(counts, pd.Series(0.0, index=counts.index), 0.0)
+        return summary
+
+    def update(self, counts):
+        """Incorpora pesos exactos por clave y devuelve el resumen."""
+        return self.merge(SpaceSaving.from_counts(counts, self.capacity))
+
+    def merge(self, other):
+        """Combina `other` en este resumen y lo devuelve."""
+        self.total += other.total
+        if not len(self.counts):
+            self._truncate(other.counts, other.errors, self.floor + other.floor)
+            return self
+        # Una clave que falta en un resumen puede pesar allí hasta su `floor`
+        keys = self.counts.index.union(other.counts.index, sort=False)
+        counts = self.counts.reindex(keys, fill_value=self.floor) + other.counts.reindex(keys, fill_value=other.floor)
+        errors = self.errors.reindex(keys, fill_value=self.floor) + other.errors.reindex(keys, fill_value=other.floor)
+        self._truncate(counts, errors, self.floor + other.floor)
+        return self
+
+    def _truncate(self, counts, errors, floor):
+        if len(counts) > self.capacity:
+            values = counts.to_numpy()
+            order = np.argpartition(-values, self.capacity)
+            keep, dropped = order[:self.capacity], order[self.capacity:]
+            floor = max(floor, float(values[dropped].max()))
+            counts, errors = counts.iloc[keep], errors.iloc[keep]
+            if isinstance(counts.index, pd.MultiIndex):
+                # Los niveles del índice conservan todas las claves vistas
+                index = counts.index.remove_unused_levels()
+                counts, errors = counts.set_axis(index), errors.set_axis(index)
+        self.counts, self.errors, self.floor = counts, errors, floor
+
+    def top(self, k=10):
+        """Las k claves de mayor peso con sus cotas (count, error, lower)."""
+        table = pd.DataFrame({'count': self.counts, 'error': self.errors}).sort_index()
+        table['lower'] = table['count'] - table['error']
+        return table.sort_values('count', ascending=False, kind='stable').head(k)
+
+    def memory_bytes(self):
+        return int(self.counts.memory_usage(deep=True) + self.errors.memory_usage(deep=False))
+
+    def to_frame(self):
+        return pd.DataFrame({'count': self.counts, 'error': self.errors})
+
+    def to_dict(self):
+        return {'capacity': self.capacity, 'floor': self.floor, 'total': self.total}
+
+    @classmethod
+    def from_frame(cls, frame, meta):
+        summary = cls(meta['capacity'])
+        summary.counts, summary.errors = frame['count'], frame['error']
+        summary.floor, summary.total = meta['floor'], meta['total']
+        return summary
@@ -0,0 +1,591 @@
+# Etapas del Análisis Exploratorio de Datos - Online Retail
+# ---------------------------------------------------------
+# El análisis se declara como un grafo de etapas:
+#   load -> clean -> enrich -> aggregates -> secciones 3 a 10 -> render
+# Cada sección imprime sus resultados y devuelve los gráficos que le
+# corresponden (objetos Chart con datos ya agregados); la etapa `render` es la
+# única que dibuja y guarda las imágenes, en paralelo (ver retail/render.py).
+
+import numpy as np
+import pandas as pd
+
+from retail.aggregation import compute_aggregates
+from retail.basket import MAX_ITEMSET_SIZE, MIN_CONFIDENCE, MIN_SUPPORT, TOP_RULES, BasketAnalysis
+from retail.cache import file_fingerprint, load_transactions
+from retail.cleaning import clean_transactions, rule_masks
+from retail.cohorts import retention
+from retail.config import DATASET_PATH, IMAGES_DIR
+from retail.cube import Cube
+from retail.customer_index import CustomerIndex
+from retail.distribution import DistributionSummary
+from retail.export import report_tables
+from retail.ingest import ingest, source_paths, sources_fingerprint
+from retail.parallel import parallel_aggregates, pool_workers
+from retail.pipeline import Pipeline
+from retail.render import Chart, render_charts
+from retail.rfm import RFM_STATE_DIR, RFMState, score_rfm
+from retail.schema import apply_load_schema, calendar_parts, compact_categories, memory_report
+from retail.service import save_service_tables
+from retail.timeseries import TREND_WINDOW, TimeSeries, trend_label
+
+MONTH_LABELS = ['Ene', 'Feb', 'Mar', 'Abr', 'May', 'Jun', 'Jul', 'Ago', 'Sep', 'Oct', 'Nov', 'Dic']
+WEEKDAY_LABELS = ['Lun', 'Mar', 'Mié', 'Jue', 'Vie', 'Sáb', 'Dom']
+
+# Etapas que generan gráficos, en el orden en que se imprimen
+SECTION_STAGES = ['univariate', 'bivariate', 'customers', 'products', 'patterns', 'timeseries', 'segmentation']
+
+
+def build_pipeline(source=DATASET_PATH, rebuild_cache=False, use_cache=True, stage_cache_dir=None,
+                   render_workers=None, images_dir=IMAGES_DIR, tracer=None, parallel=None, workers=None,
+                   reject_path=None, basket_support=MIN_SUPPORT, basket_itemsets=False, ingest_workers=None):
+    """Construye el grafo de etapas del análisis.
+
+    `source` es un archivo o una lista de archivos, patrones glob y hojas
+    (LIBRO#HOJA) que se leen en `ingest_workers` procesos (retail/ingest.py).
+    Con `stage_cache_dir` las etapas marcadas como persistentes se guardan en
+    disco y se reutilizan mientras el archivo de origen no cambie. Con
+    `tracer` (retail/instrumentation.py) se miden todas las etapas. Con
+    `parallel` ('month' o 'country') los agregados se calculan por particiones
+    en `workers` procesos (retail/parallel.py); con un solo proceso se usa la
+    pasada en serie. Con `reject_path` la limpieza guarda las filas
+    descartadas y la regla que las descartó. `basket_support` es el soporte
+    mínimo del análisis de cesta y con `basket_itemsets` también se extraen
+    los itemsets frecuentes (retail/basket.py).
+    """
+    pipeline = Pipeline(cache_dir=stage_cache_dir, tracer=tracer)
+    if isinstance(source, str):
+        pipeline.add('load', lambda: load_stage(source, rebuild_cache, use_cache),
+                     key=lambda: file_fingerprint(source)['sha256'])
+    else:
+        pipeline.add('load', lambda: ingest_stage(source, ingest_workers), key=lambda: sources_fingerprint(source))
+    pipeline.add('overview', overview_stage, inputs=['load'])
+    pipeline.add('clean', lambda df: clean_stage(df, reject_path), inputs=['load'])
+    pipeline.add('enrich', enrich_stage, inputs=['clean'])
+    if parallel and pool_workers(workers) > 1:
+        # El modo y los procesos forman parte de la clave: una ejecución
+        # --parallel no reutiliza el resultado guardado de la pasada en serie
+        pipeline.add('aggregates', lambda df: parallel_aggregates(df, parallel, workers), inputs=['enrich'],
+                     persist=True, version=7, key=lambda: f'parallel:{parallel}:{pool_workers(workers)}')
+    else:
+        # Con un solo proceso el map-reduce solo añade trabajo a la pasada en serie
+        pipeline.add('aggregates', compute_aggregates, inputs=['enrich'], persist=True, version=7)
+    pipeline.add('univariate', univariate_stage, inputs=['enrich', 'aggregates'])
+    pipeline.add('bivariate', bivariate_stage, inputs=['aggregates'])
+    pipeline.add('customers', customers_stage, inputs=['enrich', 'aggregates'])
+    pipeline.add('products', products_stage, inputs=['aggregates'])
+    pipeline.add('basket', lambda df: basket_stage(df, basket_support, basket_itemsets), inputs=['enrich'])
+    pipeline.add('patterns', patterns_stage, inputs=['aggregates'])
+    pipeline.add('timeseries', timeseries_stage, inputs=['aggregates'])
+    pipeline.add('segmentation', segmentation_stage, inputs=['customers'])
+    pipeline.add('rfm_state', lambda df: rfm_state_stage(df, source), inputs=['enrich'])
+    pipeline.add('cube', cube_stage, inputs=['enrich'])
+    pipeline.add('service_tables', save_service_tables, inputs=['aggregates'])
+    pipeline.add('conclusions', conclusions_stage, inputs=['overview', 'aggregates', 'segmentation'])
+    pipeline.add('tables', report_tables, inputs=['aggregates', 'segmentation'])
+    pipeline.add('render', lambda *sections: render_stage(*sections, workers=render_workers, images_dir=images_dir),
+                 inputs=SECTION_STAGES)
+    return pipeline
+
+
+# 1. Carga de datos
+# -----------------
+def load_stage(source, rebuild_cache=False, use_cache=True):
+    # Cargamos el archivo Excel (o su cache columnar si está vigente)
+    return load_transactions(source, rebuild=rebuild_cache, use_cache=use_cache)
+
+
+def ingest_stage(sources, workers=None):
+    # Varios libros, hojas o CSV leídos en paralelo y combinados en una tabla
+    return apply_load_schema(ingest(sources, workers))
+
+
+def overview_stage(df):
+    print("1. CARGA Y VISTA PREVIA DE DATOS")
+    print("-" * 50)
+
+    # Mostramos información básica del dataset
+    print(f"Dimensiones del dataset: {df.shape[0]} filas y {df.shape[1]} columnas")
+    print("\nPrimeras 5 filas:")
+    print(df.head())
+
+    print("\nInformación de las columnas:")
+    print(df.info())
+
+    print("\nEstadísticas descriptivas:")
+    print(df.describe())
+
+    print("\nValores nulos por columna:")
+    print(df.isnull().sum())
+    missing_customer_pct = df['CustomerID'].isnull().mean() * 100
+    print(f"Porcentaje de valores nulos en CustomerID: {missing_customer_pct:.2f}%")
+    return {'missing_customer_pct': missing_customer_pct}
+
+
+# 2. Limpieza de datos
+# -------------------
+def clean_stage(df, reject_path=None):
+    print("\n\n2. LIMPIEZA DE DATOS")
+    print("-" * 50)
+
+    # Las reglas (Description nula, cancelaciones, cantidades y precios no
+    # positivos) se evalúan una sola vez cada una (ver retail/cleaning.py)
+    masks = rule_masks(df)
+    described = ~masks['description_null']
+
+    # Valores negativos en Quantity (posibles devoluciones), entre las filas con Description
+    print(f"Registros con cantidad negativa (posibles devoluciones): "
+          f"{np.count_nonzero(described & (df['Quantity'].to_numpy() < 0))}")
+
+    # Facturas de cancelación (comienzan con C)
+    print(f"Facturas de cancelación: {np.count_nonzero(described & masks['cancellation'])}")
+
+    # Dataframe de trabajo para análisis: una única copia de las filas válidas
+    df_analysis, rejects = clean_transactions(df, reject_path, masks)
+
+    print(f"Dimensiones después de la limpieza: {df_analysis.shape[0]} filas y {df_analysis.shape[1]} columnas")
+    print("\nFilas descartadas por regla (una fila se atribuye a la primera regla que infringe):")
+    print(rejects.set_index('regla'))
+    if reject_path:
+        print(f"Filas descartadas guardadas en {reject_path}")
+    return df_analysis
+
+
+def enrich_stage(df_analysis):
+    # Las columnas se agregan sobre el mismo DataFrame de `clean` para no duplicar
+    # la tabla en memoria; `clean` ya devuelve una copia propia.
+
+    # Convertimos la fecha a datetime si no lo está
+    if not pd.api.types.is_datetime64_any_dtype(df_analysis['InvoiceDate']):
+        df_analysis['InvoiceDate'] = pd.to_datetime(df_analysis['InvoiceDate'])
+
+    # Extraemos componentes de la fecha (enteros de 8/16 bits)
+    for name, values in calendar_parts(df_analysis['InvoiceDate']).items():
+        df_analysis[name] = values
+
+    # Calculamos el valor total de cada transacción (en float64)
+    df_analysis['TotalAmount'] = (df_analysis['Quantity'].to_numpy(dtype='float64') *
+                                  df_analysis['UnitPrice'].to_numpy(dtype='float64'))
+    compact_categories(df_analysis)
+
+    print("\nMemoria de df_analysis por columna (estimada con los tipos anteriores vs. medida con el esquema "
+          "compacto):")
+    report = memory_report(df_analysis)
+    print(report.round(2))
+    total = report.loc['TOTAL']
+    print(f"Reducción estimada: {total['antes_estimado_MB'] / total['despues_MB']:.1f}x")
+    return df_analysis
+
+
+# Gráficos
+# --------
+def _distribution_chart(filename, summary, hist_title, xlabel, box_title, name=None):
+    return Chart(filename, 'distribution', summary, title=hist_title, xlabel=xlabel, figsize=(14, 6),
+                 box_title=box_title, name=name)
+
+
+def _series_chart(filename, series, limit, hist_title, xlabel, box_title):
+    # Las series por cliente o por factura se resumen aquí; el gráfico solo recibe el resumen
+    return _distribution_chart(filename, DistributionSummary.from_values(series, 0, limit), hist_title, xlabel,
+                               box_title, name=series.name)
+
+
+def _rfm_chart(rfm):
+    return Chart('analisis_rfm.png', 'histograms', [
+        (DistributionSummary.from_values(rfm['Recency'], 0, 365), 'Distribución de Recency (días)',
+         'Días desde última compra'),
+        (DistributionSummary.from_values(rfm['Frequency'], 0, 100), 'Distribución de Frequency',
+         'Número de Transacciones'),
+        (DistributionSummary.from_values(rfm['Monetary'], 0, 10000), 'Distribución de Monetary', 'Gasto Total'),
+    ], figsize=(18, 6))
+
+
+def _cohort_chart(cohort_counts):
+    matrix = retention(cohort_counts).rename(index=lambda month: month.strftime('%Y-%m'))
+    return Chart('retencion_cohortes.png', 'heatmap', matrix, title='Retención por Cohorte Mensual',
+                 xlabel='Meses desde la primera compra', ylabel='Cohorte (mes de la primera compra)',
+                 figsize=(14, 10), cmap='YlGnBu', fmt='.0%')
+
+
+# Gráficos de distribución por fila (resúmenes de results.distributions):
+# columna -> (archivo, etiqueta); el límite está en ROW_DISTRIBUTIONS
+ROW_DISTRIBUTION_CHARTS = {
+    'Quantity': ('distribucion_cantidad.png', 'Cantidad'),
+    'UnitPrice': ('distribucion_precio.png', 'Precio Unitario'),
+    'TotalAmount': ('distribucion_monto_total.png', 'Monto Total'),
+}
+
+
+def row_distribution_chart(col, results):
+    filename, label = ROW_DISTRIBUTION_CHARTS[col]
+    summary = results.distributions[col]
+    limit = f'{summary.high:g}'
+    return _distribution_chart(filename, summary, f'Distribución de {label} (limitado a {limit})', label,
+                               f'Boxplot de {label} (limitado a {limit})', name=col)
+
+
+def segmentation_chart(customer_categories):
+    return Chart('segmentacion_clientes.png', 'pie', customer_categories,
+                 title='Distribución de Segmentos de Clientes',
+                 ylabel='',  # Quitamos la etiqueta del eje y
+                 figsize=(12, 8), autopct='%1.1f%%')
+
+
+# Gráficos que solo dependen de tablas de AnalysisResults:
+# archivo -> (tablas que lee, función que construye el Chart)
+AGGREGATE_CHARTS = {
+    'top_10_paises.png': (['country_counts'], lambda r: Chart(
+        'top_10_paises.png', 'bar', r.country_counts.head(10), title='Top 10 Países por Número de Transacciones',
+        xlabel='País', ylabel='Número de Transacciones', figsize=(14, 8), rotation=45)),
+    'ventas_por_mes.png': (['monthly_sales'], lambda r: Chart(
+        'ventas_por_mes.png', 'bar', r.monthly_sales, title='Ventas Totales por Mes', xlabel='Mes',
+        ylabel='Ventas Totales', figsize=(12, 6), xticks=(range(12), MONTH_LABELS))),
+    'ventas_por_dia_semana.png': (['weekday_sales'], lambda r: Chart(
+        'ventas_por_dia_semana.png', 'bar', r.weekday_sales, title='Ventas Totales por Día de la Semana',
+        xlabel='Día de la Semana', ylabel='Ventas Totales', figsize=(12, 6), xticks=(range(7), WEEKDAY_LABELS))),
+    'ventas_por_hora.png': (['hourly_sales'], lambda r: Chart(
+        'ventas_por_hora.png', 'bar', r.hourly_sales, title='Ventas Totales por Hora del Día', xlabel='Hora',
+        ylabel='Ventas Totales', figsize=(12, 6))),
+    'top_10_paises_ventas.png': (['country_sales'], lambda r: Chart(
+        'top_10_paises_ventas.png', 'bar', r.country_sales.head(10), title='Top 10 Países por Ventas Totales',
+        xlabel='País', ylabel='Ventas Totales', figsize=(14, 8), rotation=45)),
+    'cantidad_por_mes.png': (['monthly_quantity'], lambda r: Chart(
+        'cantidad_por_mes.png', 'line', r.monthly_quantity, title='Cantidad Total Vendida por Mes', xlabel='Mes',
+        ylabel='Cantidad Total', figsize=(12, 6), marker='o', xticks=(range(1, 13), MONTH_LABELS), grid=True)),
+    'transacciones_por_cliente.png': (['customer_transactions'], lambda r: _series_chart(
+        'transacciones_por_cliente.png', r.customer_transactions, 50,
+        'Distribución de Transacciones por Cliente', 'Número de Transacciones',
+        'Boxplot de Transacciones por Cliente')),
+    'gasto_por_cliente.png': (['customer_spending'], lambda r: _series_chart(
+        'gasto_por_cliente.png', r.customer_spending, 10000, 'Distribución de Gasto Total por Cliente',
+        'Gasto Total', 'Boxplot de Gasto Total por Cliente')),
+    'analisis_rfm.png': (['rfm'], lambda r: _rfm_chart(r.rfm)),
+    'top_10_productos_ingresos.png': (['top_products_revenue'], lambda r: Chart(
+        'top_10_productos_ingresos.png', 'bar', r.top_products_revenue.head(10),
+        title='Top 10 Productos por Ingresos Totales', xlabel='(StockCode, Descripción)', ylabel='Ingresos Totales',
+        figsize=(14, 8), rotation=90)),
+    'tamaño_orden.png': (['order_size'], lambda r: _series_chart(
+        'tamaño_orden.png', r.order_size, 100, 'Distribución de Tamaño de Orden', 'Cantidad de Items',
+        'Boxplot de Tamaño de Orden')),
+    'valor_orden.png': (['order_value'], lambda r: _series_chart(
+        'valor_orden.png', r.order_value, 1000, 'Distribución de Valor de Orden', 'Valor Total',
+        'Boxplot de Valor de Orden')),
+    'matriz_correlacion.png': (['correlation'], lambda r: Chart(
+        'matriz_correlacion.png', 'heatmap', r.correlation, title='Matriz de Correlación', figsize=(12, 10))),
+    'retencion_cohortes.png': (['cohort_counts'], lambda r: _cohort_chart(r.cohort_counts)),
+    'serie_temporal_ventas.png': (['daily_sales'], lambda r: Chart(
+        'serie_temporal_ventas.png', 'line', r.daily_sales, title='Ventas Diarias a lo Largo del Tiempo',
+        xlabel='Fecha', ylabel='Ventas Totales', figsize=(16, 8), grid=True)),
+}
+
+
+def aggregate_chart(filename, results):
+    return AGGREGATE_CHARTS[filename][1](results)
+
+
+# 3. Análisis Univariado
+# ----------------------
+def univariate_stage(df_analysis, results):
+    print("\n\n3. ANÁLISIS UNIVARIADO")
+    print("-" * 50)
+    charts = []
+
+    # 3.1 Variables Categóricas
+    print("\n3.1 ANÁLISIS DE VARIABLES CATEGÓRICAS")
+
+    # País
+    print("\nDistribución por país:")
+    country_counts = results.country_counts
+    print(country_counts.head(10))
+    print(f"Número total de países: {len(country_counts)}")
+    charts.append(aggregate_chart('top_10_paises.png', results))
+
+    # StockCode
+    print("\nProductos más comunes:")
+    print(results.stock_counts.head(10))
+
+    # 3.2 Variables Numéricas
+    print("\n3.2 ANÁLISIS DE VARIABLES NUMÉRICAS")
+    for col in ROW_DISTRIBUTION_CHARTS:
+        print(f"\nEstadísticas de {col}:")
+        print(df_analysis[col].describe())
+        charts.append(row_distribution_chart(col, results))
+
+    # 3.3 Variables Temporales
+    print("\n3.3 ANÁLISIS DE VARIABLES TEMPORALES")
+
+    # Ventas por mes
+    print("\nVentas totales por mes:")
+    print(results.monthly_sales)
+    charts.append(aggregate_chart('ventas_por_mes.png', results))
+
+    # Ventas por día de la semana
+    print("\nVentas totales por día de la semana:")
+    print(results.weekday_sales)
+    charts.append(aggregate_chart('ventas_por_dia_semana.png', results))
+
+    # Ventas por hora
+    print("\nVentas totales por hora del día:")
+    print(results.hourly_sales)
+    charts.append(aggregate_chart('ventas_por_hora.png', results))
+    return {'charts': charts}
+
+
+# 4. Análisis Bivariado
+# ---------------------
+def bivariate_stage(results):
+    print("\n\n4. ANÁLISIS BIVARIADO")
+    print("-" * 50)
+    charts = []
+
+    # 4.1 Relación entre País y Ventas
+    print("\n4.1 Top 10 países por ventas totales:")
+    print(results.country_sales.head(10))
+    charts.append(aggregate_chart('top_10_paises_ventas.png', results))
+
+    # 4.2 Relación entre Mes y Cantidad vendida
+    print("\n4.2 Cantidad total vendida por mes:")
+    print(results.monthly_quantity)
+    charts.append(aggregate_chart('cantidad_por_mes.png', results))
+
+    # 4.3 Heatmap de correlación (acumulada con los agregados, ver retail/correlation.py)
+    print("\n4.3 Matriz de correlación entre variables numéricas:")
+    print(results.correlation)
+    charts.append(aggregate_chart('matriz_correlacion.png', results))
+    return {'charts': charts, 'correlation': results.correlation}
+
+
+# 5. Análisis de Clientes
+# -----------------------
+def customers_stage(df_analysis, results):
+    print("\n\n5. ANÁLISIS DE CLIENTES")
+    print("-" * 50)
+    charts = []
+
+    # Solo analizamos clientes con CustomerID válido (results ya los filtra)
+
+    # 5.1 Número de transacciones por cliente
+    print("\n5.1 Estadísticas de transacciones por cliente:")
+    print(results.customer_transactions.describe())
+    charts.append(aggregate_chart('transacciones_por_cliente.png', results))
+
+    # 5.2 Total gastado por cliente
+    print("\n5.2 Estadísticas de gasto total por cliente:")
+    print(results.customer_spending.describe())
+    charts.append(aggregate_chart('gasto_por_cliente.png', results))
+
+    # 5.3 RFM (Recency, Frequency, Monetary) Analysis
+    # Para cada cliente calculamos:
+    # - Recency: días desde la última compra (respecto a la fecha más reciente)
+    # - Frequency: número de transacciones
+    # - Monetary: gasto total
+    rfm = results.rfm.copy()
+
+    print("\n5.3 Análisis RFM - Primeros 10 clientes:")
+    print(rfm.head(10))
+
+    # Visualizar distribución de RFM
+    charts.append(_rfm_chart(rfm))
+
+    # 5.4 Retención por cohortes: clientes que vuelven k meses después del mes
+    # de su primera compra (ver retail/cohorts.py)
+    print("\n5.4 Retención por cohorte mensual (% de clientes activos k meses después):")
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print((retention(results.cohort_counts) * 100).round(1).rename(index=lambda month: month.strftime('%Y-%m')))
+    charts.append(aggregate_chart('retencion_cohortes.png', results))
+
+    # Índice del historial de cada cliente persistido en cache/clientes para
+    # consultar a un cliente (python main.py --customer ID) sin recorrer las
+    # transacciones
+    index = CustomerIndex.from_frame(df_analysis)
+    index.save()
+    return {'charts': charts, 'rfm': rfm, 'index': index}
+
+
+def rfm_state_stage(df_analysis, source=DATASET_PATH, directory=RFM_STATE_DIR):
+    # Estado RFM por cliente persistido para poder actualizarlo con nuevas
+    # facturas (python main.py --rfm-update ARCHIVO) sin recorrer el histórico.
+    # Se registran las huellas de los archivos de origen para que --rfm-update
+    # no vuelva a sumar uno de ellos
+    files = [file_fingerprint(path)['sha256'] for path in source_paths(source)]
+    state = RFMState.from_frame(df_analysis, files)
+    state.save(directory)
+    return state
+
+
+def cube_stage(df_analysis):
+    # Cubo País × Mes × Día × Hora persistido para responder consultas nuevas
+    # (python main.py --cube-query ...) sin volver a leer las transacciones
+    cube = Cube.from_frame(df_analysis)
+    cube.save()
+    return cube
+
+
+# 6. Análisis de Productos
+# ------------------------
+def products_stage(results):
+    print("\n\n6. ANÁLISIS DE PRODUCTOS")
+    print("-" * 50)
+
+    # 6.1 Productos más vendidos por cantidad
+    print("\n6.1 Top 10 productos más vendidos por cantidad:")
+    print(results.top_products_quantity.head(10))
+
+    # 6.2 Productos más vendidos por ingresos totales
+    print("\n6.2 Top 10 productos más vendidos por ingresos:")
+    print(results.top_products_revenue.head(10))
+
+    # Visualizar top productos por ingresos
+    charts = [aggregate_chart('top_10_productos_ingresos.png', results)]
+    return {'charts': charts}
+
+
+# 6.3 Productos comprados juntos
+# ------------------------------
+def basket_stage(df_analysis, min_support=MIN_SUPPORT, itemsets=False):
+    # Reglas de asociación sobre la matriz dispersa factura × producto (ver retail/basket.py)
+    basket = BasketAnalysis.from_frame(df_analysis)
+    rules = basket.rules(min_support, MIN_CONFIDENCE)
+    print(f"\n6.3 Productos comprados juntos (soporte >= {min_support:.1%} de las facturas, "
+          f"confianza >= {MIN_CONFIDENCE:.0%}):")
+    print(f"Facturas: {basket.n_invoices}, productos frecuentes: {len(basket.frequent_items(min_support))} "
+          f"de {len(basket.products)}, reglas: {len(rules)}")
+    top_rules = rules.head(TOP_RULES)
+    print(top_rules.round(4))
+    codes = pd.unique(top_rules[['antecedent', 'consequent']].to_numpy().ravel())
+    print("\nProductos de las reglas:")
+    print(basket.describe(codes))
+
+    frequent = None
+    if itemsets:
+        frequent = basket.itemsets(min_support, MAX_ITEMSET_SIZE)
+        print(f"\n6.4 Itemsets frecuentes de hasta {MAX_ITEMSET_SIZE} productos (FP-growth): {len(frequent)}")
+        print(frequent[frequent['size'] > 2].head(TOP_RULES).round(4))
+    return {'rules': rules, 'itemsets': frequent}
+
+
+# 7. Análisis de Patrones de Compra
+# ---------------------------------
+def patterns_stage(results):
+    print("\n\n7. ANÁLISIS DE PATRONES DE COMPRA")
+    print("-" * 50)
+
+    # 7.1 Tamaño promedio de la orden (items por factura)
+    print("\n7.1 Estadísticas de tamaño de orden (items por factura):")
+    print(results.order_size.describe())
+
+    # 7.2 Valor promedio de la orden
+    print("\n7.2 Estadísticas de valor de orden:")
+    print(results.order_value.describe())
+
+    charts = [aggregate_chart('tamaño_orden.png', results), aggregate_chart('valor_orden.png', results)]
+    return {'charts': charts}
+
+
+# 8. Series temporales y análisis de tendencias
+# --------------------------------------------
+def timeseries_stage(results):
+    print("\n\n8. ANÁLISIS DE SERIES TEMPORALES")
+    print("-" * 50)
+
+    # Ventas agrupadas por fecha completa
+    daily_sales = results.daily_sales
+
+    print("\n8.1 Estadísticas de ventas diarias:")
+    print(daily_sales.describe())
+
+    # Semanas, meses, ventanas móviles y comparación interanual sobre la serie horaria
+    timeline = TimeSeries(results.sales_timeline)
+    print("\n8.2 Estadísticas de ventas semanales:")
+    print(timeline.series('weekly').describe())
+
+    print("\n8.3 Ventas mensuales (media móvil de 3 meses y variación interanual):")
+    monthly = timeline.year_over_year('monthly')
+    print(pd.DataFrame({
+        'TotalAmount': monthly['current'],
+        'media_3_meses': timeline.rolling('monthly', 3),
+        'variacion_interanual': monthly['change'],
+    }))
+
+    trend = timeline.trend()
+    print(f"\n8.4 Tendencia: {trend_label(trend)} ({trend['slope']:+.2f} por día según la regresión lineal "
+          f"de las ventas diarias; media de {TREND_WINDOW} días: {trend['first_window']:.2f} al inicio, "
+          f"{trend['last_window']:.2f} al final)")
+
+    # Gráfico de serie temporal
+    return {'charts': [aggregate_chart('serie_temporal_ventas.png', results)]}
+
+
+# 9. Segmentación de Clientes
+# --------------------------
+def segmentation_stage(customers):
+    print("\n\n9. SEGMENTACIÓN DE CLIENTES")
+    print("-" * 50)
+
+    # Creamos segmentos basados en RFM: cada métrica se divide en 5 segmentos,
+    # se suman en RFM_Score y se asigna una categoría (ver retail/rfm.py)
+    rfm = score_rfm(customers['rfm'])
+
+    # Contamos clientes por categoría
+    customer_categories = rfm['Customer_Category'].value_counts()
+    print("\n9.1 Segmentación de clientes por categoría RFM:")
+    print(customer_categories)
+
+    # Visualizamos la segmentación
+    return {'charts': [segmentation_chart(customer_categories)], 'rfm': rfm, 'customer_categories': customer_categories}
+
+
+# 10. Conclusiones
+# ---------------
+def conclusions_stage(overview, results, segmentation):
+    print("\n\n10. CONCLUSIONES DEL ANÁLISIS EXPLORATORIO")
+    print("-" * 50)
+    rfm = segmentation['rfm']
+    trend = TimeSeries(results.sales_timeline).trend()
+
+    print("""
+    Conclusiones principales del análisis exploratorio de datos:
+
+    1. Perfil de Datos:
+       - El dataset contiene información de transacciones minoristas en línea con 8 variables principales.
+       - Hay un porcentaje significativo de valores faltantes en CustomerID ({}%).
+       - Se identificaron transacciones de cancelación y valores negativos que fueron tratados en la limpieza.
+
+    2. Perfil de Ventas:
+       - Reino Unido es el país dominante en términos de transacciones y ventas totales.
+       - Existe una clara estacionalidad con picos de ventas en ciertos meses (particularmente hacia fin de año).
+       - Los días de semana muestran mayor actividad de ventas que los fines de semana.
+       - Las horas con mayor actividad de ventas son durante la mañana y media tarde.
+
+    3. Perfil de Clientes:
+       - La distribución de compras por cliente es altamente sesgada, con pocos clientes generando la mayoría de ingresos.
+       - La segmentación RFM permitió identificar distintos grupos de clientes según su comportamiento de compra.
+       - Aproximadamente {}% de los clientes son de alta valor (Champions y Loyal Customers).
+
+    4. Perfil de Productos:
+       - Existe un grupo pequeño de productos que generan la mayor parte de los ingresos.
+       - Los productos más vendidos por cantidad no siempre coinciden con los más rentables.
+
+    5. Patrones de Compra:
+       - El tamaño promedio de orden es de aproximadamente {} items.
+       - El valor promedio de orden es de aproximadamente £{:.2f}.
+       - Hay una tendencia general {} en las ventas a lo largo del período analizado.
+
+    6. Recomendaciones:
+       - Mejorar la captura de datos de CustomerID para reducir valores faltantes.
+       - Implementar estrategias de marketing específicas para los distintos segmentos de clientes.
+       - Optimizar inventario priorizando productos de alta rotación y rentabilidad.
+       - Considerar promociones especiales en períodos de menor actividad para equilibrar ventas.
+    """.format(
+        overview['missing_customer_pct'],
+        len(rfm[rfm['RFM_Score'] >= 10]) / len(rfm) * 100,
+        results.order_size.mean(),
+        results.order_value.mean(),
+        trend_label(trend)
+    ))
+
+
+# Render de gráficos
+# ------------------
+def render_stage(*sections, workers=None, images_dir=IMAGES_DIR):
+    charts = [chart for section in sections for chart in section['charts']]
+    return render_charts(charts, images_dir, workers=workers)
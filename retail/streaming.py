@@ -0,0 +1,541 @@
+# Ingesta por bloques y agregados parciales combinables
+# -----------------------------------------------------
+# Para archivos que no caben en memoria: se leen bloques de tamaño acotado
+# (CSV o Parquet), se aplican los mismos filtros de limpieza que en main.py y
+# cada bloque se reduce a agregados parciales. Contadores, momentos y sketches
+# se combinan bloque a bloque; las tablas por clave de los bloques se acumulan
+# y se combinan con la tabla acumulada cuando lo pendiente la supera
+# (merge_all), así que el coste crece de forma lineal con el archivo y no se
+# realinea la tabla acumulada en cada bloque.
+#
+# La memoria de pico es la de un bloque más, como mucho, el doble de las
+# tablas acumuladas: depende del tamaño de bloque y del número de claves
+# distintas, no del número de bloques. Las claves no están todas acotadas:
+# además de países, productos y clientes, hay tablas que crecen con el
+# histórico sin límite:
+# - order_size y order_value (una fila por factura),
+# - invoice_customer (factura -> cliente; no se guarda con --hll-precision),
+# - la serie por hora (timeline_amount, timeline_quantity),
+# - los pares (cliente, mes) de la retención por cohortes.
+# Con exportaciones de varios años son estas tablas las que dominan la memoria
+# del modo por bloques y el tamaño del estado incremental.
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from retail.aggregation import TOP_PRODUCTS, AnalysisResults, ProductRanking, _count_by, _sum_by, factorize
+from retail.cache import read_source
+from retail.cleaning import clean_transactions, scan_clean_parquet
+from retail.cohorts import CohortActivity
+from retail.correlation import Comoments
+from retail.distribution import DistributionSummary, row_distributions
+from retail.schema import customer_ids
+from retail.sketches import HyperLogLog, SpaceSaving, TDigest
+from retail.timeseries import TimeSeries
+
+# Columnas necesarias del esquema Online Retail
+COLUMNS = ['InvoiceNo', 'StockCode', 'Description', 'Quantity', 'InvoiceDate', 'UnitPrice', 'CustomerID',
+           'Country']
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+# nombre -> (claves, columna de valor, operación). Los agregados de clientes
+# se calculan solo sobre filas con CustomerID válido.
+AGGREGATES = {
+    'monthly_sales': ('Month', 'TotalAmount', 'sum'),
+    'monthly_quantity': ('Month', 'Quantity', 'sum'),
+    'weekday_sales': ('DayOfWeek', 'TotalAmount', 'sum'),
+    'hourly_sales': ('Hour', 'TotalAmount', 'sum'),
+    'country_counts': ('Country', None, 'size'),
+    'country_sales': ('Country', 'TotalAmount', 'sum'),
+    'stock_counts': ('StockCode', None, 'size'),
+    'product_quantity': (['StockCode', 'Description'], 'Quantity', 'sum'),
+    'product_revenue': (['StockCode', 'Description'], 'TotalAmount', 'sum'),
+    'order_size': ('InvoiceNo', 'Quantity', 'sum'),
+    'order_value': ('InvoiceNo', 'TotalAmount', 'sum'),
+    'timeline_amount': ('HourStart', 'TotalAmount', 'sum'),
+    'timeline_quantity': ('HourStart', 'Quantity', 'sum'),
+}
+
+CUSTOMER_AGGREGATES = {
+    'customer_spending': ('CustomerID', 'TotalAmount', 'sum'),
+    'customer_last_purchase': ('CustomerID', 'InvoiceDate', 'max'),
+    # Cada factura pertenece a un único cliente: con esta tabla la frecuencia
+    # (facturas distintas por cliente) se obtiene sin guardar conjuntos.
+    'invoice_customer': ('InvoiceNo', 'CustomerID', 'first'),
+}
+
+# Modo HyperLogLog: facturas distintas por cliente, país y producto sin
+# guardar la tabla factura -> cliente (que crece con el histórico)
+DISTINCT_INVOICES = {
+    'customer_invoices': 'CustomerID',
+    'country_invoices': 'Country',
+    'product_invoices': 'StockCode',
+}
+
+# Modo heavy hitters: rankings de productos con SpaceSaving de capacidad
+# acotada en lugar de las tablas completas por producto
+HEAVY_HITTERS = ['product_quantity', 'product_revenue']
+
+# Columnas numéricas de los conteos de rechazos (retail/cleaning.py)
+REJECT_COUNTS = ['infringen', 'descartadas']
+
+# Columnas con estadísticas de momentos (count, mean, std, min, max)
+MOMENT_COLUMNS = ['Quantity', 'UnitPrice', 'TotalAmount']
+
+
+def derive_columns(chunk):
+    """Agrega Month, DayOfWeek, Hour, HourStart y TotalAmount a un bloque ya limpio (en el mismo objeto)."""
+    dates = chunk['InvoiceDate']
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates)
+        chunk['InvoiceDate'] = dates
+    chunk['Month'] = dates.dt.month
+    chunk['DayOfWeek'] = dates.dt.dayofweek
+    chunk['Hour'] = dates.dt.hour
+    chunk['HourStart'] = dates.dt.floor('h')
+    chunk['TotalAmount'] = chunk['Quantity'] * chunk['UnitPrice']
+    return chunk
+
+
+def clean_chunk(chunk, with_counts=False):
+    """Aplica las reglas de limpieza de la sección 2 y agrega las columnas derivadas.
+
+    Con with_counts=True devuelve también los rechazos por regla.
+    """
+    clean, rejects = clean_transactions(chunk)
+    clean = derive_columns(clean)
+    return (clean, rejects) if with_counts else clean
+
+
+def read_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Genera DataFrames de como mucho `chunk_size` filas desde un CSV o Parquet."""
+    lower = path.lower()
+    if lower.endswith('.csv'):
+        reader = pd.read_csv(path, usecols=COLUMNS, chunksize=chunk_size, parse_dates=['InvoiceDate'],
+                             dtype={'InvoiceNo': str, 'StockCode': str, 'Description': str, 'Country': str})
+        for chunk in reader:
+            yield chunk
+    elif lower.endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=COLUMNS):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Formato no soportado para lectura por bloques: {path} (use CSV o Parquet)")
+
+
+def iter_source(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Como read_chunks(), pero acepta también Excel (que se lee completo)."""
+    if path.lower().endswith(('.csv', '.parquet')):
+        yield from read_chunks(path, chunk_size)
+    else:
+        yield read_source(path)
+
+
+class PartialAggregates:
+    """Agregados de un subconjunto de transacciones que se pueden combinar con merge()."""
+
+    def __init__(self, hll_precision=None, heavy_hitters=None):
+        self.hll_precision = hll_precision
+        self.heavy_hitters = heavy_hitters
+        self.rows_in = 0
+        self.rows_clean = 0
+        # Filas que infringen cada regla de limpieza y filas descartadas por ella
+        self.rejects = None
+        self.tables = {}
+        self.moments = {}
+        # Sketches de cuantiles de MOMENT_COLUMNS (cuartiles aproximados)
+        self.sketches = {}
+        # HyperLogLog de DISTINCT_INVOICES (solo si hll_precision no es None)
+        self.distinct = {}
+        # SpaceSaving de HEAVY_HITTERS (solo si heavy_hitters no es None)
+        self.heavy = {}
+        # Histogramas finos de ROW_DISTRIBUTIONS (retail/distribution.py)
+        self.distributions = {}
+        # Medias y co-momentos de la matriz de correlación (retail/correlation.py)
+        self.comoments = Comoments()
+        # Pares (cliente, mes) de la retención por cohortes (retail/cohorts.py)
+        self.cohorts = CohortActivity()
+
+    @classmethod
+    def from_frame(cls, df, hll_precision=None, heavy_hitters=None, moments=True):
+        """Agregados de un bloque ya limpio (salida de clean_chunk).
+
+        Con `hll_precision` las facturas distintas se cuentan con HyperLogLog;
+        con `heavy_hitters` los rankings de productos se resumen con
+        SpaceSaving de esa capacidad. Con moments=False no se calculan los
+        momentos ni los sketches de cuantiles, que finalize() no usa.
+        """
+        partial = cls(hll_precision, heavy_hitters)
+        partial.rows_clean = len(df)
+        # Cada clave se factoriza una sola vez para todas sus tablas
+        groups = {}
+        for name, (keys, value, how) in AGGREGATES.items():
+            table = _aggregate(df, keys, value, how, groups)
+            if heavy_hitters is not None and name in HEAVY_HITTERS:
+                partial.heavy[name] = SpaceSaving.from_counts(table, heavy_hitters)
+            else:
+                partial.tables[name] = table
+
+        customers = df[df['CustomerID'].notna()]
+        customers = customers.assign(CustomerID=customer_ids(customers))
+        groups = {}
+        for name, (keys, value, how) in CUSTOMER_AGGREGATES.items():
+            if hll_precision is not None and name == 'invoice_customer':
+                continue
+            partial.tables[name] = _aggregate(customers, keys, value, how, groups)
+        partial.cohorts = CohortActivity.from_arrays(customers['CustomerID'].to_numpy(),
+                                                     customers['InvoiceDate'].to_numpy())
+        if hll_precision is not None:
+            for name, key in DISTINCT_INVOICES.items():
+                rows = customers if key == 'CustomerID' else df
+                partial.distinct[name] = HyperLogLog(hll_precision).update(rows[key], rows['InvoiceNo'])
+
+        for col in MOMENT_COLUMNS if moments else []:
+            values = df[col].to_numpy(dtype='float64')
+            if len(values):
+                partial.moments[col] = np.array([len(values), values.sum(), np.square(values).sum(),
+                                                 values.min(), values.max()])
+                partial.sketches[col] = TDigest.from_values(values)
+        if len(df):
+            partial.distributions = row_distributions(df)
+            partial.comoments = Comoments.from_frame(df)
+        return partial
+
+    def merge(self, other):
+        """Combina `other` en este objeto y lo devuelve."""
+        return self.merge_all([other])
+
+    def merge_all(self, others, fold=True):
+        """Combina varios parciales en este objeto y lo devuelve.
+
+        Las tablas de los parciales se acumulan y se combinan con la tabla
+        acumulada (concatenación + bincount sobre las claves) cuando lo
+        pendiente supera el tamaño de esa tabla: cada fila se recombina un
+        número acotado de veces y lo pendiente nunca supera la tabla acumulada
+        más un parcial. Con fold=False se combinan una sola vez al final, para
+        parciales que ya están todos en memoria (modo paralelo).
+        """
+        pending = {}
+        for other in others:
+            self._merge_counters(other)
+            for name, table in other.tables.items():
+                tables, rows = pending.get(name, ([], 0))
+                tables.append(table)
+                rows += len(table)
+                if fold and rows > len(self.tables.get(name, ())):
+                    self._fold(name, tables)
+                    tables, rows = [], 0
+                pending[name] = (tables, rows)
+        for name, (tables, _) in pending.items():
+            if tables:
+                self._fold(name, tables)
+        return self
+
+    def _fold(self, name, tables):
+        # Combina las tablas pendientes con la acumulada (primero la acumulada,
+        # para que 'first' conserve el valor más antiguo)
+        if name in self.tables:
+            tables = [self.tables[name], *tables]
+        self.tables[name] = _combine_tables(tables, _how(name))
+
+    def _merge_counters(self, other):
+        # Todo lo que no son tablas por clave: contadores, momentos y resúmenes
+        self.rows_in += other.rows_in
+        self.rows_clean += other.rows_clean
+        if other.rejects is not None:
+            if self.rejects is None:
+                self.rejects = other.rejects.copy()
+            else:
+                self.rejects[REJECT_COUNTS] += other.rejects[REJECT_COUNTS]
+        for col, stats in other.moments.items():
+            if col not in self.moments:
+                self.moments[col] = stats
+            else:
+                mine = self.moments[col]
+                self.moments[col] = np.array([mine[0] + stats[0], mine[1] + stats[1], mine[2] + stats[2],
+                                              min(mine[3], stats[3]), max(mine[4], stats[4])])
+        for col, sketch in other.sketches.items():
+            if col not in self.sketches:
+                self.sketches[col] = sketch
+            else:
+                self.sketches[col].merge(sketch)
+        for name, hll in other.distinct.items():
+            if name not in self.distinct:
+                self.distinct[name] = hll
+            else:
+                self.distinct[name].merge(hll)
+        for name, summary in other.heavy.items():
+            if name not in self.heavy:
+                self.heavy[name] = summary
+            else:
+                self.heavy[name].merge(summary)
+        for col, summary in other.distributions.items():
+            if col not in self.distributions:
+                self.distributions[col] = summary
+            else:
+                self.distributions[col].merge(summary)
+        self.comoments.merge(other.comoments)
+        self.cohorts.merge(other.cohorts)
+        self.hll_precision = self.hll_precision or other.hll_precision
+        self.heavy_hitters = self.heavy_hitters or other.heavy_hitters
+
+    def save(self, directory):
+        """Guarda cada tabla como Parquet y los contadores en estado.json."""
+        os.makedirs(directory, exist_ok=True)
+        for name, table in self.tables.items():
+            table.to_frame('value').to_parquet(os.path.join(directory, f'{name}.parquet'))
+        for name, hll in self.distinct.items():
+            hll.to_frame().to_parquet(os.path.join(directory, f'{name}.parquet'), index=False)
+        for name, summary in self.heavy.items():
+            summary.to_frame().to_parquet(os.path.join(directory, f'{name}.parquet'))
+        self.cohorts.pairs().to_parquet(os.path.join(directory, 'customer_months.parquet'), index=False)
+        meta = {'rows_in': self.rows_in, 'rows_clean': self.rows_clean, 'hll_precision': self.hll_precision,
+                'moments': {col: stats.tolist() for col, stats in self.moments.items()},
+                'sketches': {col: sketch.to_dict() for col, sketch in self.sketches.items()},
+                'heavy_hitters': {name: summary.to_dict() for name, summary in self.heavy.items()},
+                'distributions': {col: summary.to_dict() for col, summary in self.distributions.items()},
+                'comoments': self.comoments.to_dict(),
+                'rejects': None if self.rejects is None else self.rejects.to_dict(orient='index')}
+        with open(os.path.join(directory, 'estado.json'), 'w', encoding='utf-8') as fh:
+            json.dump(meta, fh, indent=2)
+
+    @classmethod
+    def load(cls, directory):
+        with open(os.path.join(directory, 'estado.json'), encoding='utf-8') as fh:
+            meta = json.load(fh)
+        heavy = meta.get('heavy_hitters', {})
+        partial = cls(meta.get('hll_precision'), next(iter(heavy.values()))['capacity'] if heavy else None)
+        partial.rows_in = meta['rows_in']
+        partial.rows_clean = meta['rows_clean']
+        if meta.get('rejects'):
+            partial.rejects = pd.DataFrame.from_dict(meta['rejects'], orient='index').rename_axis('rule')
+        partial.moments = {col: np.array(stats) for col, stats in meta['moments'].items()}
+        partial.sketches = {col: TDigest.from_dict(data) for col, data in meta.get('sketches', {}).items()}
+        partial.distributions = {col: DistributionSummary.from_dict(data)
+                                 for col, data in meta.get('distributions', {}).items()}
+        if 'comoments' in meta:
+            partial.comoments = Comoments.from_dict(meta['comoments'])
+        path = os.path.join(directory, 'customer_months.parquet')
+        if os.path.exists(path):
+            partial.cohorts = CohortActivity.from_pairs(pd.read_parquet(path))
+        for name in list(AGGREGATES) + list(CUSTOMER_AGGREGATES):
+            path = os.path.join(directory, f'{name}.parquet')
+            if name in heavy:
+                partial.heavy[name] = SpaceSaving.from_frame(pd.read_parquet(path), heavy[name])
+            elif os.path.exists(path):
+                partial.tables[name] = pd.read_parquet(path)['value']
+        if partial.hll_precision is not None:
+            for name in DISTINCT_INVOICES:
+                frame = pd.read_parquet(os.path.join(directory, f'{name}.parquet'))
+                partial.distinct[name] = HyperLogLog.from_frame(frame, partial.hll_precision)
+        return partial
+
+    def moment_summary(self, col):
+        """count, mean, std, min y max de una columna numérica (como en describe())."""
+        n, total, total_sq, low, high = self.moments[col]
+        mean = total / n
+        var = max(total_sq - n * mean * mean, 0.0) / (n - 1) if n > 1 else float('nan')
+        return pd.Series({'count': n, 'mean': mean, 'std': np.sqrt(var), 'min': low, 'max': high}, name=col)
+
+    def describe(self, col):
+        """Como describe() de la columna, con cuartiles aproximados por el sketch."""
+        return self.sketches[col].describe(name=col)
+
+    def distinct_invoices(self, name):
+        """Facturas distintas estimadas por clave (modo HyperLogLog)."""
+        estimate = self.distinct[name].estimate().round().astype('int64')
+        estimate.index.name = DISTINCT_INVOICES[name]
+        return estimate.rename('InvoiceNo')
+
+    def finalize(self):
+        """Tablas finales como AnalysisResults, igual que compute_aggregates()."""
+        t = self.tables
+        results = {
+            'monthly_sales': t['monthly_sales'].reindex(range(1, 13)),
+            'monthly_quantity': _calendar_quantity(t['monthly_quantity'].reindex(range(1, 13))),
+            'weekday_sales': t['weekday_sales'].sort_index(),
+            'hourly_sales': t['hourly_sales'].sort_index(),
+            'country_counts': _ranked(t['country_counts']).rename('count'),
+            'country_sales': _ranked(t['country_sales']),
+            'stock_counts': _ranked(t['stock_counts']).rename('count'),
+            'order_size': _plain_index(t['order_size']).sort_index().astype('int64'),
+            'order_value': _plain_index(t['order_value']).sort_index(),
+            'customer_spending': t['customer_spending'].sort_index(),
+        }
+        timeline = TimeSeries(pd.DataFrame({
+            'TotalAmount': t['timeline_amount'],
+            'Quantity': t['timeline_quantity'].astype('int64'),
+        }).rename_axis('Timestamp'))
+        results['sales_timeline'] = timeline.hourly
+        results['daily_sales'] = timeline.series('daily')
+        results['correlation'] = self.comoments.correlation()
+        results['cohort_counts'] = self.cohorts.counts()
+        if self.heavy:
+            # Rankings aproximados: pesos (cotas superiores) de las claves vigiladas
+            quantity = self.heavy['product_quantity'].top(TOP_PRODUCTS)['count']
+            revenue = self.heavy['product_revenue'].top(TOP_PRODUCTS)['count']
+            results['top_products_quantity'] = _plain_index(quantity).round().astype('int64').rename('Quantity')
+            results['top_products_revenue'] = _plain_index(revenue).rename('TotalAmount')
+        else:
+            ranking = ProductRanking(_plain_index(pd.DataFrame({
+                'Quantity': t['product_quantity'].astype('int64'),
+                'TotalAmount': t['product_revenue'],
+            })).sort_index())
+            results['product_totals'] = ranking.totals
+            results['top_products_quantity'] = ranking.top('Quantity', TOP_PRODUCTS)
+            results['top_products_revenue'] = ranking.top('TotalAmount', TOP_PRODUCTS)
+        if 'customer_invoices' in self.distinct:
+            results['customer_transactions'] = self.distinct_invoices('customer_invoices')
+        else:
+            results['customer_transactions'] = t['invoice_customer'].groupby(t['invoice_customer']).size()
+            results['customer_transactions'].index.name = 'CustomerID'
+            results['customer_transactions'].name = 'InvoiceNo'
+
+        max_date = t['customer_last_purchase'].max()
+        results['rfm'] = pd.DataFrame({
+            'Recency': (max_date - t['customer_last_purchase']).dt.days,
+            'Frequency': results['customer_transactions'],
+            'Monetary': results['customer_spending'],
+        }).sort_index()
+        # Copias: los merges posteriores no deben cambiar estos resultados
+        distributions = {col: summary.copy() for col, summary in self.distributions.items()}
+        return AnalysisResults(distributions=distributions, **results)
+
+
+def _plain_index(table):
+    # Con claves categóricas (esquema compacto) groupby devuelve índices
+    # categóricos; compute_aggregates() devuelve índices normales
+    index = table.index
+    if isinstance(index, pd.MultiIndex):
+        levels = [index.get_level_values(level).astype(object) for level in range(index.nlevels)]
+        return table.set_axis(pd.MultiIndex.from_arrays(levels, names=index.names))
+    if isinstance(index, pd.CategoricalIndex):
+        return table.set_axis(index.astype(object))
+    return table
+
+
+def _calendar_quantity(table):
+    # Entera mientras no falte ningún mes, como en compute_aggregates()
+    return table.astype('int64') if table.notna().all() else table
+
+
+def _ranked(table):
+    # Orden descendente estable sobre las claves ordenadas: los empates quedan
+    # en el mismo orden que en compute_aggregates()
+    return _plain_index(table).sort_index().sort_values(ascending=False, kind='stable')
+
+
+def _how(name):
+    spec = AGGREGATES.get(name) or CUSTOMER_AGGREGATES[name]
+    return spec[2]
+
+
+def _group_codes(df, keys):
+    # Códigos enteros por grupo con los mismos kernels que compute_aggregates()
+    # (factorize + bincount); las filas con alguna clave nula quedan en -1
+    if isinstance(keys, str):
+        codes, uniques = factorize(df[keys], sort=False)
+        return codes, pd.Index(uniques, name=keys)
+    key_codes, key_uniques = zip(*(factorize(df[key], sort=False) for key in keys))
+    combined = np.zeros(len(df), dtype='int64')
+    for codes, uniques in zip(key_codes, key_uniques):
+        combined = combined * len(uniques) + codes
+    valid = np.logical_and.reduce([codes >= 0 for codes in key_codes])
+    codes = np.full(len(df), -1, dtype='int64')
+    codes[valid], groups = factorize(combined[valid], sort=False)
+    return codes, _key_index(np.asarray(groups), key_uniques, keys)
+
+
+def _key_index(keys, levels, names):
+    # MultiIndex de las claves combinadas (código_0 * len(nivel_1) + código_1
+    # ...) sin pasar por tuplas ni volver a factorizar los niveles
+    level_codes = []
+    for uniques in reversed(levels):
+        level_codes.append(keys % len(uniques))
+        keys = keys // len(uniques)
+    return pd.MultiIndex(levels=list(levels), codes=level_codes[::-1], names=names, verify_integrity=False)
+
+
+def _aggregate(df, keys, value, how, groups=None):
+    groups = {} if groups is None else groups
+    if str(keys) not in groups:
+        groups[str(keys)] = _group_codes(df, keys)
+    codes, index = groups[str(keys)]
+    if how == 'size':
+        return pd.Series(_count_by(codes[codes >= 0], len(index)), index=index)
+    return _reduce(codes, df[value].to_numpy(), index, how, value)
+
+
+def _combine_tables(tables, how):
+    # Una tabla por clave a partir de varias: 'sum' y 'size' suman, 'max' toma
+    # el máximo y 'first' conserva el valor de la primera tabla que tiene la clave
+    if len(tables) == 1:
+        return tables[0]
+    values = np.concatenate([table.to_numpy() for table in tables])
+    if isinstance(tables[0].index, pd.MultiIndex):
+        codes, index = _factorize_levels([table.index for table in tables])
+    else:
+        codes, index = tables[0].index.append([table.index for table in tables[1:]]).factorize()
+        index = index.set_names(tables[0].index.names)
+    return _reduce(codes, values, index, 'sum' if how == 'size' else how, tables[0].name)
+
+
+def _factorize_levels(indexes):
+    # Como MultiIndex.factorize() sobre la concatenación de `indexes`, pero
+    # factorizando cada nivel por separado en lugar de construir tuplas. Las
+    # tablas no tienen claves nulas (_aggregate descarta esas filas)
+    key = np.zeros(sum(len(index) for index in indexes), dtype='int64')
+    levels = []
+    for position in range(indexes[0].nlevels):
+        values = np.concatenate([index.get_level_values(position).to_numpy() for index in indexes])
+        level_codes, uniques = pd.factorize(values)
+        key = key * len(uniques) + level_codes
+        levels.append(uniques)
+    codes, keys = pd.factorize(key)
+    return codes, _key_index(keys, levels, indexes[0].names)
+
+
+def _reduce(codes, values, index, how, name):
+    # Un valor por grupo de `index` (las filas con código -1 no cuentan)
+    valid = codes >= 0
+    if not valid.all():
+        codes, values = codes[valid], values[valid]
+    if how == 'sum':
+        sums = _sum_by(codes, values, len(index))
+        return pd.Series(sums.astype('int64') if values.dtype.kind in 'iu' else sums, index=index, name=name)
+    if how == 'max':
+        # Solo se usa con fechas (última compra de cada cliente)
+        latest = np.full(len(index), np.iinfo('int64').min)
+        np.maximum.at(latest, codes, values.astype('datetime64[ns]').view('int64'))
+        return pd.Series(latest.view('datetime64[ns]'), index=index, name=name)
+    # 'first': valor de la primera fila de cada grupo
+    _, first = np.unique(codes, return_index=True)
+    return pd.Series(values[first], index=index, name=name)
+
+
+def aggregate_stream(path, chunk_size=DEFAULT_CHUNK_SIZE, hll_precision=None, heavy_hitters=None):
+    """Recorre `path` por bloques y devuelve los agregados combinados."""
+    total = PartialAggregates(hll_precision, heavy_hitters)
+    if path.lower().endswith('.parquet'):
+        # Reglas evaluadas en Arrow: a pandas solo llegan las filas válidas
+        chunks = ((derive_columns(clean), rejects, rows_in)
+                  for clean, rejects, rows_in in scan_clean_parquet(path, COLUMNS, chunk_size))
+    else:
+        chunks = ((*clean_chunk(chunk, with_counts=True), len(chunk)) for chunk in iter_source(path, chunk_size))
+
+    def partials():
+        for clean, rejects, rows_in in chunks:
+            partial = PartialAggregates.from_frame(clean, hll_precision, heavy_hitters)
+            partial.rows_in = rows_in
+            partial.rejects = rejects
+            yield partial
+
+    # Contadores, momentos y sketches se combinan bloque a bloque; las tablas
+    # por clave se combinan con las acumuladas cuando lo pendiente las supera
+    return total.merge_all(partials())
@@ -0,0 +1,144 @@
+# Series temporales de ventas a varias granularidades
+# ---------------------------------------------------
+# La sección 8 solo tenía la serie diaria y la conclusión de tendencia
+# comparaba la media de los 20 últimos días con la de los 20 primeros. Aquí las
+# ventas se acumulan una sola vez, por hora, sobre los datetime64 nativos de
+# InvoiceDate (un bincount, sin objetos date de Python) y de esa serie horaria
+# salen la diaria, la semanal (semanas que empiezan el lunes) y la mensual
+# sumando horas contiguas.
+#
+# La serie horaria es pequeña (a lo sumo 24 filas por día) y se combina
+# sumando, así que llegar un día nuevo solo requiere agregar sus propias horas
+# (merge). Sobre cualquier granularidad hay ventanas móviles y acumuladas,
+# comparación interanual y la pendiente de la tendencia.
+#
+#   ts = TimeSeries(results.sales_timeline)
+#   ts.rolling('weekly', 4)
+#   ts.year_over_year('monthly')
+
+import numpy as np
+import pandas as pd
+
+MEASURES = ['TotalAmount', 'Quantity']
+
+# Granularidad -> (frecuencia de pandas, nombre del índice)
+GRANULARITIES = {
+    'hourly': ('h', 'Timestamp'),
+    'daily': ('D', 'Date'),
+    'weekly': ('W-MON', 'Week'),
+    'monthly': ('MS', 'MonthStart'),
+}
+
+# Periodos que separan un valor del mismo periodo del año anterior (días y
+# semanas: 52 semanas exactas, para comparar el mismo día de la semana)
+YEAR_PERIODS = {'hourly': 364 * 24, 'daily': 364, 'weekly': 52, 'monthly': 12}
+
+# Días de las ventanas de las medias móviles de la tendencia
+TREND_WINDOW = 28
+
+
+def hourly_totals(timestamps, amount, quantity):
+    """TotalAmount y Quantity por hora (solo las horas con ventas), con un bincount."""
+    hours = np.asarray(timestamps).astype('datetime64[h]').astype('int64')
+    first = hours.min() if len(hours) else 0
+    codes = hours - first
+    size = int(codes.max()) + 1 if len(hours) else 0
+    present = np.bincount(codes, minlength=size) > 0
+    index = pd.DatetimeIndex((np.arange(size)[present] + first).astype('datetime64[h]').astype('datetime64[ns]'),
+                             name='Timestamp')
+    return pd.DataFrame({
+        'TotalAmount': np.bincount(codes, weights=amount, minlength=size)[present],
+        'Quantity': np.bincount(codes, weights=quantity, minlength=size)[present].astype('int64'),
+    }, index=index)
+
+
+def _period_starts(stamps, granularity):
+    # Inicio del periodo de cada hora, como datetime64[ns]
+    if granularity == 'hourly':
+        return stamps
+    days = stamps.astype('datetime64[D]')
+    if granularity == 'daily':
+        starts = days
+    elif granularity == 'weekly':
+        # El 1970-01-01 fue jueves: (días + 3) % 7 son los días desde el lunes
+        starts = days - (days.astype('int64') + 3) % 7
+    else:
+        starts = days.astype('datetime64[M]')
+    return starts.astype('datetime64[ns]')
+
+
+class TimeSeries:
+    """Ventas por hora y sus agregaciones diaria, semanal y mensual."""
+
+    def __init__(self, hourly):
+        # hourly: DataFrame con MEASURES indexado por la hora (DatetimeIndex ordenado)
+        self.hourly = hourly.sort_index()
+
+    @classmethod
+    def from_frame(cls, df):
+        """Serie horaria de df_analysis (InvoiceDate, TotalAmount y Quantity)."""
+        return cls(hourly_totals(df['InvoiceDate'].to_numpy(), df['TotalAmount'].to_numpy(dtype='float64'),
+                                 df['Quantity'].to_numpy(dtype='float64')))
+
+    def merge(self, other):
+        """Combina las horas de `other` (por ejemplo, un día nuevo) y devuelve el resultado."""
+        merged = self.hourly.add(other.hourly, fill_value=0)
+        return TimeSeries(merged.astype({'Quantity': 'int64'}))
+
+    def series(self, granularity='daily', measure='TotalAmount', fill=False):
+        """Suma de `measure` por periodo.
+
+        Solo aparecen los periodos con ventas; con fill=True se incluyen todos
+        los del calendario entre el primero y el último, con 0.
+        """
+        if measure not in MEASURES:
+            raise KeyError(f"Medida desconocida: {measure} (use {', '.join(MEASURES)})")
+        if granularity not in GRANULARITIES:
+            raise KeyError(f"Granularidad desconocida: {granularity} (use {', '.join(GRANULARITIES)})")
+        freq, name = GRANULARITIES[granularity]
+        starts = _period_starts(self.hourly.index.to_numpy(), granularity)
+        # Las horas están ordenadas: cada periodo es un tramo contiguo
+        periods, first = np.unique(starts, return_index=True)
+        values = self.hourly[measure].to_numpy()
+        totals = np.add.reduceat(values, first) if len(values) else values
+        series = pd.Series(totals, index=pd.DatetimeIndex(periods, name=name), name=measure)
+        if fill and len(series):
+            full = pd.date_range(series.index[0], series.index[-1], freq=freq, name=name)
+            series = series.reindex(full, fill_value=0)
+        return series
+
+    def rolling(self, granularity='daily', window=7, measure='TotalAmount', how='mean'):
+        """Ventana móvil de `window` periodos del calendario (los periodos sin ventas cuentan como 0)."""
+        return self.series(granularity, measure, fill=True).rolling(window).agg(how)
+
+    def expanding(self, granularity='daily', measure='TotalAmount', how='sum'):
+        """Ventana acumulada desde el primer periodo."""
+        return self.series(granularity, measure, fill=True).expanding().agg(how)
+
+    def year_over_year(self, granularity='monthly', measure='TotalAmount'):
+        """Cada periodo frente al mismo periodo del año anterior.
+
+        Columnas current, previous y change (variación relativa); previous es
+        NaN mientras no hay un año de historia.
+        """
+        current = self.series(granularity, measure, fill=True)
+        previous = current.shift(YEAR_PERIODS[granularity])
+        return pd.DataFrame({'current': current, 'previous': previous, 'change': current / previous - 1})
+
+    def trend(self, window=TREND_WINDOW, measure='TotalAmount'):
+        """Pendiente (por día) y variación de la media móvil de `window` días entre el inicio y el final.
+
+        La pendiente es la de la regresión lineal sobre las ventas diarias del
+        calendario completo (los días sin ventas cuentan como 0).
+        """
+        daily = self.series('daily', measure, fill=True)
+        if len(daily) < 2:
+            return {'slope': 0.0, 'first_window': float('nan'), 'last_window': float('nan')}
+        slope = np.polyfit(np.arange(len(daily), dtype='float64'), daily.to_numpy(dtype='float64'), 1)[0]
+        means = daily.rolling(window, min_periods=1).mean()
+        return {'slope': float(slope), 'first_window': float(means.iloc[min(window, len(daily)) - 1]),
+                'last_window': float(means.iloc[-1])}
+
+
+def trend_label(trend):
+    return "creciente" if trend['slope'] > 0 else "decreciente"
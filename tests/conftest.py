@@ -0,0 +1,25 @@
+# Datos compartidos por las pruebas: un dataset sintético pequeño con el
+# esquema Online Retail (cancelaciones, Description y CustomerID nulos,
+# precios a 0), el mismo generador que usan los benchmarks.
+
+import contextlib
+import io
+
+import pytest
+
+from benchmarks.synthetic import generate
+from retail.schema import apply_load_schema
+from retail.stages import clean_stage, enrich_stage
+
+
+@pytest.fixture(scope='session')
+def transactions():
+    """Unas 12 000 líneas sin limpiar, con los tipos de read_source()."""
+    return generate(scale=0.02, seed=0)
+
+
+@pytest.fixture(scope='session')
+def df_analysis(transactions):
+    """Las transacciones limpias y enriquecidas, como la etapa `enrich`."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return enrich_stage(clean_stage(apply_load_schema(transactions.copy())))
@@ -0,0 +1,25 @@
+import numpy as np
+
+from benchmarks.aggregation import BASELINE_TABLES, baseline_aggregates
+from retail.aggregation import compute_aggregates, mismatched_tables, top_k_positions
+
+
+def test_single_pass_matches_pandas_groupby(df_analysis):
+    expected = baseline_aggregates(df_analysis)
+    assert mismatched_tables(expected, compute_aggregates(df_analysis), BASELINE_TABLES) == []
+    assert mismatched_tables(expected, compute_aggregates(df_analysis, extras=False), BASELINE_TABLES) == []
+
+
+def test_ranking_order_matches_sort_values(df_analysis):
+    # mismatched_tables ordena el índice: aquí se comprueba también el orden
+    expected = baseline_aggregates(df_analysis)
+    results = compute_aggregates(df_analysis)
+    for name in ['country_counts', 'country_sales', 'top_products_quantity', 'top_products_revenue']:
+        assert getattr(results, name).index.tolist() == getattr(expected, name).index.tolist(), name
+
+
+def test_top_k_positions_matches_stable_argsort():
+    # Muchos empates: el orden entre iguales debe ser el original
+    values = np.random.default_rng(0).integers(0, 50, 5000)
+    for k in [0, 1, 10, 100, 4999, 5000, 6000]:
+        np.testing.assert_array_equal(top_k_positions(values, k), np.argsort(-values, kind='stable')[:k])
@@ -0,0 +1,51 @@
+import pandas as pd
+
+from retail.basket import BasketAnalysis
+
+
+def invoice_products(df_analysis):
+    return df_analysis[['InvoiceNo', 'StockCode']].astype(str).drop_duplicates()
+
+
+def test_rules_match_self_merge(df_analysis):
+    lines = invoice_products(df_analysis)
+    n_invoices = lines['InvoiceNo'].nunique()
+    item_counts = lines['StockCode'].value_counts()
+
+    # El cálculo anterior: un self-merge por factura, una fila por par ordenado
+    pairs = lines.merge(lines, on='InvoiceNo', suffixes=('_a', '_b'))
+    pairs = pairs[pairs['StockCode_a'] != pairs['StockCode_b']]
+    expected = pairs.groupby(['StockCode_a', 'StockCode_b']).size().rename('count').reset_index()
+    expected.columns = ['antecedent', 'consequent', 'count']
+    expected = expected[expected['count'] >= 0.03 * n_invoices]
+    expected['support'] = expected['count'] / n_invoices
+    expected['confidence'] = expected['count'] / item_counts.reindex(expected['antecedent']).to_numpy()
+    expected['lift'] = expected['confidence'] / (item_counts.reindex(expected['consequent']).to_numpy() / n_invoices)
+    expected = expected[expected['confidence'] >= 0.2]
+
+    rules = BasketAnalysis.from_frame(df_analysis).rules(min_support=0.03, min_confidence=0.2)
+    assert len(rules) > 100
+    key = ['antecedent', 'consequent']
+    pd.testing.assert_frame_equal(rules.astype({col: str for col in key}).sort_values(key).reset_index(drop=True),
+                                  expected.sort_values(key).reset_index(drop=True), check_dtype=False)
+    assert rules['lift'].is_monotonic_decreasing
+
+
+def test_itemsets_match_brute_force(df_analysis):
+    lines = invoice_products(df_analysis)
+    n_invoices = lines['InvoiceNo'].nunique()
+    min_count = 0.05 * n_invoices
+    frequent = lines['StockCode'].value_counts()
+    lines = lines[lines['StockCode'].isin(frequent.index[frequent >= min_count])]
+
+    # Tríos de productos distintos de cada factura, en orden
+    triples = lines.merge(lines, on='InvoiceNo').merge(lines, on='InvoiceNo')
+    triples = triples[(triples['StockCode_x'] < triples['StockCode_y'])
+                      & (triples['StockCode_y'] < triples['StockCode'])]
+    expected = triples.groupby(['StockCode_x', 'StockCode_y', 'StockCode']).size()
+    expected = expected[expected >= min_count]
+
+    itemsets = BasketAnalysis.from_frame(df_analysis).itemsets(min_support=0.05, max_size=3)
+    found = itemsets[itemsets['size'] == 3].set_index('itemset')['count']
+    assert len(found) > 100
+    assert found.sort_index().to_dict() == {key: count for key, count in expected.sort_index().items()}
@@ -0,0 +1,19 @@
+import os
+
+from retail.cache import cache_paths, cache_status, load_transactions
+
+
+def test_same_name_in_different_folders_keeps_separate_caches(transactions, tmp_path):
+    sources = []
+    for year, rows in [('2010', transactions.iloc[:100]), ('2011', transactions.iloc[100:250])]:
+        os.makedirs(tmp_path / year)
+        path = str(tmp_path / year / 'Online_Retail.csv')
+        rows.to_csv(path, index=False)
+        sources.append(path)
+    cache_dir = str(tmp_path / 'cache')
+
+    assert cache_paths(sources[0], cache_dir) != cache_paths(sources[1], cache_dir)
+    assert [len(load_transactions(path, cache_dir)) for path in sources] == [100, 150]
+    # Cargar el segundo no invalida la cache del primero
+    assert [cache_status(path, cache_dir) for path in sources] == ['fresh', 'fresh']
+    assert len(load_transactions(sources[0], cache_dir)) == 100
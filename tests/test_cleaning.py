@@ -0,0 +1,20 @@
+import pandas as pd
+
+from retail.cleaning import clean_transactions, scan_clean_parquet
+from retail.schema import apply_load_schema
+from retail.streaming import COLUMNS, REJECT_COUNTS
+
+
+def test_scan_clean_parquet_matches_clean_transactions(transactions, tmp_path):
+    df = apply_load_schema(transactions.copy())
+    path = tmp_path / 'transacciones.parquet'
+    df.to_parquet(path, index=False)
+
+    batches = list(scan_clean_parquet(str(path), COLUMNS, batch_size=1000))
+    expected, expected_rejects = clean_transactions(df)
+
+    assert sum(rows_in for _, _, rows_in in batches) == len(df)
+    clean = pd.concat([batch for batch, _, _ in batches], ignore_index=True)
+    assert clean['InvoiceNo'].astype(str).tolist() == expected['InvoiceNo'].astype(str).tolist()
+    rejects = sum(counts[REJECT_COUNTS] for _, counts, _ in batches)
+    pd.testing.assert_frame_equal(rejects, expected_rejects[REJECT_COUNTS], check_dtype=False)
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from retail.cohorts import CohortActivity, retention
+
+
+def cohort_table(df_analysis):
+    """La tabla de cohortes habitual con pandas: mes de la primera compra × meses transcurridos."""
+    df = df_analysis.dropna(subset=['CustomerID'])
+    month = df['InvoiceDate'].dt.to_period('M')
+    cohort = month.groupby(df['CustomerID']).transform('min')
+    months_since = (month.dt.year - cohort.dt.year) * 12 + (month.dt.month - cohort.dt.month)
+    table = df.groupby([cohort.dt.to_timestamp().rename('Cohort'), months_since.rename('MonthsSince')])['CustomerID']
+    return table.nunique().unstack(fill_value=0)
+
+
+def test_monthly_merges_match_cohort_table(df_analysis):
+    # Un mes por vez, como al llegar datos nuevos; un mes pasa por pairs()
+    month = df_analysis['InvoiceDate'].dt.to_period('M')
+    activity = CohortActivity()
+    for number, period in enumerate(month.unique()):
+        part = CohortActivity.from_frame(df_analysis[month == period])
+        activity.merge(CohortActivity.from_pairs(part.pairs()) if number == 1 else part)
+
+    counts = activity.counts()
+    expected = cohort_table(df_analysis)
+    pd.testing.assert_frame_equal(counts.loc[expected.index, expected.columns], expected, check_dtype=False,
+                                  check_names=False, check_freq=False)
+    # Las cohortes y desplazamientos que faltan en la tabla de pandas no tienen clientes
+    assert counts.drop(index=expected.index).to_numpy().sum() == 0
+    assert counts.drop(columns=expected.columns).to_numpy().sum() == 0
+
+    rates = retention(counts)
+    expected_rates = expected.div(expected[0], axis=0)
+    observed = rates.loc[expected.index, expected.columns].notna().to_numpy()
+    np.testing.assert_allclose(rates.loc[expected.index, expected.columns].to_numpy()[observed],
+                               expected_rates.to_numpy()[observed])
+    # Lo no observado todavía es NaN: la cohorte del último mes solo tiene el mes 0
+    assert rates.iloc[-1, 1:].isna().all() and rates.iloc[:, 0].dropna().eq(1).all()
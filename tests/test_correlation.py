@@ -0,0 +1,35 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from retail.correlation import CORRELATION_COLUMNS, Comoments
+
+
+def test_merged_blocks_match_dataframe_corr(df_analysis):
+    expected = df_analysis[CORRELATION_COLUMNS].astype('float64').corr()
+
+    # Bloques pequeños, partes combinadas y un estado que pasa por JSON
+    parts = [Comoments.from_frame(df_analysis.iloc[chunk], block_rows=700)
+             for chunk in np.array_split(np.arange(len(df_analysis)), 7)]
+    total = Comoments.from_dict(json.loads(json.dumps(parts[0].to_dict())))
+    for part in parts[1:]:
+        total.merge(part)
+
+    assert total.count == len(df_analysis)
+    pd.testing.assert_frame_equal(total.correlation(), expected, rtol=1e-9)
+    pd.testing.assert_frame_equal(total.covariance(), df_analysis[CORRELATION_COLUMNS].astype('float64').cov(),
+                                  rtol=1e-9)
+
+
+def test_date_parts_offsets_and_constant_columns(df_analysis):
+    # Sin Year ni Day (como los bloques del modo por bloques), una columna
+    # desplazada lejos del cero y otra constante
+    frame = df_analysis.drop(columns=['Year', 'Day']).assign(UnitPrice=df_analysis['UnitPrice'] + 1e9, Hour=12)
+    expected = df_analysis.assign(UnitPrice=df_analysis['UnitPrice'] + 1e9, Hour=12)[CORRELATION_COLUMNS]
+    halves = np.array_split(np.arange(len(frame)), 2)
+    total = Comoments.from_frame(frame.iloc[halves[0]]).merge(Comoments.from_frame(frame.iloc[halves[1]]))
+
+    # Con sumas de cuadrados (1e18 por fila) la correlación de UnitPrice se
+    # perdería; con co-momentos centrados solo queda el redondeo de los datos
+    pd.testing.assert_frame_equal(total.correlation(), expected.astype('float64').corr(), rtol=0, atol=1e-6)
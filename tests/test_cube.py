@@ -0,0 +1,39 @@
+import pandas as pd
+import pytest
+
+from retail.cube import Cube
+
+
+def grouped(df, measure, by):
+    """La misma consulta con un groupby de pandas sobre las transacciones."""
+    if measure == 'count':
+        return df.groupby(by, observed=True).size()
+    return df.groupby(by, observed=True)[measure].sum()
+
+
+@pytest.mark.parametrize('measure, by, filters', [
+    ('TotalAmount', 'Month', {}),
+    ('Quantity', ['Hour', 'Country'], {}),
+    ('TotalAmount', 'Hour', {'Country': 'Germany', 'Month': 11}),
+    ('count', ['Country', 'Month'], {'Month': [11, 12], 'DayOfWeek': [0, 1, 2]}),
+])
+def test_query_matches_groupby(df_analysis, tmp_path, measure, by, filters):
+    Cube.from_frame(df_analysis).save(str(tmp_path))
+    result = Cube.load(str(tmp_path)).query(measure, by, **filters)
+
+    df = df_analysis.assign(Country=df_analysis['Country'].astype(str))
+    for name, labels in filters.items():
+        df = df[df[name].isin(labels if isinstance(labels, list) else [labels])]
+    expected = grouped(df, measure, by)
+
+    # El cubo es denso: las celdas sin ventas valen 0 y el groupby no las tiene
+    assert (result.drop(expected.index) == 0).all()
+    pd.testing.assert_series_equal(result.loc[expected.index], expected.astype(result.dtype), check_names=False,
+                                  check_index_type=False)
+
+
+def test_rollup_of_whole_cube_is_the_total(df_analysis):
+    cube = Cube.from_frame(df_analysis)
+    assert cube.rollup('count') == len(df_analysis)
+    assert cube.rollup('Quantity') == df_analysis['Quantity'].sum()
+    assert cube.rollup('TotalAmount') == pytest.approx(df_analysis['TotalAmount'].sum(), rel=1e-12)
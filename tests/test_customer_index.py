@@ -0,0 +1,37 @@
+import pandas as pd
+import pytest
+
+from retail.aggregation import compute_aggregates
+from retail.customer_index import INDEX_COLUMNS, CustomerIndex
+
+
+def filtered_history(df_analysis, customer_id):
+    """El historial con un filtro booleano sobre todas las transacciones."""
+    rows = df_analysis[df_analysis['CustomerID'] == customer_id]
+    rows = rows.sort_values('InvoiceDate', kind='stable')[list(INDEX_COLUMNS)].reset_index(drop=True)
+    return rows.astype({name: str for name, kind in INDEX_COLUMNS.items() if kind == 'codes'})
+
+
+@pytest.mark.parametrize('direct_slots', [True, False])
+def test_history_matches_boolean_filter(df_analysis, tmp_path, direct_slots):
+    index = CustomerIndex.from_frame(df_analysis)
+    if not direct_slots:
+        # Búsqueda por bisección, la de rangos de CustomerID muy grandes
+        index.slots = None
+    index = CustomerIndex.load(index.save(str(tmp_path)))
+    rfm = compute_aggregates(df_analysis).rfm
+    max_date = df_analysis.dropna(subset=['CustomerID'])['InvoiceDate'].max()
+
+    assert len(index) == len(rfm)
+    for customer_id in rfm.index:
+        expected = filtered_history(df_analysis, customer_id)
+        pd.testing.assert_frame_equal(index.history(customer_id), expected, check_dtype=False)
+        invoices = expected.groupby('InvoiceNo', sort=False)['TotalAmount'].sum()
+        pd.testing.assert_series_equal(index.invoices(customer_id)['TotalAmount'], invoices)
+        inputs = index.rfm_inputs(customer_id, max_date=max_date)
+        assert (inputs['Recency'], inputs['Frequency']) == (rfm.at[customer_id, 'Recency'],
+                                                            rfm.at[customer_id, 'Frequency'])
+        assert inputs['Monetary'] == pytest.approx(rfm.at[customer_id, 'Monetary'], rel=1e-12)
+
+    with pytest.raises(KeyError):
+        index.history(int(rfm.index.max()) + 1)
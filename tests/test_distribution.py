@@ -0,0 +1,42 @@
+import json
+
+import numpy as np
+import pytest
+
+from retail.distribution import ROW_DISTRIBUTIONS, DistributionSummary, row_distributions
+
+
+@pytest.mark.parametrize('col', list(ROW_DISTRIBUTIONS))
+def test_merged_summary_matches_clipped_column(df_analysis, col):
+    # Los gráficos anteriores usaban la columna recortada al rango del gráfico
+    clipped = df_analysis[col].astype('float64').clip(0, ROW_DISTRIBUTIONS[col])
+    parts = [row_distributions(df_analysis.iloc[chunk]) for chunk in np.array_split(np.arange(len(clipped)), 10)]
+    summary = DistributionSummary.from_dict(json.loads(json.dumps(parts[0][col].to_dict())))
+    for part in parts[1:]:
+        summary.merge(part[col])
+
+    assert summary.count == len(clipped)
+    assert (summary.min, summary.max) == (clipped.min(), clipped.max())
+    assert summary.total / summary.count == pytest.approx(clipped.mean(), rel=1e-12)
+    assert summary.std() == pytest.approx(clipped.std(), rel=1e-9)
+
+    # Mismas barras que un histograma de NumPy con los mismos bordes
+    edges, counts = summary.histogram()
+    np.testing.assert_array_equal(counts, np.histogram(clipped, bins=edges)[0])
+    # Los cuartiles se interpolan dentro de un bin fino
+    for q in (0.25, 0.5, 0.75):
+        assert abs(summary.quantile(q) - clipped.quantile(q)) <= summary.width
+
+
+def test_box_stats_match_pandas_quartiles(df_analysis):
+    clipped = df_analysis['TotalAmount'].astype('float64').clip(0, 500)
+    stats = DistributionSummary.from_values(clipped, 0, 500).box_stats()
+
+    q1, q3 = clipped.quantile([0.25, 0.75])
+    inner = clipped[clipped.between(q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1))]
+    # Los bigotes son centros de bin fino y el IQR sale de cuartiles interpolados
+    width = 500 / 1000
+    assert abs(stats['whislo'] - inner.min()) <= 2 * width and abs(stats['whishi'] - inner.max()) <= 2 * width
+    assert abs(stats['fliers'].max() - clipped.max()) <= width
+    assert (stats['q1'], stats['med'], stats['q3']) == pytest.approx(tuple(clipped.quantile([0.25, 0.5, 0.75])),
+                                                                    abs=width)
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from retail.incremental import IncrementalStore, verify_against_full
+
+
+@pytest.fixture
+def daily_files(transactions, tmp_path):
+    """Las transacciones repartidas en tres CSV consecutivos."""
+    paths = []
+    for number, positions in enumerate(np.array_split(np.arange(len(transactions)), 3)):
+        path = tmp_path / f'facturas_{number}.csv'
+        transactions.iloc[positions].to_csv(path, index=False)
+        paths.append(str(path))
+    return paths
+
+
+def test_incremental_matches_full_recompute(daily_files):
+    assert verify_against_full(daily_files) == []
+
+
+def test_manifest_records_rows_of_each_file(daily_files, tmp_path):
+    store = IncrementalStore(str(tmp_path / 'incremental'))
+    for path in daily_files:
+        store.update(path)
+    # Un archivo ya incorporado no se vuelve a aplicar
+    assert store.update(daily_files[0]) is None
+
+    manifest = store.processed_files()
+    expected = [len(pd.read_csv(path)) for path in daily_files]
+    assert manifest['rows'].tolist() == expected
+    assert store.load().rows_in == sum(expected)
@@ -0,0 +1,29 @@
+import pandas as pd
+
+from retail.ingest import INGEST_DTYPES, ingest
+from retail.schema import apply_load_schema
+
+
+def test_ingest_categorical_parquet_with_nulls(transactions, tmp_path):
+    # Parquet con el esquema compacto (categorías con nulos, como la cache del proyecto)
+    path = tmp_path / 'compacto.parquet'
+    apply_load_schema(transactions.copy()).to_parquet(path, index=False)
+    assert transactions['Description'].isna().any()
+
+    df = ingest([str(path)])
+
+    expected = transactions.astype(INGEST_DTYPES)
+    pd.testing.assert_frame_equal(df, expected)
+
+
+def test_ingest_normalizes_retail_ii_names_and_keeps_source_order(transactions, tmp_path):
+    half = len(transactions) // 2
+    retail_ii = transactions.rename(columns={'InvoiceNo': 'Invoice', 'UnitPrice': 'Price',
+                                             'CustomerID': 'Customer ID'})
+    retail_ii.iloc[:half].to_csv(tmp_path / 'parte_0.csv', index=False)
+    transactions.iloc[half:].to_parquet(tmp_path / 'parte_1.parquet', index=False)
+
+    df = ingest([str(tmp_path / 'parte_0.csv'), str(tmp_path / 'parte_1.parquet')], workers=2)
+
+    # read_csv devuelve NaN donde el generador pone None; equals() los trata igual
+    assert df.equals(transactions.astype(INGEST_DTYPES))
@@ -0,0 +1,26 @@
+import pytest
+
+from retail.aggregation import compute_aggregates, mismatched_tables
+from retail.parallel import parallel_aggregates
+from retail.stages import build_pipeline
+
+
+@pytest.mark.parametrize('key', ['month', 'country'])
+@pytest.mark.parametrize('workers', [1, 2])
+def test_parallel_matches_serial(df_analysis, key, workers):
+    serial = compute_aggregates(df_analysis)
+    parallel = parallel_aggregates(df_analysis, key, workers)
+    assert mismatched_tables(serial, parallel) == []
+
+
+def test_parallel_stage_does_not_reuse_serial_result(tmp_path):
+    source = str(tmp_path / 'ventas.csv')
+    open(source, 'w').close()
+
+    def aggregates_key(**options):
+        return build_pipeline(source, stage_cache_dir=str(tmp_path), **options).stage_key('aggregates')
+
+    serial = aggregates_key()
+    assert aggregates_key(parallel='month', workers=2) not in {serial, aggregates_key(parallel='country', workers=2)}
+    # Con un solo proceso la etapa es la pasada en serie
+    assert aggregates_key(parallel='month', workers=1) == serial
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from retail.cache import file_fingerprint
+from retail.rfm import RFMState
+from retail.stages import rfm_state_stage
+
+
+def daily_batches(df_analysis, n_batches=3):
+    """Tandas consecutivas en el tiempo; cada corte cae en medio de una factura."""
+    ordered = df_analysis.sort_values(['InvoiceDate', 'InvoiceNo'], kind='stable')
+    invoices = ordered['InvoiceNo'].astype(str).to_numpy()
+    cuts = []
+    for position in np.linspace(0, len(ordered), n_batches + 1).astype(int)[1:-1]:
+        # Primera posición a partir de `position` cuya factura sigue en la fila siguiente
+        while invoices[position] != invoices[position + 1]:
+            position += 1
+        cuts.append(position + 1)
+    return [ordered.iloc[start:end] for start, end in zip([0, *cuts], [*cuts, len(ordered)])]
+
+
+def test_invoices_split_across_files_match_full(df_analysis):
+    batches = daily_batches(df_analysis)
+    assert set(batches[0]['InvoiceNo'].astype(str)) & set(batches[1]['InvoiceNo'].astype(str))
+
+    state = RFMState()
+    for number, batch in enumerate(batches):
+        state.update(batch, fingerprint=str(number))
+    pd.testing.assert_frame_equal(state.rfm(), RFMState.from_frame(df_analysis).rfm(), check_exact=False)
+
+
+def test_reapplied_file_is_ignored(df_analysis, tmp_path):
+    first, second, _ = daily_batches(df_analysis)
+    state = RFMState()
+    state.update(first, fingerprint='a')
+    state.save(str(tmp_path))
+
+    state = RFMState.load(str(tmp_path))
+    before = state.customers.copy()
+    assert state.update(first, fingerprint='a') is None
+    pd.testing.assert_frame_equal(state.customers, before)
+    assert state.update(second, fingerprint='b') is not None
+
+
+def test_initial_source_is_not_applied_twice(df_analysis, tmp_path):
+    path = tmp_path / 'ventas.csv'
+    df_analysis.to_csv(path, index=False)
+    state = rfm_state_stage(df_analysis, str(path), str(tmp_path / 'rfm'))
+    assert state.update(df_analysis, fingerprint=file_fingerprint(str(path))['sha256']) is None
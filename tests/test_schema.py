@@ -0,0 +1,11 @@
+from retail.schema import memory_report
+
+
+def test_enrich_keeps_prices_exact(transactions, df_analysis):
+    assert df_analysis['UnitPrice'].dtype == 'float64'
+    assert set(df_analysis['UnitPrice']) <= set(transactions['UnitPrice'])
+
+
+def test_memory_report_labels_legacy_estimate(df_analysis):
+    report = memory_report(df_analysis)
+    assert list(report.columns) == ['antes_estimado_MB', 'despues_MB', 'tipo']
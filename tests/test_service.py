@@ -0,0 +1,51 @@
+import asyncio
+import json
+
+import pytest
+
+from retail.service import QueryError, QueryService, answer
+
+
+class BrokenSnapshot:
+    """Instantánea sin datos: cualquier consulta que los lea falla."""
+
+    responses = {}
+
+
+async def _exchange(service, request):
+    server = await asyncio.start_server(service.handle, '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(request)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+    head, _, body = response.partition(b'\r\n\r\n')
+    return int(head.split()[1]), json.loads(body)
+
+
+def test_malformed_content_length_gets_400():
+    request = b'GET /health HTTP/1.1\r\nContent-Length: doce\r\n\r\n'
+    status, body = asyncio.run(_exchange(QueryService(), request))
+    assert status == 400
+    assert 'Content-Length' in body['error']
+
+
+def test_unexpected_error_gets_500():
+    service = QueryService()
+    service.snapshot = BrokenSnapshot()
+    status, _ = asyncio.run(_exchange(service, b'GET /health HTTP/1.1\r\nConnection: close\r\n\r\n'))
+    assert status == 500
+
+
+@pytest.mark.parametrize('path, params', [
+    ('/top-products', {'k': ['0']}),
+    ('/top-products', {'k': ['-3']}),
+    ('/top-products', {'k': ['diez']}),
+    ('/customers', {'limit': ['-1']}),
+])
+def test_invalid_sizes_are_rejected(path, params):
+    with pytest.raises(QueryError) as error:
+        answer(BrokenSnapshot(), path, params)
+    assert error.value.status == 400
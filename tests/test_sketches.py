@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from retail.aggregation import compute_aggregates
+from retail.rfm import score_rfm
+from retail.sketches import DESCRIBE_QUANTILES, HyperLogLog, SpaceSaving, TDigest, quantile_edges
+
+
+def merged_digest(values, n_chunks=20, compression=200):
+    """Un t-digest por bloque, combinados como en el modo por bloques."""
+    digest = TDigest(compression)
+    for chunk in np.array_split(values, n_chunks):
+        digest.merge(TDigest.from_values(chunk, compression))
+    return digest
+
+
+def rank_error(digest, values, quantiles):
+    ranks = np.searchsorted(np.sort(values), digest.quantile(quantiles)) / len(values)
+    return np.abs(ranks - quantiles).max()
+
+
+@pytest.mark.parametrize('col', ['Quantity', 'UnitPrice', 'TotalAmount'])
+def test_describe_matches_pandas(df_analysis, col):
+    values = df_analysis[col].to_numpy(dtype='float64')
+    summary = merged_digest(values).describe(name=col)
+    expected = df_analysis[col].astype('float64').describe()
+
+    exact = ['count', 'mean', 'std', 'min', 'max']
+    pd.testing.assert_series_equal(summary[exact], expected[exact], rtol=1e-9)
+    # Con muchos valores repetidos (cantidades enteras) el t-digest interpola
+    # entre dos valores frecuentes: se mide el error en rango, no en valor
+    for q in DESCRIBE_QUANTILES:
+        estimate = summary[f'{q:.0%}']
+        below, at_most = (values < estimate).mean(), (values <= estimate).mean()
+        assert below - 0.03 <= q <= at_most + 0.03
+
+
+@pytest.mark.parametrize('compression, bound', [(200, 2e-3), (50, 1e-2)])
+def test_merged_rank_error_is_bounded(compression, bound):
+    values = np.random.default_rng(0).lognormal(1, 1.2, 200_000)
+    digest = merged_digest(values, compression=compression)
+
+    assert len(digest.means) <= compression / 2
+    assert rank_error(digest, values, np.linspace(0.001, 0.999, 999)) < bound
+    assert (digest.min, digest.max) == (values.min(), values.max())
+
+
+def test_state_round_trip_and_quintile_edges():
+    values = np.random.default_rng(1).lognormal(0, 1, 50_000)
+    digest = merged_digest(values)
+    restored = TDigest.from_dict(digest.to_dict())
+
+    quantiles = np.linspace(0, 1, 11)
+    np.testing.assert_array_equal(restored.quantile(quantiles), digest.quantile(quantiles))
+    np.testing.assert_allclose(quantile_edges(digest, 5), np.quantile(values, np.linspace(0, 1, 6)), rtol=5e-3)
+
+
+def test_approximate_rfm_scores_match_exact(df_analysis):
+    rfm = compute_aggregates(df_analysis).rfm
+    exact, approximate = score_rfm(rfm), score_rfm(rfm, approximate=True)
+
+    # Solo cambian los clientes que caen justo en el borde de un quintil
+    for col in ['R_Segment', 'F_Segment', 'M_Segment', 'Customer_Category']:
+        assert (exact[col] == approximate[col]).mean() >= 0.95
+
+
+def test_hll_merge_equals_single_pass_and_round_trips(df_analysis):
+    rows = df_analysis.dropna(subset=['CustomerID'])
+    single = HyperLogLog(12).update(rows['CustomerID'], rows['InvoiceNo'])
+    merged = HyperLogLog(12)
+    for chunk in np.array_split(np.arange(len(rows)), 10):
+        part = rows.iloc[chunk]
+        merged.merge(HyperLogLog(12).update(part['CustomerID'], part['InvoiceNo']))
+    restored = HyperLogLog.from_frame(merged.to_frame(), 12)
+
+    # La unión es el máximo registro a registro: igual que una sola pasada
+    np.testing.assert_array_equal(restored.registers[restored.keys.get_indexer(single.keys)], single.registers)
+    exact = rows.groupby('CustomerID', observed=True)['InvoiceNo'].nunique()
+    pd.testing.assert_series_equal(restored.estimate().round().astype('int64'), exact, check_names=False)
+
+
+def test_hll_relative_error_is_bounded():
+    rng = np.random.default_rng(0)
+    keys, n_distinct = np.repeat(np.arange(20), 20_000), 20_000
+    hll = HyperLogLog(12).update(keys, rng.permutation(20 * n_distinct))
+
+    # Error típico 1.04 / sqrt(2^12) ≈ 1.6 %
+    relative = hll.estimate() / n_distinct - 1
+    assert np.sqrt((relative ** 2).mean()) < 2 * 1.04 / np.sqrt(2 ** 12)
+    assert hll.memory_bytes() == 20 * 2 ** 12
+
+
+def test_space_saving_bounds_contain_exact_totals(df_analysis):
+    exact = df_analysis.groupby('StockCode', observed=True)['Quantity'].sum().astype('float64')
+    summary = SpaceSaving(capacity=100)
+    for chunk in np.array_split(np.arange(len(df_analysis)), 10):
+        part = df_analysis.iloc[chunk]
+        summary.merge(SpaceSaving.from_counts(part.groupby('StockCode', observed=True)['Quantity'].sum(), 100))
+
+    top = summary.top(len(summary.counts))
+    truth = exact.reindex(top.index)
+    assert len(summary.counts) <= 100 and summary.total == exact.sum()
+    # Cada clave vigilada está entre sus cotas y las no vigiladas no superan floor
+    assert ((top['lower'] <= truth) & (truth <= top['count'])).all()
+    assert exact.drop(top.index).max() <= summary.floor
+    # Los productos que pesan más que floor están siempre vigilados
+    assert set(exact.index[exact > summary.floor]) <= set(top.index)
+
+    # Con capacidad para todas las claves no se descarta nada: top-k exacto
+    complete = SpaceSaving.from_counts(exact, capacity=len(exact))
+    expected = exact.sort_index().sort_values(ascending=False, kind='stable').head(10)
+    pd.testing.assert_series_equal(complete.top(10)['count'], expected, check_names=False)
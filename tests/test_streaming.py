@@ -0,0 +1,46 @@
+from retail import streaming
+from retail.aggregation import compute_aggregates, mismatched_tables
+from retail.streaming import PartialAggregates, aggregate_stream, clean_chunk, read_chunks
+
+
+def test_stream_matches_single_pass(transactions, tmp_path):
+    path = str(tmp_path / 'ventas.csv')
+    transactions.to_csv(path, index=False)
+
+    streamed = aggregate_stream(path, chunk_size=1000)
+    full = compute_aggregates(clean_chunk(next(read_chunks(path, chunk_size=len(transactions)))))
+
+    assert streamed.rows_in == len(transactions)
+    assert mismatched_tables(full, streamed.finalize()) == []
+
+
+def test_merge_all_buffers_at_most_the_running_tables(df_analysis, monkeypatch):
+    frame = df_analysis.assign(HourStart=df_analysis['InvoiceDate'].dt.floor('h'))
+    parts = [PartialAggregates.from_frame(frame.iloc[start:start + 200], moments=False)
+             for start in range(0, len(frame), 200)]
+    combined = []
+    combine = streaming._combine_tables
+
+    def recording(tables, how):
+        result = combine(tables, how)
+        combined.append((sum(len(table) for table in tables), len(result)))
+        return result
+
+    monkeypatch.setattr(streaming, '_combine_tables', recording)
+    total = PartialAggregates().merge_all(parts)
+
+    largest_part = max(len(table) for part in parts for table in part.tables.values())
+    # Lo pendiente nunca supera la tabla acumulada más un parcial
+    assert all(rows_in <= 2 * rows_out + largest_part for rows_in, rows_out in combined)
+    assert mismatched_tables(compute_aggregates(df_analysis), total.finalize()) == []
+
+
+def test_hll_stream_matches_exact_invoice_counts(transactions, tmp_path):
+    path = str(tmp_path / 'ventas.csv')
+    transactions.to_csv(path, index=False)
+
+    streamed = aggregate_stream(path, chunk_size=1000, hll_precision=12).finalize()
+    full = compute_aggregates(clean_chunk(next(read_chunks(path, chunk_size=len(transactions)))))
+
+    # Con 2^12 registros y pocas facturas por cliente el conteo lineal es exacto
+    assert mismatched_tables(full, streamed) == []
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from retail.timeseries import GRANULARITIES, TimeSeries
+
+
+def resampled(df_analysis, freq, measure='TotalAmount'):
+    """La serie con resample de pandas; las semanas empiezan el lunes."""
+    sales = df_analysis.set_index('InvoiceDate')[measure].astype('float64')
+    return sales.resample(freq, label='left', closed='left').sum()
+
+
+@pytest.mark.parametrize('granularity', list(GRANULARITIES))
+def test_series_matches_resample(df_analysis, granularity):
+    # Dos mitades que comparten horas, combinadas como al llegar un día nuevo
+    middle = len(df_analysis) // 2
+    ts = TimeSeries.from_frame(df_analysis.iloc[:middle]).merge(TimeSeries.from_frame(df_analysis.iloc[middle:]))
+    freq = GRANULARITIES[granularity][0]
+
+    for measure in ['TotalAmount', 'Quantity']:
+        expected = resampled(df_analysis, freq, measure)
+        pd.testing.assert_series_equal(ts.series(granularity, measure, fill=True).astype('float64'), expected,
+                                       check_names=False, check_freq=False)
+
+
+def test_windows_and_trend_match_pandas(df_analysis):
+    ts = TimeSeries.from_frame(df_analysis)
+    daily, monthly = resampled(df_analysis, 'D'), resampled(df_analysis, 'MS')
+
+    pd.testing.assert_series_equal(ts.rolling('daily', 7), daily.rolling(7).mean(), check_names=False,
+                                   check_freq=False)
+    pd.testing.assert_series_equal(ts.expanding('daily'), daily.cumsum(), check_names=False, check_freq=False)
+    yoy = ts.year_over_year('monthly')
+    pd.testing.assert_series_equal(yoy['previous'], monthly.shift(12), check_names=False, check_freq=False)
+    assert yoy['change'].notna().any()
+
+    slope = np.polyfit(np.arange(len(daily)), daily.to_numpy(), 1)[0]
+    assert ts.trend()['slope'] == pytest.approx(slope, rel=1e-9)
+    assert ts.trend()['last_window'] == pytest.approx(daily.tail(28).mean(), rel=1e-9)